@@ -63,16 +63,12 @@ def rectangular_data_to_var(gridded_data):
     """Using this very regular data, where every age and time is present,
     construct an initial guess as a Var object. Very regular means that there
     is a complete set of ages-cross-times."""
-    initial_ages = np.sort(np.unique(0.5 * (gridded_data.age_lower + gridded_data.age_upper)))
-    initial_times = np.sort(np.unique(0.5 * (gridded_data.time_lower + gridded_data.time_upper)))
-
-    guess = Var(ages=initial_ages, times=initial_times)
-    for age, time in guess.age_time():
-        found = gridded_data.query(
-            "(age_lower <= @age) & (@age <= age_upper) & (time_lower <= @time) & (@time <= time_upper)")
-        assert len(found) == 1, f"found {found}"
-        guess[age, time] = float(found.iloc[0]["mean"])
-    return guess
+    midpoints = pd.DataFrame(dict(
+        age=0.5 * (gridded_data.age_lower.values + gridded_data.age_upper.values),
+        time=0.5 * (gridded_data.time_lower.values + gridded_data.time_upper.values),
+        mean=gridded_data["mean"].values,
+    ))
+    return Var.from_frame(midpoints)
 
 
 def estimate_mortality_hazard(mtother, initial_mtother_guess, weights, params):
@@ -85,11 +81,13 @@ def estimate_mortality_hazard(mtother, initial_mtother_guess, weights, params):
     omega_grid = SmoothGrid(ages=ages, times=times)
     omega_grid.value[:, :] = Uniform(lower=0, upper=1.5, mean=0.01)
     # omega_grid.value[:, :] = Gaussian(lower=0, upper=1.5, mean=0.01, standard_deviation=value_stdev)
-    # XXX This for-loop sets the mean as the initial guess because the fit command
+    # XXX This sets the mean as the initial guess because the fit command
     # needs the initial var and scale var to be on the same age-time grid, and
     # this set is not. The session could switch it to the other age-time grid.
-    for age, time in omega_grid.age_time():
-        omega_grid.value[age, time] = omega_grid.value[age, time].assign(mean=initial_mtother_guess(age, time))
+    omega_grid.value.set_plane("mean", [
+        [initial_mtother_guess(age, time) for time in omega_grid.times]
+        for age in omega_grid.ages
+    ])
 
     omega_grid.dage[:, :] = Gaussian(mean=0.0, standard_deviation=params["dage_ratio"] * params["value_stdev"])
     omega_grid.dtime[:, :] = Gaussian(mean=0.0, standard_deviation=params["dtime_ratio"] * params["value_stdev"])
@@ -0,0 +1,143 @@
+"""
+Compares the time to fit one draw the way ``compute_parent_fit`` did,
+with ``init``, the fit, ``predict truth_var``, and ``simulate``, with
+:py:func:`cascade.executor.estimate_location.fit_draw`, which runs
+only the fit on the draw's simulation::
+
+    python scripts/benchmark_draw_commands.py --draws 5 --children 4 --data 200
+
+It makes a parent fit with simulations, as the parent's fit job does,
+and then fits each draw both ways on copies of that db file. This needs
+``dmdismod`` on the path.
+"""
+from argparse import ArgumentParser
+from math import nan
+from pathlib import Path
+from shutil import copyfile, which
+from tempfile import TemporaryDirectory
+from timeit import default_timer as timer
+
+import numpy as np
+import pandas as pd
+
+from cascade.executor.estimate_location import fit_draw
+from cascade.model import Model, Session, SmoothGrid, Uniform, Gaussian
+from cascade.model.object_wrapper import ObjectWrapper
+
+OPTIONS = dict(random_seed=0, max_num_iter_fixed=100, max_num_iter_random=100)
+
+
+def make_locations(child_cnt):
+    return pd.DataFrame(dict(
+        name=["global"] + [f"child{child_idx}" for child_idx in range(child_cnt)],
+        parent_id=[nan] + [1] * child_cnt,
+        location_id=list(range(1, child_cnt + 2)),
+    ))
+
+
+def make_model(child_cnt):
+    children = list(range(2, child_cnt + 2))
+    model = Model(["iota", "omega"], 1, children)
+    for rate in ["iota", "omega"]:
+        grid = SmoothGrid([0, 50, 100], [1990, 2015])
+        grid.value[:, :] = Uniform(lower=1e-6, upper=0.3, mean=0.01)
+        grid.dage[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.3)
+        grid.dtime[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.3)
+        model.rate[rate] = grid
+        random_effect = SmoothGrid([50], [2000])
+        random_effect.value[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.1)
+        model.random_effect[(rate, None)] = random_effect
+    return model
+
+
+def make_data(child_cnt, data_cnt):
+    rng = np.random.RandomState(seed=4329)
+    age = rng.uniform(0, 100, data_cnt)
+    time = rng.uniform(1990, 2015, data_cnt)
+    mean = rng.uniform(0.005, 0.015, data_cnt)
+    return pd.DataFrame(dict(
+        integrand="Sincidence",
+        location=rng.randint(1, child_cnt + 2, data_cnt),
+        age_lower=age,
+        age_upper=age,
+        time_lower=time,
+        time_upper=time,
+        density="gaussian",
+        mean=mean,
+        std=0.1 * mean,
+        nu=nan,
+        eta=nan,
+    ))
+
+
+def make_parent(db_path, locations, model, data, draw_cnt):
+    """Fits and simulates, as the parent's fit job does before its draws."""
+    session = Session(locations, 1, db_path)
+    session.set_option(**OPTIONS)
+    session.fit(model, data)
+    dismod_objects = ObjectWrapper(db_path)
+    dismod_objects.avgint = None  # Need to make an avgint table.
+    dismod_objects.truth_var = dismod_objects.fit_var
+    dismod_objects.run_dismod(["predict", "truth_var"])
+    dismod_objects.run_dismod(["simulate", str(draw_cnt)])
+    dismod_objects.close()
+
+
+def full_draw(db_path, simulate_idx, draw_cnt):
+    """The commands ``compute_parent_fit`` ran for each draw."""
+    dismod_objects = ObjectWrapper(db_path)
+    dismod_objects.set_option(**OPTIONS)
+    fit_var = dismod_objects.fit_var
+    dismod_objects.start_var = fit_var
+    dismod_objects.scale_var = fit_var
+    dismod_objects.run_dismod("init")
+    dismod_objects.run_dismod(["fit", "both", str(simulate_idx)])
+    dismod_objects.avgint = None
+    dismod_objects.truth_var = dismod_objects.fit_var
+    dismod_objects.run_dismod(["predict", "truth_var"])
+    dismod_objects.run_dismod(["simulate", str(draw_cnt)])
+    dismod_objects.close()
+
+
+def time_draws(parent_path, temp_dir, draw_cnt, name, fit_one):
+    times = list()
+    for simulate_idx in range(draw_cnt):
+        draw_path = Path(temp_dir) / f"{name}{simulate_idx}.db"
+        copyfile(str(parent_path), str(draw_path))
+        begin = timer()
+        fit_one(draw_path, simulate_idx)
+        times.append(timer() - begin)
+    return np.array(times)
+
+
+def parser():
+    parse = ArgumentParser(description="Compare the time to fit a draw with and without the extra commands.")
+    parse.add_argument("--draws", type=int, default=5)
+    parse.add_argument("--children", type=int, default=4)
+    parse.add_argument("--data", type=int, default=200)
+    parse.add_argument("--directory", type=Path, help="Where to write files. Defaults to a temporary directory.")
+    return parse
+
+
+def entry():
+    args = parser().parse_args()
+    if not which("dmdismod"):
+        print("This needs dmdismod on the path.")
+        exit(1)
+    locations = make_locations(args.children)
+    model = make_model(args.children)
+    data = make_data(args.children, args.data)
+    with TemporaryDirectory(dir=args.directory) as temp_dir:
+        parent_path = Path(temp_dir) / "fit.db"
+        make_parent(parent_path, locations, model, data, args.draws)
+        full = time_draws(
+            parent_path, temp_dir, args.draws, "full",
+            lambda draw_path, simulate_idx: full_draw(draw_path, simulate_idx, args.draws))
+        lean = time_draws(parent_path, temp_dir, args.draws, "lean", fit_draw)
+    for name, times in [("full", full), ("lean", lean)]:
+        print(f"{name} per draw mean {times.mean():7.3f} s min {times.min():7.3f} s max {times.max():7.3f} s")
+    print(f"saved per draw {full.mean() - lean.mean():7.3f} s, {100 * (1 - lean.mean() / full.mean()):5.1f}%")
+
+
+if __name__ == "__main__":
+    entry()
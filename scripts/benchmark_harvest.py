@@ -0,0 +1,100 @@
+"""
+Compares two ways to read predictions from many draw files.
+The first opens each file with an ObjectWrapper, which is what
+``gather_simulations_and_fit`` used to do. The second uses
+``harvest_predict``, which opens files read-only with the sqlite3 driver::
+
+    python scripts/benchmark_harvest.py --draws 100 --avgint 2000 --threads 4
+
+It writes the draw files into a temporary directory and removes them.
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer as timer
+
+import numpy as np
+import pandas as pd
+
+from cascade.dismod.db.wrapper import DismodFile, get_engine
+from cascade.model.data_read_write import harvest_predict
+from cascade.model.object_wrapper import ObjectWrapper
+
+
+def make_draw_file(db_file, avgint_cnt, sample_cnt):
+    rng = np.random.RandomState(hash(db_file.name) % 2 ** 31)
+    db = DismodFile(get_engine(db_file), writer="sqlite3")
+    db.node = pd.DataFrame(dict(node_name=["global", "child"], parent=[np.nan, 0], c_location_id=[1, 102]))
+    db.covariate = pd.DataFrame(dict(covariate_name=["sex"], reference=[0.0], max_difference=[np.nan]))
+    ages = rng.uniform(0, 100, size=avgint_cnt)
+    times = rng.uniform(1990, 2020, size=avgint_cnt)
+    db.avgint = pd.DataFrame(dict(
+        integrand_id=rng.randint(0, 5, size=avgint_cnt),
+        node_id=rng.randint(0, 2, size=avgint_cnt),
+        weight_id=0,
+        age_lower=ages,
+        age_upper=ages,
+        time_lower=times,
+        time_upper=times,
+        x_0=rng.choice([-0.5, 0.5], size=avgint_cnt),
+    ))
+    db.predict = pd.DataFrame(dict(
+        sample_index=np.repeat(np.arange(sample_cnt), avgint_cnt),
+        avgint_id=np.tile(np.arange(avgint_cnt), sample_cnt),
+        avg_integrand=rng.uniform(0, 0.1, size=avgint_cnt * sample_cnt),
+    ))
+    db.flush()
+    db.engine.dispose()
+
+
+def with_object_wrapper(paths):
+    predictions = list()
+    for draw_path in paths:
+        draw_objects = ObjectWrapper(str(draw_path))
+        predicted, not_predicted = draw_objects.predict
+        predictions.append(predicted)
+        draw_objects.close()
+    return predictions
+
+
+def with_harvest(paths, threads):
+    return [predicted for (predicted, _not_predicted) in harvest_predict(paths, threads)]
+
+
+def parser():
+    parse = ArgumentParser(description="Time reading predictions from draw files.")
+    parse.add_argument("--draws", type=int, default=50)
+    parse.add_argument("--avgint", type=int, default=1000)
+    parse.add_argument("--samples", type=int, default=1)
+    parse.add_argument("--threads", type=int, default=4)
+    parse.add_argument("--directory", type=Path, help="Where to write files. Defaults to a temporary directory.")
+    return parse
+
+
+def entry():
+    args = parser().parse_args()
+    with TemporaryDirectory(dir=args.directory) as temp_dir:
+        paths = [Path(temp_dir) / f"draw{draw_idx}.db" for draw_idx in range(args.draws)]
+        for path in paths:
+            make_draw_file(path, args.avgint, args.samples)
+
+        timings = dict()
+        results = dict()
+        for name, read in [
+            ("object wrapper", with_object_wrapper),
+            ("harvest", lambda p: with_harvest(p, None)),
+            (f"harvest {args.threads} threads", lambda p: with_harvest(p, args.threads)),
+        ]:
+            begin = timer()
+            results[name] = read(paths)
+            timings[name] = timer() - begin
+
+        baseline = results["object wrapper"]
+        for name, predictions in results.items():
+            for expected, found in zip(baseline, predictions):
+                pd.testing.assert_frame_equal(found, expected, check_dtype=False)
+            print(f"{name:24s} {timings[name]:8.3f} s {timings['object wrapper'] / timings[name]:6.1f}x")
+
+
+if __name__ == "__main__":
+    entry()
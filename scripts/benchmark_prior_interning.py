@@ -0,0 +1,93 @@
+"""
+Compares db files written with and without prior interning. Interning
+writes one row of the prior table for each distinct prior, instead of
+one for each grid point, kind of prior, and mulstd::
+
+    python scripts/benchmark_prior_interning.py --children 60 --ages 20 --times 6
+
+It reports the rows in the prior table, the size of the db file, and the
+time to write the model. If ``dmdismod`` is on the path, it also times
+Dismod-AT's ``init`` command on each file.
+"""
+from argparse import ArgumentParser
+from math import nan
+from pathlib import Path
+from shutil import which
+from tempfile import TemporaryDirectory
+from timeit import default_timer as timer
+
+import numpy as np
+import pandas as pd
+
+from cascade.model import Model, SmoothGrid, Uniform, Gaussian
+from cascade.model.object_wrapper import ObjectWrapper
+
+
+def make_locations(child_cnt):
+    return pd.DataFrame(dict(
+        name=["global"] + [f"child{child_idx}" for child_idx in range(child_cnt)],
+        parent_id=[nan] + [1] * child_cnt,
+        location_id=list(range(1, child_cnt + 2)),
+    ))
+
+
+def make_model(child_cnt, age_cnt, time_cnt):
+    children = list(range(2, child_cnt + 2))
+    model = Model(["iota", "chi", "omega"], 1, children)
+    ages = np.linspace(0, 100, age_cnt)
+    times = np.linspace(1990, 2015, time_cnt)
+    for rate in ["iota", "chi", "omega"]:
+        grid = SmoothGrid(ages, times)
+        grid.value[:, :] = Uniform(lower=1e-6, upper=0.3, mean=0.001)
+        grid.dage[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.3)
+        grid.dtime[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.3)
+        model.rate[rate] = grid
+        for child in children:
+            random_effect = SmoothGrid([50], [2000])
+            random_effect.value[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=0.1)
+            model.random_effect[(rate, child)] = random_effect
+    return model
+
+
+def write_file(db_path, locations, model, intern_priors):
+    begin = timer()
+    wrapper = ObjectWrapper(db_path, intern_priors=intern_priors)
+    wrapper.locations = locations
+    wrapper.parent_location_id = 1
+    wrapper.model = model
+    wrapper.flush()
+    write_time = timer() - begin
+    prior_cnt = len(wrapper.dismod_file.prior)
+    init_time = nan
+    if which("dmdismod"):
+        begin = timer()
+        wrapper.run_dismod(["init"])
+        init_time = timer() - begin
+    wrapper.close()
+    return dict(prior_rows=prior_cnt, bytes=db_path.stat().st_size, write=write_time, init=init_time)
+
+
+def parser():
+    parse = ArgumentParser(description="Compare db files with and without prior interning.")
+    parse.add_argument("--children", type=int, default=60)
+    parse.add_argument("--ages", type=int, default=20)
+    parse.add_argument("--times", type=int, default=6)
+    parse.add_argument("--directory", type=Path, help="Where to write files. Defaults to a temporary directory.")
+    return parse
+
+
+def entry():
+    args = parser().parse_args()
+    locations = make_locations(args.children)
+    model = make_model(args.children, args.ages, args.times)
+    with TemporaryDirectory(dir=args.directory) as temp_dir:
+        for intern_priors in [False, True]:
+            db_path = Path(temp_dir) / f"intern_{intern_priors}.db"
+            result = write_file(db_path, locations, model, intern_priors)
+            print(f"intern {str(intern_priors):5s} prior rows {result['prior_rows']:8d} "
+                  f"file {result['bytes'] / 1024:10.1f} KiB write {result['write']:7.3f} s "
+                  f"init {result['init']:7.3f} s")
+
+
+if __name__ == "__main__":
+    entry()
@@ -0,0 +1,76 @@
+"""
+Compares two ways to estimate priors from draws at every point of a
+set of grids. The first calls ``mle`` on one prior at each point, which is
+what ``estimate_grid_parameters`` used to do. The second calls the
+``batch_mle`` of each kind of prior once for all of its points::
+
+    python scripts/benchmark_prior_mle.py --points 2000 --draws 1000
+
+It prints the time for each kind of prior and the largest difference
+between the two estimates.
+"""
+from argparse import ArgumentParser
+from timeit import default_timer as timer
+
+import numpy as np
+
+from cascade.model.priors import (
+    Uniform, Gaussian, Laplace, StudentsT, LogGaussian, LogStudentsT
+)
+
+PRIORS = [
+    Uniform(-1, 1, 0.1),
+    Gaussian(0.1, 0.1, -1, 1),
+    Laplace(0.1, 0.1, -1, 1),
+    StudentsT(0.1, 0.1, 3.5, -1, 1),
+    LogGaussian(0.1, 0.1, 1e-3, -1, 1),
+    LogStudentsT(0.1, 0.1, 3.5, 1e-3, -1, 1),
+]
+
+
+def per_point(prior, draws):
+    estimates = [prior.mle(point_draws).parameters() for point_draws in draws]
+    return {name: np.array([estimate[name] for estimate in estimates]) for name in ["mean", "std"]
+            if name in estimates[0]}
+
+
+def batched(prior, draws):
+    point_cnt = draws.shape[0]
+    return type(prior).batch_mle(
+        draws, np.full(point_cnt, prior.lower), np.full(point_cnt, prior.upper),
+        np.full(point_cnt, getattr(prior, "nu", np.nan)),
+    )
+
+
+def parser():
+    parse = ArgumentParser(description="Time estimating priors from draws.")
+    parse.add_argument("--points", type=int, default=1000)
+    parse.add_argument("--draws", type=int, default=1000)
+    parse.add_argument("--seed", type=int, default=2340238)
+    return parse
+
+
+def entry():
+    args = parser().parse_args()
+    rng = np.random.RandomState(args.seed)
+    draws = rng.normal(
+        loc=rng.uniform(-0.5, 0.5, size=(args.points, 1)),
+        scale=rng.uniform(0.01, 0.2, size=(args.points, 1)),
+        size=(args.points, args.draws),
+    )
+    for prior in PRIORS:
+        timings = dict()
+        results = dict()
+        for name, estimate in [("per point", per_point), ("batch", batched)]:
+            begin = timer()
+            results[name] = estimate(prior, draws)
+            timings[name] = timer() - begin
+        difference = max(
+            np.abs(results["batch"][column] - values).max() for column, values in results["per point"].items())
+        speedup = timings["per point"] / timings["batch"]
+        print(f"{type(prior).__name__:14s} per point {timings['per point']:8.3f} s "
+              f"batch {timings['batch']:8.3f} s {speedup:8.1f}x difference {difference:.2e}")
+
+
+if __name__ == "__main__":
+    entry()
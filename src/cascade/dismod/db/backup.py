@@ -0,0 +1,106 @@
+"""
+Copies a whole Dismod-AT db between an in-memory sqlite database
+and a file.
+
+Building a model writes many small tables, and each write to a file
+on a network filesystem is a synchronous round trip. An in-memory
+database takes those writes, and these functions send the finished
+image to the file in one pass, right before Dismod-AT needs to read it.
+
+Python 3.7 added ``sqlite3.Connection.backup``, which copies pages
+directly. Where that isn't available, these functions attach the file
+to the connection and copy each table with ``INSERT INTO ... SELECT``.
+"""
+import sqlite3
+from pathlib import Path
+
+from cascade.core import getLoggers
+
+CODELOG, MATHLOG = getLoggers(__name__)
+
+
+def save_database(connection, file_path):
+    """Writes the database of this connection to a file,
+    replacing any file that is there.
+
+    Args:
+        connection (sqlite3.Connection): Usually an in-memory database.
+        file_path (Path): The file to write.
+    """
+    file_path = Path(file_path)
+    connection.commit()
+    if file_path.exists():
+        file_path.unlink()
+    if hasattr(connection, "backup"):
+        destination = sqlite3.connect(str(file_path))
+        try:
+            connection.backup(destination)
+        finally:
+            destination.close()
+    else:
+        _copy_through_attach(connection, file_path, "main", "dmfile")
+    CODELOG.debug(f"Saved db image to {file_path}")
+
+
+def load_database(connection, file_path):
+    """Reads a file into the database of this connection, replacing
+    all of its tables.
+
+    Args:
+        connection (sqlite3.Connection): Usually an in-memory database.
+        file_path (Path): The file to read.
+    """
+    file_path = Path(file_path)
+    connection.commit()
+    if hasattr(connection, "backup"):
+        source = sqlite3.connect(str(file_path))
+        try:
+            source.backup(connection)
+        finally:
+            source.close()
+    else:
+        _copy_through_attach(connection, file_path, "dmfile", "main")
+    CODELOG.debug(f"Loaded db image from {file_path}")
+
+
+def _copy_through_attach(connection, file_path, source, destination):
+    """Attaches the file as the schema ``dmfile`` and copies tables and
+    their indices from the source schema to the destination schema,
+    after dropping all tables in the destination."""
+    isolation_level = connection.isolation_level
+    connection.isolation_level = None
+    connection.execute("ATTACH DATABASE ? AS dmfile", (str(file_path),))
+    try:
+        connection.execute("BEGIN")
+        try:
+            existing = connection.execute(
+                f"SELECT name FROM {destination}.sqlite_master "
+                f"WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+            for (table_name,) in existing:
+                connection.execute(f'DROP TABLE {destination}."{table_name}"')
+            schema = connection.execute(
+                f"SELECT type, name, sql FROM {source}.sqlite_master "
+                f"WHERE type IN ('table', 'index') AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+                f"ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END"
+            ).fetchall()
+            for kind, name, create in schema:
+                connection.execute(_in_schema(create, destination))
+                if kind == "table":
+                    connection.execute(f'INSERT INTO {destination}."{name}" SELECT * FROM {source}."{name}"')
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+    finally:
+        connection.execute("DETACH DATABASE dmfile")
+        connection.isolation_level = isolation_level
+
+
+def _in_schema(create, schema):
+    """Rewrites a ``CREATE TABLE`` or ``CREATE INDEX`` statement from
+    ``sqlite_master`` so that it creates the object in the given schema."""
+    for prefix in ["CREATE TABLE ", "CREATE UNIQUE INDEX ", "CREATE INDEX "]:
+        if create.upper().startswith(prefix):
+            return f"{create[:len(prefix)]}{schema}.{create[len(prefix):].lstrip()}"
+    raise ValueError(f"Cannot copy schema statement {create}")
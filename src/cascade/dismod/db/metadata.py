@@ -363,6 +363,23 @@ class ExecutionData(Base):
     value = Column(String(), nullable=False)
 
 
+class TableFingerprint(Base):
+    """
+    Cascade's record of what it last wrote to each table, so that a
+    DismodFile that reopens the file knows which tables it doesn't need
+    to write again. Dismod-AT doesn't read it.
+    """
+
+    __tablename__ = "c_table_fingerprint"
+
+    c_table_fingerprint_id = Column(Integer(), primary_key=True, autoincrement=False)
+    table_name = Column(String(), unique=True)
+    row_count = Column(Integer(), nullable=False)
+    column_types = Column(String(), nullable=False)
+    content_hash = Column(String(), nullable=False)
+    version = Column(Integer(), nullable=False)
+
+
 class DataSubset(Base):
     """
     Output, identifies which rows of the data table are included in
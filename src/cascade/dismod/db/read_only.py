@@ -0,0 +1,127 @@
+"""
+Reads finished Dismod-AT db files quickly, without SQLAlchemy.
+
+After Dismod-AT finishes, a db file doesn't change, and a
+job that summarizes draws reads the same few tables out of hundreds
+of them. These functions open each file read-only and immutable, with
+memory-mapped I/O, and read only the named columns with the standard
+library's sqlite3 driver. There is no schema reflection, no table
+definitions, and no caching, so use
+:py:class:`cascade.dismod.db.wrapper.DismodFile` for anything
+that writes.
+
+Because the file is opened as immutable, sqlite doesn't lock it
+or check whether it changed, so don't use these functions on a file
+that Dismod-AT or another process could be writing.
+"""
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from cascade.core import getLoggers
+
+CODELOG, MATHLOG = getLoggers(__name__)
+
+MMAP_SIZE = 2 ** 28
+"""Largest part of a file to memory-map, in bytes."""
+
+
+def read_only_connection(file_path, mmap_size=MMAP_SIZE):
+    """Opens a db file that won't change while it's open.
+
+    Args:
+        file_path (Path|str): The db file, which must exist.
+        mmap_size (int): Bytes of the file to map into memory.
+
+    Returns:
+        sqlite3.Connection: Close it when done.
+    """
+    file_path = Path(file_path).expanduser().absolute()
+    if not file_path.exists():
+        raise FileNotFoundError(f"Cannot read db file {file_path} because it doesn't exist.")
+    uri = f"file:{quote(str(file_path))}?mode=ro&immutable=1"
+    connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    connection.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    return connection
+
+
+def read_table(connection, table_name, columns=None, where=None):
+    """Reads columns of a table into a dataframe, in order of the primary key.
+
+    Args:
+        connection (sqlite3.Connection): From ``read_only_connection``.
+        table_name (str): Name of the table.
+        columns (List[str]): Columns to read. Defaults to all of them.
+        where (Dict[str,object]): Map from column name to a value or
+            a list of values, as for ``DismodFile.read``.
+
+    Returns:
+        pd.DataFrame: With a default index. If the table doesn't exist,
+        it is empty.
+    """
+    in_file = [row[1] for row in connection.execute(f"PRAGMA table_info([{table_name}])").fetchall()]
+    if columns is None:
+        columns = in_file
+    if not in_file:
+        return pd.DataFrame(columns=columns)
+    missing = set(columns) - set(in_file)
+    if missing:
+        raise KeyError(f"Table {table_name} doesn't have columns {sorted(missing)}.")
+
+    clauses = list()
+    parameters = list()
+    for column, values in (where or dict()).items():
+        if column not in in_file:
+            raise KeyError(f"Table {table_name} doesn't have column {column}.")
+        if isinstance(values, (str, bytes)) or not np.iterable(values):
+            values = [values]
+        values = [v.item() if isinstance(v, np.generic) else v for v in values]
+        clauses.append(f'"{column}" IN ({", ".join("?" for _ in values)})')
+        parameters.extend(values)
+    where_sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    order = f' ORDER BY "{table_name}_id"' if f"{table_name}_id" in in_file else ""
+    rows = connection.execute(f'SELECT {quoted} FROM "{table_name}"{where_sql}{order}', parameters).fetchall()
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def read_tables(file_path, tables):
+    """Reads several tables from one file.
+
+    Args:
+        file_path (Path|str): The db file.
+        tables (Dict[str,List[str]]): Map from table name to the columns
+            to read from it, or None for all columns.
+
+    Returns:
+        Dict[str,pd.DataFrame]: Map from table name to its data.
+    """
+    connection = read_only_connection(file_path)
+    try:
+        return {name: read_table(connection, name, columns) for (name, columns) in tables.items()}
+    finally:
+        connection.close()
+
+
+def harvest(file_paths, read, threads=None):
+    """Applies a read function to every file, possibly in a thread pool.
+    Reading from sqlite releases the interpreter lock, so threads help
+    when files are on a network filesystem.
+
+    Args:
+        file_paths (List[Path]): Files to read.
+        read (function): Takes a path and returns what it read,
+            for instance ``lambda path: read_tables(path, {"predict": None})``.
+        threads (int): Number of threads. None or 1 reads in this thread.
+
+    Returns:
+        List: The result of ``read`` for each file, in the same order.
+    """
+    if threads is None or threads <= 1 or len(file_paths) < 2:
+        return [read(file_path) for file_path in file_paths]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(read, file_paths))
@@ -0,0 +1,271 @@
+"""
+Writes Dismod-AT tables with the standard library's sqlite3 driver.
+
+The default way to write a table is Pandas ``to_sql``, which goes through
+SQLAlchemy and inserts a row at a time. This writer generates the
+``CREATE TABLE`` statement directly from the table definitions in
+:py:mod:`cascade.dismod.db.metadata`, converts each column to Python
+values once, and sends all rows with ``executemany``. Every table
+written during one flush shares a single transaction.
+
+The column types are the three that Dismod-AT accepts, ``integer``,
+``real``, and ``text``, and the primary key is always
+``<table>_id integer primary key``, which is what
+:py:meth:`DismodFile._check_column_types_actually_written` expects.
+
+When only a few rows of a table change, :py:func:`sqlite_update_rows`
+sends ``DELETE``, ``UPDATE``, and ``INSERT`` statements for those rows
+instead of rewriting the table. Both writers use it.
+"""
+import numpy as np
+from sqlalchemy import Float, String
+
+from cascade.core import getLoggers
+
+CODELOG, MATHLOG = getLoggers(__name__)
+
+SQLITE_WRITE_PRAGMAS = dict(
+    synchronous="normal",
+    cache_size=-65536,
+)
+"""Pragmas set on the connection during a flush, and put back afterwards.
+With ``synchronous=normal``, sqlite syncs the journal and the file at
+commit, but less often than with the default ``full``. A crash of this
+process can't corrupt the file. A power loss or operating system crash
+during the commit could lose the transaction, or, rarely, corrupt the
+file. The negative cache size is in kibibytes, so this is 64 MiB."""
+
+
+def sqlite_type(column_definition):
+    """The sqlite type name Dismod-AT expects for a column.
+
+    Foreign keys are declared without a type, and we use those only
+    for integer ids.
+
+    Args:
+        column_definition (sqlalchemy.Column): From the metadata.
+
+    Returns:
+        str: One of ``integer``, ``real``, or ``text``.
+    """
+    if isinstance(column_definition.type, Float):
+        return "real"
+    elif isinstance(column_definition.type, String):
+        # Enum is a subclass of String.
+        return "text"
+    else:
+        return "integer"
+
+
+def sqlite_table_ddl(table_name, table_definition):
+    """The ``CREATE TABLE`` statement for a Dismod-AT table. There are
+    no constraints besides the primary key because Dismod-AT checks its
+    own input and Pandas never wrote them either. It has one column
+    per line, the same layout SQLAlchemy uses, so that the schema
+    stored in ``sqlite_master`` reads the same way for both writers.
+
+    Args:
+        table_name (str): Name of the table.
+        table_definition (sqlalchemy.Table): Columns and their types.
+
+    Returns:
+        str: A single SQL statement.
+    """
+    primary_key = f"{table_name}_id"
+    columns = [f"{primary_key} integer primary key"]
+    for column_name, column_definition in table_definition.c.items():
+        if column_name != primary_key:
+            columns.append(f"{column_name} {sqlite_type(column_definition)}")
+    column_lines = ",\n\t".join(columns)
+    return f"CREATE TABLE {table_name} (\n\t{column_lines}\n)"
+
+
+def sqlite_column_values(column, kind):
+    """Converts a Pandas column to Python objects that the sqlite3
+    driver can bind. Missing values become None, which is a SQL null.
+    Numpy integers aren't Python integers, so they are converted here.
+
+    Args:
+        column (pd.Series): Any column that passed validation.
+        kind (str): One of ``integer``, ``real``, or ``text``.
+
+    Returns:
+        np.ndarray: An array of object type.
+    """
+    missing = column.isna().values
+    values = np.empty((len(column),), dtype=object)
+    present = column[~missing]
+    if kind == "integer":
+        values[~missing] = present.astype(np.int64).values.astype(object)
+    elif kind == "real":
+        values[~missing] = present.astype(np.float64).values.astype(object)
+    else:
+        values[~missing] = [v if isinstance(v, str) else str(v) for v in present.values]
+    values[missing] = None
+    return values
+
+
+class SqliteWriter:
+    """Writes tables within one sqlite3 transaction. This is a context
+    manager, so use it as::
+
+        with SqliteWriter(engine) as writer:
+            writer.replace_table("age", age_definition, age_df)
+
+    The transaction commits when the block exits and rolls back
+    if there is an exception.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The writer borrows the
+            underlying sqlite3 connection from this engine's pool, so
+            in-memory databases see the same data.
+        pragmas (Dict[str,object]): Pragmas to set before the transaction
+            starts. They get their earlier values back after it ends.
+            Defaults to ``SQLITE_WRITE_PRAGMAS``.
+    """
+    def __init__(self, engine, pragmas=None):
+        self._engine = engine
+        self._pragmas = SQLITE_WRITE_PRAGMAS if pragmas is None else pragmas
+        self._pooled = None
+        self._connection = None
+        self._isolation_level = None
+        self._saved_pragmas = dict()
+
+    def __enter__(self):
+        self._pooled = self._engine.raw_connection()
+        self._connection = self._pooled.connection
+        # Manage the transaction ourselves, so that table creation
+        # is part of the same transaction as the inserts.
+        self._isolation_level = self._connection.isolation_level
+        self._connection.isolation_level = None
+        # The pooled connection outlives this writer, so remember what to put back.
+        self._saved_pragmas = dict()
+        for pragma_name, pragma_value in self._pragmas.items():
+            self._saved_pragmas[pragma_name] = self._connection.execute(f"PRAGMA {pragma_name}").fetchone()[0]
+            self._connection.execute(f"PRAGMA {pragma_name}={pragma_value}")
+        self._connection.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._connection.execute("COMMIT")
+            else:
+                self._connection.execute("ROLLBACK")
+        finally:
+            for pragma_name, pragma_value in self._saved_pragmas.items():
+                self._connection.execute(f"PRAGMA {pragma_name}={pragma_value}")
+            self._connection.isolation_level = self._isolation_level
+            self._pooled.close()
+            self._connection = None
+            self._pooled = None
+
+    @property
+    def connection(self):
+        """sqlite3.Connection: The connection, while the transaction is open."""
+        return self._connection
+
+    def replace_table(self, table_name, table_definition, data):
+        """Drops any existing table, creates it again, and inserts all rows.
+
+        Args:
+            table_name (str): Name of the table.
+            table_definition (sqlalchemy.Table): Every column in the
+                definition is written. Those missing from the data are null.
+            data (pd.DataFrame): Data that has passed validation.
+        """
+        self._connection.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        self._connection.execute(sqlite_table_ddl(table_name, table_definition))
+        if data.empty:
+            return
+        column_names, columns = sqlite_rows(table_name, table_definition, data)
+        placeholders = ", ".join("?" for _ in column_names)
+        quoted = ", ".join(f'"{name}"' for name in column_names)
+        self._connection.executemany(
+            f'INSERT INTO "{table_name}" ({quoted}) VALUES ({placeholders})', zip(*columns)
+        )
+        CODELOG.debug(f"Wrote {len(data)} rows to {table_name} with sqlite3")
+
+    def update_rows(self, table_name, table_definition, inserted, updated, deleted):
+        """Changes rows of an existing table. See :py:func:`sqlite_update_rows`."""
+        sqlite_update_rows(self._connection.cursor(), table_name, table_definition, inserted, updated, deleted)
+
+
+def sqlite_rows(table_name, table_definition, data, only_present=False):
+    """Converts data to columns of Python objects, in the order of the
+    table definition.
+
+    Args:
+        table_name (str): Name of the table.
+        table_definition (sqlalchemy.Table): Columns and their types.
+        data (pd.DataFrame): Data that has passed validation. The primary
+            key comes from the ``<table>_id`` column or, if that's
+            missing, from the index.
+        only_present (bool): Whether to skip columns that are in the
+            definition but not in the data. Otherwise they are null.
+
+    Returns:
+        (List[str], List[np.ndarray]): Column names and a list of columns.
+    """
+    primary_key = f"{table_name}_id"
+    column_names = list()
+    columns = list()
+    for column_name, column_definition in table_definition.c.items():
+        if column_name == primary_key:
+            key = data[column_name] if column_name in data else data.index.to_series()
+            if key.isna().any():
+                raise ValueError(f"Cannot write {table_name}.{primary_key} because it has missing values")
+            values = sqlite_column_values(key, "integer")
+        elif column_name in data:
+            values = sqlite_column_values(data[column_name], sqlite_type(column_definition))
+        elif only_present:
+            continue
+        else:
+            values = np.full((len(data),), None, dtype=object)
+        column_names.append(column_name)
+        columns.append(values)
+    return column_names, columns
+
+
+def sqlite_update_rows(cursor, table_name, table_definition, inserted, updated, deleted):
+    """Applies row changes to a table that already exists in the file.
+    Only columns present in the data are written, so this works for
+    tables that either writer created.
+
+    Args:
+        cursor: A DBAPI cursor for a sqlite3 connection that is
+            within a transaction.
+        table_name (str): Name of the table.
+        table_definition (sqlalchemy.Table): Columns and their types.
+        inserted (pd.DataFrame): Rows whose primary keys are new.
+        updated (pd.DataFrame): Rows whose primary keys exist but whose
+            values have changed.
+        deleted (np.ndarray): Primary keys of rows to remove.
+    """
+    primary_key = f"{table_name}_id"
+    if len(deleted) > 0:
+        cursor.executemany(
+            f'DELETE FROM "{table_name}" WHERE "{primary_key}" = ?',
+            [(int(row_id),) for row_id in deleted]
+        )
+    if not updated.empty:
+        column_names, columns = sqlite_rows(table_name, table_definition, updated, only_present=True)
+        key_index = column_names.index(primary_key)
+        value_names = column_names[:key_index] + column_names[key_index + 1:]
+        values = columns[:key_index] + columns[key_index + 1:] + [columns[key_index]]
+        assignments = ", ".join(f'"{name}" = ?' for name in value_names)
+        if assignments:
+            cursor.executemany(
+                f'UPDATE "{table_name}" SET {assignments} WHERE "{primary_key}" = ?', zip(*values)
+            )
+    if not inserted.empty:
+        column_names, columns = sqlite_rows(table_name, table_definition, inserted, only_present=True)
+        placeholders = ", ".join("?" for _ in column_names)
+        quoted = ", ".join(f'"{name}"' for name in column_names)
+        cursor.executemany(
+            f'INSERT INTO "{table_name}" ({quoted}) VALUES ({placeholders})', zip(*columns)
+        )
+    CODELOG.debug(
+        f"Changed rows of {table_name}: {len(inserted)} inserted, "
+        f"{len(updated)} updated, {len(deleted)} deleted"
+    )
@@ -8,8 +8,11 @@ The object wrapper makes Pandas Dataframes. They get passed here
 and validated. Then Pandas uses to_csv to write them to the sqlalchemy
 engine, which uses the metadata wrapper (and its custom conversions)
 to write them to a very specific format that Dismod-AT is able to read.
+For large tables, choose the ``sqlite3`` writer, which skips Pandas and
+SQLAlchemy on write and uses the same schema.
 """
-from copy import deepcopy
+from collections.abc import Mapping
+from hashlib import sha1
 from textwrap import dedent
 
 import numpy as np
@@ -18,21 +21,42 @@ from pandas.core.dtypes.base import ExtensionDtype
 from networkx import DiGraph
 from networkx.algorithms.dag import lexicographical_topological_sort
 from sqlalchemy import Integer, String, Float, Enum
-from sqlalchemy import create_engine
+from sqlalchemy import MetaData, create_engine
 from sqlalchemy.exc import OperationalError, StatementError
+from sqlalchemy.pool import SingletonThreadPool
 from sqlalchemy.sql import select, text
 
 from cascade.core import getLoggers
 from cascade.dismod.db import DismodFileError
+from cascade.dismod.db.backup import save_database, load_database
 from cascade.dismod.db.metadata import Base, add_columns_to_table
+from cascade.dismod.db.sqlite_writer import SqliteWriter, sqlite_update_rows
 
 CODELOG, MATHLOG = getLoggers(__name__)
 
+FINGERPRINT_VERSION = 1
+"""Version of how ``c_table_fingerprint`` hashes tables. Fingerprints
+with any other version are ignored."""
 
-def get_engine(file_path):
+
+def get_engine(file_path, persistent=False):
+    """Makes a SQLAlchemy engine for a db file or for an in-memory db.
+
+    Args:
+        file_path (Path|None): The file, or None for an in-memory db.
+        persistent (bool): Whether the engine keeps one connection to
+            the file open between uses. Otherwise, it opens the file again
+            for every read and write, which is slow on a network
+            filesystem. An idle connection holds no locks, so
+            Dismod-AT can write the file while it is open.
+
+    Returns:
+        sqlalchemy.engine.Engine
+    """
     if file_path is not None:
         full_path = file_path.expanduser().absolute()
-        engine = create_engine("sqlite:///{}".format(str(full_path)))
+        pool = dict(poolclass=SingletonThreadPool) if persistent else dict()
+        engine = create_engine("sqlite:///{}".format(str(full_path)), **pool)
     else:
         engine = create_engine("sqlite:///:memory:", echo=False)
     return engine
@@ -166,6 +190,226 @@ def _ordered_by_foreign_key_dependency(schema, tables_to_write):
             yield next_table
 
 
+class _TableDefinitions(Mapping):
+    """Table definitions for one DismodFile. Tables come from the shared
+    metadata until a file adds columns to one of them. Then that file
+    gets its own copy of that one table definition.
+
+    Args:
+        base (sqlalchemy.MetaData): Shared metadata, which isn't modified.
+    """
+    def __init__(self, base):
+        self._base = base.tables
+        self._overlay = MetaData()
+
+    def __getitem__(self, table_name):
+        if table_name in self._overlay.tables:
+            return self._overlay.tables[table_name]
+        return self._base[table_name]
+
+    def __iter__(self):
+        return iter(self._base)
+
+    def __len__(self):
+        return len(self._base)
+
+    def private_copy(self, table_name):
+        """The definition of this table that belongs only to this file,
+        copied from the shared one the first time it's requested.
+
+        Returns:
+            sqlalchemy.Table: A table definition that can be modified.
+        """
+        if table_name not in self._overlay.tables:
+            self._base[table_name].tometadata(self._overlay)
+        return self._overlay.tables[table_name]
+
+
+def _fingerprint(table_hash, column_signature):
+    """Row count, column types, and a hash of the content of a table,
+    as stored in ``c_table_fingerprint``.
+
+    Args:
+        table_hash (pd.Series): Row hashes, indexed by primary key.
+        column_signature (tuple): From ``_column_signature``.
+    """
+    digest = sha1()
+    digest.update(pd.util.hash_array(np.asarray(table_hash.index)).tobytes())
+    digest.update(np.asarray(table_hash.values, dtype=np.uint64).tobytes())
+    return len(table_hash), repr(column_signature), digest.hexdigest()
+
+
+def _column_signature(table):
+    """Column names and types. If these change, the table is replaced."""
+    return tuple((column_name, str(dtype)) for column_name, dtype in table.dtypes.items())
+
+
+def _as_list(values):
+    if isinstance(values, (str, bytes)) or not np.iterable(values):
+        return [values]
+    return list(values)
+
+
+def _where_clause(where):
+    """Makes a SQL where clause from a dictionary of column values.
+
+    Returns:
+        (str, Dict): The clause and its bound parameters.
+    """
+    if not where:
+        return "", dict()
+    clauses = list()
+    parameters = dict()
+    for column, values in where.items():
+        names = list()
+        for value in _as_list(values):
+            name = f"p{len(parameters)}"
+            parameters[name] = value.item() if isinstance(value, np.generic) else value
+            names.append(f":{name}")
+        clauses.append(f'"{column}" IN ({", ".join(names)})')
+    return " WHERE " + " AND ".join(clauses), parameters
+
+
+def _select_statement(table_name, columns, where):
+    """A select statement for the columns, ordered by primary key if
+    that's among the columns.
+
+    Returns:
+        (sqlalchemy.sql.expression.TextClause, Dict): Query and parameters.
+    """
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    where_sql, parameters = _where_clause(where)
+    primary_key = f"{table_name}_id"
+    order = f' ORDER BY "{primary_key}"' if primary_key in columns else ""
+    return text(f'SELECT {quoted} FROM "{table_name}"{where_sql}{order}'), parameters
+
+
+def _as_declared_types(data, declared):
+    """Converts columns to match how ``pd.read_sql_table`` reads them.
+    A real column that is all null is float, not object, and an integer
+    column in an empty table is int64.
+
+    Args:
+        data (pd.DataFrame): As read with a query.
+        declared (Dict[str,str]): Column name to declared sqlite type.
+    """
+    conversions = dict()
+    for column in data.columns:
+        kind = declared.get(column, "")
+        if any(real in kind for real in ["REAL", "FLOA", "DOUB"]) and data[column].dtype == np.object:
+            conversions[column] = np.float64
+        elif "INT" in kind and data.empty:
+            conversions[column] = np.int64
+    return data.astype(conversions) if conversions else data
+
+
+def _freeze_frame(table):
+    """Makes the array of each column of a dataframe read-only, so that
+    assignment into those arrays raises an exception. This also freezes
+    the arrays those are views of, so the frame should own them.
+
+    Returns:
+        tuple: What identifies this frame and its arrays, or None if
+        some of its columns aren't numpy arrays, as happens for
+        Pandas extension types.
+    """
+    arrays = list()
+    for column in table.columns:
+        values = table[column].values
+        if not isinstance(values, np.ndarray):
+            return None
+        # A column is often a view of an array that it shares with other
+        # columns, and assignment into the frame writes that array.
+        base = values
+        while isinstance(base, np.ndarray):
+            base.flags.writeable = False
+            base = base.base
+        arrays.append(values)
+    return table, table.index, table.columns, arrays
+
+
+def _same_frozen_frame(frozen, table):
+    """True if this is the frozen frame and it still has the same
+    index, columns, and read-only arrays. Assigning into the frame
+    makes Pandas drop the arrays it handed out for its columns,
+    so a changed frame fails this test and has to be hashed."""
+    if frozen is None:
+        return False
+    frozen_table, index, columns, arrays = frozen
+    if not (table is frozen_table and table.index is index and table.columns is columns):
+        return False
+    if len(table.columns) != len(arrays):
+        return False
+    return all(
+        table[column].values is array and not array.flags.writeable
+        for (column, array) in zip(table.columns, arrays)
+    )
+
+
+class PandasWriter:
+    """Writes tables with Pandas ``to_sql`` through a SQLAlchemy
+    connection. All tables written in one flush share a transaction.
+    This has the same interface as
+    :py:class:`cascade.dismod.db.sqlite_writer.SqliteWriter`.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine for the file.
+    """
+    def __init__(self, engine):
+        self._engine = engine
+        self._transaction = None
+        self._connection = None
+
+    def __enter__(self):
+        self._transaction = self._engine.begin()
+        self._connection = self._transaction.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return self._transaction.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            self._transaction = None
+            self._connection = None
+
+    def replace_table(self, table_name, table_definition, table):
+        """Replaces the table in the db file with this data.
+
+        Args:
+            table_name (str): Name of the table.
+            table_definition (sqlalchemy.Table): Types for the columns.
+            table (pd.DataFrame): Data that has passed validation.
+        """
+        # In order to write the <table>_id column as a primary key,
+        # we need to make the index not have a name and be of type
+        # int64. That makes it write as a BIGINT, which the
+        # sqlalchemy compiler turns into a primary key statement.
+        if f"{table_name}_id" in table:
+            table = table.set_index(f"{table_name}_id")
+            try:
+                table.index = table.index.astype(np.int64)
+            except ValueError as ve:
+                raise ValueError(f"Cannot convert {table_name}.{table_name}_id to index") from ve
+        try:
+            dtypes = {k: v.type for k, v in table_definition.c.items()}
+            CODELOG.debug(f"Writing table {table_name} rows {len(table)} types {dtypes}")
+            table.index.name = None
+            table.to_sql(
+                table_name, self._connection, index_label=f"{table_name}_id", if_exists="replace", dtype=dtypes
+            )
+        except StatementError:
+            raise
+
+    def update_rows(self, table_name, table_definition, inserted, updated, deleted):
+        """Changes rows of an existing table. See
+        :py:func:`cascade.dismod.db.sqlite_writer.sqlite_update_rows`."""
+        cursor = self._connection.connection.cursor()
+        try:
+            sqlite_update_rows(cursor, table_name, table_definition, inserted, updated, deleted)
+        finally:
+            cursor.close()
+
+
 class DismodFile:
     """
     Responsible for creation of a Dismod-AT file.
@@ -188,23 +432,72 @@ class DismodFile:
     to the avgint and data tables. These arguments are dictionaries from
     column name to column type.
 
-    This uses a deep copy of the metadata module so that, when it adds columns
-    to tables, it doesn't affect the module itself.
+    All files share the table definitions in the metadata module. When
+    this adds columns to a table, it first makes its own copy of that
+    table's definition, so that it doesn't affect the module itself
+    or other files.
+
+    There are two ways to write tables, chosen with the ``writer`` attribute.
+    The default, ``pandas``, uses ``DataFrame.to_sql``. The ``sqlite3``
+    writer uses the standard library driver with ``executemany``, which
+    is much faster for tables with many rows. Its connection pragmas are
+    in the ``sqlite_pragmas`` attribute.
+
+    When a table was read from the file, or written to it, this keeps a
+    hash of each row, keyed by the primary key. If only some rows change,
+    then ``flush`` deletes, updates, and inserts those rows instead of
+    replacing the whole table. It replaces the table if the columns or
+    their types change, or if more than ``row_change_limit`` of
+    the rows change, as a fraction of the table size.
+
+    Deciding which tables to write on flush means hashing every table
+    that is in memory. Setting ``read_only_tables`` to True avoids that.
+    Tables read from the file, or written to it, become read-only, so
+    changing them in place raises an exception. Instead, modify a copy and
+    assign it back, which counts as a change to the table::
+
+        age = db_file.age.copy()
+        age.loc[0, "age"] = 0.5
+        db_file.age = age
+
+    A table that is still read-only, and hasn't been assigned or
+    had its columns changed, is known to be clean without hashing it.
+    Any other table is compared by hash.
+
+    Flush records a fingerprint of each table it writes in the
+    ``c_table_fingerprint`` table of the file. When another DismodFile
+    opens that file and is given a table, it compares the table with
+    the fingerprint, so it doesn't rewrite a table the file already has.
+    Anything else that writes the file has to remove fingerprints
+    for the tables it changes, with ``forget_fingerprints``.
     """
 
-    def __init__(self, engine=None):
+    def __init__(self, engine=None, writer="pandas"):
         """
         The columns arguments add columns to the avgint and data
         tables.
 
         Args:
             engine: A sqlalchemy engine
+            writer (str): Either ``pandas`` or ``sqlite3``, to choose how
+                ``flush`` writes tables.
         """
         self.engine = engine
-        self._metadata = deepcopy(Base.metadata)
-        self._table_definitions = self._metadata.tables
+        self.writer = writer
+        self.sqlite_pragmas = None
+        self.row_change_limit = 0.5
+        self.read_only_tables = False
+        self._table_definitions = _TableDefinitions(Base.metadata)
         self._table_data = {}
         self._table_hash = {}
+        self._table_columns = {}
+        self._table_version = {}
+        self._clean_version = {}
+        self._clean_frame = {}
+        self._clean_fingerprint = {}
+        self._read_from_file = set()
+        self._fingerprints = None
+        self._fingerprints_changed = False
         CODELOG.debug(f"dmfile tables {self._table_definitions.keys()}")
 
     def create_tables(self, tables=None):
@@ -240,7 +533,7 @@ class DismodFile:
 
             raise ValueError(dedent(msg))
 
-        add_columns_to_table(table_definition, new_column_types)
+        add_columns_to_table(self._table_definitions.private_copy(table_name), new_column_types)
 
     def refresh(self, evict_tables=None):
         """ Throw away any un-flushed changes and reread data from disk.
@@ -248,35 +541,72 @@ class DismodFile:
         evicted = list()
         if evict_tables is None:
             evicted = list(self._table_data.keys())
+            self._bump_versions(set(evicted) | set(self._table_version.keys()))
             self._table_data = {}
             self._table_hash = {}
+            self._table_columns = {}
+            self._clean_version = {}
+            self._clean_frame = {}
+            self._clean_fingerprint = {}
+            self._read_from_file = set()
+            self._fingerprints = None
+            self._fingerprints_changed = False
         else:
             to_evict = [evict_tables] if isinstance(evict_tables, str) else evict_tables
+            self._bump_versions(to_evict)
             for evict in to_evict:
                 if evict in self._table_data:
                     del self._table_data[evict]
                 if evict in self._table_hash:
                     del self._table_hash[evict]
+                    del self._table_columns[evict]
                     evicted.append(evict)
+                self._clean_version.pop(evict, None)
+                self._clean_frame.pop(evict, None)
+                self._clean_fingerprint.pop(evict, None)
+                self._read_from_file.discard(evict)
         CODELOG.debug(f"Evicted from wrapper: {evicted}")
 
+    def save_to(self, file_path):
+        """Flushes, and then writes the whole database to a file in one pass.
+        Use this to build a db in memory, with ``get_engine(None)``,
+        and write it where Dismod-AT will read it.
+
+        Args:
+            file_path (Path): File to write. An existing file is replaced.
+        """
+        self.flush()
+        pooled = self.engine.raw_connection()
+        try:
+            save_database(pooled.connection, file_path)
+        finally:
+            pooled.close()
+
+    def load_from(self, file_path):
+        """Replaces the contents of this database with those of a file.
+        Tables in memory aren't changed, so use ``refresh`` for any tables
+        that are different in the file.
+
+        Args:
+            file_path (Path): File to read.
+        """
+        pooled = self.engine.raw_connection()
+        try:
+            load_database(pooled.connection, file_path)
+        finally:
+            pooled.close()
+
     def __getattr__(self, table_name):
         if table_name in self._table_data:
             return self._table_data[table_name]
         elif table_name in self._table_definitions:
             read_from_database = False
             table = self._table_definitions[table_name]
-            if self.engine is None:
-                data = self.empty_table(table.name)
+            data = self._read_whole_table(table.name) if self.engine is not None else None
+            if data is not None:
+                read_from_database = True
             else:
-                try:
-                    with self.engine.connect() as conn:
-                        data = pd.read_sql_table(table.name, conn)
-                        read_from_database = True
-                except ValueError as e:
-                    if str(e) != f"Table {table.name} not found":
-                        raise
-                    data = self.empty_table(table.name)
+                data = self.empty_table(table.name)
 
             extra_columns = set(data.columns.difference(table.c.keys()))
             if extra_columns:
@@ -285,9 +615,10 @@ class DismodFile:
             data = data.set_index(f"{table_name}_id", drop=False)
             # The hash table defines whether the table is new, and whether
             # a table created is new.
-            if read_from_database:
-                self._table_hash[table_name] = pd.util.hash_pandas_object(data)
             self._table_data[table_name] = data
+            if read_from_database:
+                self._mark_clean(table_name, self._row_hashes(table_name, data), owned=True)
+                self._read_from_file.add(table_name)
             return data
         else:
             raise AttributeError(
@@ -300,33 +631,392 @@ class DismodFile:
             if f"{table_name}_id" not in df:
                 df = df.assign(**{f"{table_name}_id": df.index})
             self._table_data[table_name] = df
+            self._bump_versions([table_name])
+            self._read_from_file.discard(table_name)
         elif isinstance(df, pd.DataFrame):
             raise KeyError(f"Tried to set table {table_name} but it isn't in the db specification")
         else:
             super().__setattr__(table_name, df)
 
+    def read(self, table_name, columns=None, where=None, chunksize=None):
+        """Reads some columns and rows of a table. Unlike reading a table
+        as an attribute, this doesn't load the whole table and doesn't keep
+        what it reads. If the table is already in memory, this selects
+        from that copy, because it may have changes that aren't flushed::
+
+            sample = db_file.read("sample", ["var_id", "var_value"], dict(sample_index=3))
+
+        Args:
+            table_name (str): Name of the table.
+            columns (List[str]): Columns to read. Defaults to all columns.
+            where (Dict[str,object]): Map from column name to either a value
+                or a list of values. Rows match if, for every column,
+                the row's value is one of the given values.
+            chunksize (int): If this is given, then return an iterator
+                over dataframes of at most this many rows.
+
+        Returns:
+            pd.DataFrame: Indexed by the primary key, with the requested
+            columns. An iterator over dataframes if ``chunksize`` is set.
+        """
+        primary_key = f"{table_name}_id"
+        if table_name in self._table_data:
+            selected = self._select_in_memory(table_name, columns, where)
+            if chunksize is None:
+                return selected
+            return (selected.iloc[start:start + chunksize] for start in range(0, len(selected), chunksize))
+
+        in_file = self._columns_in_file(table_name)
+        if not in_file:
+            empty = self.empty_table(table_name).set_index(primary_key, drop=False)
+            selected = empty if columns is None else empty[list(columns)]
+            return selected if chunksize is None else iter([selected])
+
+        read_columns = list(in_file) if columns is None else list(columns)
+        self._check_columns(table_name, read_columns + list((where or dict()).keys()), in_file)
+        select_columns = read_columns if primary_key in read_columns else [primary_key] + read_columns
+        query, parameters = _select_statement(table_name, select_columns, where)
+
+        def index_by_id(data):
+            typed = _as_declared_types(data, in_file)
+            return typed.set_index(primary_key, drop=primary_key not in read_columns)
+
+        if chunksize is None:
+            with self.engine.connect() as connection:
+                return index_by_id(pd.read_sql(query, connection, params=parameters))
+        else:
+            return self._read_chunks(query, parameters, chunksize, index_by_id)
+
+    def _read_chunks(self, query, parameters, chunksize, transform):
+        with self.engine.connect() as connection:
+            for chunk in pd.read_sql(query, connection, params=parameters, chunksize=chunksize):
+                yield transform(chunk)
+
+    def _read_whole_table(self, table_name):
+        """Reads every column of a table, using the column types declared
+        in the file, which is what ``pd.read_sql_table`` would do, but
+        without reflecting the schema into SQLAlchemy.
+
+        Returns:
+            pd.DataFrame: With a default index, or None if there is no table.
+        """
+        in_file = self._columns_in_file(table_name)
+        if not in_file:
+            return None
+        query, parameters = _select_statement(table_name, list(in_file), None)
+        with self.engine.connect() as connection:
+            data = pd.read_sql(query, connection, params=parameters)
+        return _as_declared_types(data, in_file)
+
+    def row_count(self, table_name, where=None):
+        """Counts rows in a table without reading the table.
+
+        Args:
+            table_name (str): Name of the table.
+            where (Dict[str,object]): Same as the argument to ``read``.
+
+        Returns:
+            int: Number of rows, which is zero if the table doesn't exist.
+        """
+        if table_name in self._table_data:
+            return len(self._select_in_memory(table_name, list(), where))
+        in_file = self._columns_in_file(table_name)
+        if not in_file:
+            return 0
+        self._check_columns(table_name, list((where or dict()).keys()), in_file)
+        where_sql, parameters = _where_clause(where)
+        with self.engine.connect() as connection:
+            result = connection.execute(text(f'SELECT count(*) FROM "{table_name}"{where_sql}'), parameters)
+            return int(result.scalar())
+
+    def has_table(self, table_name):
+        """Whether the table is in memory or in the file, even if it is empty.
+
+        Args:
+            table_name (str): Name of the table.
+
+        Returns:
+            bool: True if the table exists.
+        """
+        return table_name in self._table_data or bool(self._columns_in_file(table_name))
+
+    def _select_in_memory(self, table_name, columns, where):
+        table = self._table_data[table_name]
+        self._check_columns(table_name, list(columns or list()) + list((where or dict()).keys()), table.columns)
+        if where:
+            keep = np.ones(len(table), dtype=np.bool)
+            for column, values in where.items():
+                keep &= table[column].isin(_as_list(values)).values
+            table = table[keep]
+        return table if columns is None else table[list(columns)]
+
+    def _columns_in_file(self, table_name):
+        """Column names and their declared types in the file, in order,
+        or empty if there is no table.
+
+        Returns:
+            Dict[str,str]: From column name to upper-case declared type.
+        """
+        if self.engine is None:
+            return dict()
+        if table_name not in self._table_definitions:
+            raise AttributeError(f"There is no table {table_name} in the schema for the Dismod db file.")
+        with self.engine.connect() as connection:
+            table_info = connection.execute(text(f"PRAGMA table_info([{table_name}]);")).fetchall()
+        return {row[1]: row[2].upper() for row in table_info}
+
+    @staticmethod
+    def _check_columns(table_name, asked, available):
+        missing = set(asked) - set(available)
+        if missing:
+            raise DismodFileError(f"Table {table_name} doesn't have columns {sorted(missing)}.")
+
     def _is_dirty(self, table_name):
         """Tests to see if the table's data has changed in memory since it was last loaded from the database.
         """
+        return self._dirty_hash(table_name)[0]
+
+    def _dirty_hash(self, table_name):
+        """Whether the table has changed, and its row hashes if they
+        had to be calculated to decide that.
 
+        Returns:
+            (bool, pd.Series): Whether it's dirty and row hashes or None.
+        """
         if table_name not in self._table_data:
+            return False, None
+        table = self._table_data[table_name]
+        if table_name not in self._table_hash:
+            table_hash = self._row_hashes(table_name, table)
+            if self._matches_fingerprint(table_name, table, table_hash):
+                CODELOG.debug(f"{table_name} matches its fingerprint in the file")
+                self._mark_clean(table_name, table_hash)
+                return False, table_hash
+            return True, table_hash
+
+        unassigned = self._clean_version.get(table_name) == self._table_version.get(table_name, 0)
+        if unassigned and table_name in self._clean_frame:
+            if _same_frozen_frame(self._clean_frame[table_name], table):
+                return False, None
+
+        table_hash = self._row_hashes(table_name, table)
+        is_changed = not (
+            self._table_columns[table_name] == _column_signature(table)
+            and self._table_hash[table_name].equals(table_hash)
+        )
+        return is_changed, table_hash
+
+    def forget_fingerprints(self, table_names=None, keep=None):
+        """Removes fingerprints for tables that something other than this
+        DismodFile will change, such as Dismod-AT. The change to the
+        file happens on the next flush.
+
+        Args:
+            table_names (List[str]): Tables to forget. None means all tables.
+            keep (List[str]): Tables not to forget, when forgetting all tables.
+        """
+        fingerprints = self._stored_fingerprints()
+        if table_names is None:
+            forget = [name for name in fingerprints.keys() if name not in set(keep or list())]
+            self._read_from_file &= set(keep or list())
+        else:
+            forget = table_names
+            self._read_from_file -= set(table_names)
+        for table_name in forget:
+            if table_name in fingerprints:
+                del fingerprints[table_name]
+                self._fingerprints_changed = True
+
+    def table_versions(self, table_names):
+        """A version for each table, which changes when the table is assigned
+        or thrown away to read again from the file. Compare versions to learn,
+        without reading the tables, whether any of them could have changed
+        since a result was computed from them. Tables are assumed to be
+        assigned, not changed in place.
+
+        Args:
+            table_names (List[str]): Tables to look up.
+
+        Returns:
+            Tuple[int]: A version for each table, in order.
+        """
+        return tuple(self._table_version.get(table_name, 0) for table_name in table_names)
+
+    def _bump_versions(self, table_names):
+        for table_name in table_names:
+            self._table_version[table_name] = self._table_version.get(table_name, 0) + 1
+
+    def fingerprints(self, table_names):
+        """Fingerprints of tables as of the last flush. A fingerprint changes
+        whenever this DismodFile writes the table, and a table that
+        something else changed has none.
+
+        Args:
+            table_names (List[str]): Tables to look up.
+
+        Returns:
+            Tuple: A fingerprint, or None, for each table, in order.
+        """
+        fingerprints = self._stored_fingerprints()
+        return tuple(fingerprints.get(table_name) for table_name in table_names)
+
+    def current_fingerprints(self, table_names):
+        """Fingerprints of tables as they are in memory, which are what
+        ``fingerprints`` would return after a flush. This reads and hashes
+        only tables that don't already have a fingerprint. A table
+        read from the file, and unchanged, gets its fingerprint stored
+        on the next flush, so that a DismodFile on a copy of the file
+        finds it without reading the table. Tables are assumed to be
+        assigned, not changed in place.
+
+        Args:
+            table_names (List[str]): Tables to look up.
+
+        Returns:
+            Tuple: A fingerprint for each table, in order.
+        """
+        stored = self._stored_fingerprints()
+        current = list()
+        for table_name in table_names:
+            if table_name not in self._table_data and stored.get(table_name) is not None:
+                current.append(stored[table_name])
+                continue
+            unassigned = self._clean_version.get(table_name) == self._table_version.get(table_name, 0)
+            if unassigned and self._clean_fingerprint.get(table_name) is not None:
+                current.append(self._clean_fingerprint[table_name])
+                continue
+            table = getattr(self, table_name)
+            table_hash = self._row_hashes(table_name, table)
+            fingerprint = _fingerprint(table_hash, _column_signature(table))
+            unchanged = (
+                table_name in self._read_from_file
+                and self._table_columns[table_name] == _column_signature(table)
+                and self._table_hash[table_name].equals(table_hash)
+            )
+            if unchanged and stored.get(table_name) is None:
+                stored[table_name] = fingerprint
+                self._clean_fingerprint[table_name] = fingerprint
+                self._fingerprints_changed = True
+            current.append(fingerprint)
+        return tuple(current)
+
+    def _stored_fingerprints(self):
+        """Fingerprints from the file, read the first time they're needed.
+
+        Returns:
+            Dict[str,tuple]: From table name to row count, column types,
+            and content hash.
+        """
+        if self._fingerprints is None:
+            self._fingerprints = dict()
+            if self.engine is not None:
+                stored = self.read("c_table_fingerprint")
+                for row in stored[stored.version == FINGERPRINT_VERSION].itertuples():
+                    self._fingerprints[row.table_name] = (row.row_count, row.column_types, row.content_hash)
+        return self._fingerprints
+
+    def _matches_fingerprint(self, table_name, table, table_hash):
+        if self.engine is None:
             return False
+        stored = self._stored_fingerprints().get(table_name)
+        if stored is None or stored != _fingerprint(table_hash, _column_signature(table)):
+            return False
+        # The count is a cheap check that the table wasn't changed by something else.
+        # It misses changes that keep the row count, so anything that changes a
+        # table must forget its fingerprint.
+        try:
+            with self.engine.connect() as connection:
+                row_count = connection.execute(text(f'SELECT count(*) FROM "{table_name}"')).scalar()
+        except OperationalError:
+            CODELOG.debug(f"{table_name} has a fingerprint but isn't in the file")
+            return False
+        return row_count == stored[0]
+
+    def _write_fingerprints(self, writer):
+        fingerprints = self._stored_fingerprints()
+        fingerprint_table = pd.DataFrame(
+            [(name,) + fingerprint for (name, fingerprint) in sorted(fingerprints.items())],
+            columns=["table_name", "row_count", "column_types", "content_hash"],
+        ).assign(version=FINGERPRINT_VERSION)
+        fingerprint_table = fingerprint_table.assign(
+            c_table_fingerprint_id=fingerprint_table.index, row_count=fingerprint_table.row_count.astype(np.int64))
+        writer.replace_table(
+            "c_table_fingerprint", self._table_definitions["c_table_fingerprint"], fingerprint_table)
+        self._fingerprints_changed = False
+
+    def _mark_clean(self, table_name, table_hash, owned=False):
+        """Records that the table in memory matches the file.
 
+        Args:
+            table_name (str): The table.
+            table_hash (pd.Series): Its row hashes.
+            owned (bool): Whether this DismodFile made the frame, so that
+                nothing else shares its arrays. Read-only tables
+                keep a copy of a frame that isn't owned, and freeze that.
+        """
+        if self.read_only_tables and not owned:
+            self._table_data[table_name] = self._table_data[table_name].copy()
         table = self._table_data[table_name]
+        self._table_hash[table_name] = table_hash
+        self._table_columns[table_name] = _column_signature(table)
+        self._clean_version[table_name] = self._table_version.get(table_name, 0)
+        self._clean_fingerprint[table_name] = self._stored_fingerprints().get(table_name)
+        if self.read_only_tables:
+            self._clean_frame[table_name] = _freeze_frame(table)
+        else:
+            self._clean_frame.pop(table_name, None)
+
+    def _row_hashes(self, table_name, table):
+        """A hash for each row, indexed by the primary key of that row.
+        The index of the dataframe isn't part of the hash because
+        the primary key determines what is written."""
         try:
-            table_hash = pd.util.hash_pandas_object(table)
+            table_hash = pd.util.hash_pandas_object(table, index=False)
         except TypeError as te:
             if "mutable" in str(te):
                 CODELOG.warning(f"table {table_name} dtypes {table.dtypes}")
             raise DismodFileError(f"The table {table_name} has unexpected value while saving.") from te
+        primary_key = f"{table_name}_id"
+        if primary_key in table:
+            table_hash.index = pd.Index(table[primary_key].values)
+        return table_hash
 
-        is_new = table_name not in self._table_hash
-        if not is_new:
-            is_changed = not self._table_hash[table_name].equals(table_hash)
-        else:
-            is_changed = False
+    def _row_changes(self, table_name, table, table_hash):
+        """Finds which rows to insert, update, and delete in order to make the
+        table in the file match the table in memory.
 
-        return is_new or is_changed
+        Returns:
+            (pd.DataFrame, pd.DataFrame, np.ndarray): Inserted rows, updated
+            rows, and deleted primary keys, or None if the whole table
+            should be replaced.
+        """
+        if table_name not in self._table_hash:
+            return None
+        if self._table_columns[table_name] != _column_signature(table):
+            CODELOG.debug(f"Columns of {table_name} changed so replacing it")
+            return None
+        # Changing only some rows is right only if the file still has the rows
+        # this last read or wrote. Anything else that changes the table removes
+        # its fingerprint.
+        stored = self._stored_fingerprints().get(table_name)
+        if stored is None or stored != self._clean_fingerprint.get(table_name):
+            CODELOG.debug(f"The file may have a different {table_name} so replacing it")
+            return None
+        previous = self._table_hash[table_name]
+        if not (table_hash.index.is_unique and previous.index.is_unique):
+            return None
+        if table_hash.index.hasnans:
+            return None
+
+        exists = table_hash.index.isin(previous.index)
+        changed = np.ones(len(table_hash), dtype=np.bool)
+        changed[exists] = previous.loc[table_hash.index[exists]].values != table_hash.values[exists]
+        deleted = previous.index[~previous.index.isin(table_hash.index)].values
+        change_count = changed.sum() + len(deleted)
+        if change_count > self.row_change_limit * max(len(table_hash), len(previous)):
+            CODELOG.debug(f"{change_count} rows of {table_name} changed so replacing it")
+            return None
+        return table[changed & ~exists], table[changed & exists], deleted
 
     def flush(self):
         """Writes any data in memory to the underlying database. Data which has not been changed since
@@ -335,10 +1025,11 @@ class DismodFile:
         if self.engine is None:
             raise RuntimeError("Cannot flush db file tables before an engine is set "
                                "and the engine is None.")
-        with self.engine.begin() as connection:
+        with self._make_writer() as writer:
             CODELOG.debug(f"DismodFile has table data for {', '.join(sorted(self._table_data.keys()))}")
             for table_name in _ordered_by_foreign_key_dependency(Base.metadata, self._table_data.keys()):
-                if self._is_dirty(table_name):
+                is_dirty, table_hash = self._dirty_hash(table_name)
+                if is_dirty:
                     table = self._table_data[table_name]
                     if hasattr(table, "__readonly__") and table.__readonly__:
                         raise DismodFileError(f"Table '{table_name}' is not writable")
@@ -348,39 +1039,38 @@ class DismodFile:
                     extra_columns = set(table.columns.difference(table_definition.c.keys()))
                     if extra_columns:
                         self.update_table_columns(table_name, table)
+                        table_definition = self._table_definitions[table_name]
 
                     _validate_data(table_definition, table)
 
-                    # TODO: I'm re-calculating this hash for the sake of having a nice _is_dirty function.
-                    # That may be too expensive.
-                    table_hash = pd.util.hash_pandas_object(table)
-
-                    # In order to write the <table>_id column as a primary key,
-                    # we need to make the index not have a name and be of type
-                    # int64. That makes it write as a BIGINT, which the
-                    # sqlalchemy compiler turns into a primary key statement.
-                    if f"{table_name}_id" in table:
-                        table = table.set_index(f"{table_name}_id")
-                        try:
-                            table.index = table.index.astype(np.int64)
-                        except ValueError as ve:
-                            raise ValueError(f"Cannot convert {table_name}.{table_name}_id to index") from ve
-                    try:
-                        dtypes = {k: v.type for k, v in table_definition.c.items()}
-                        CODELOG.debug(f"Writing table {table_name} rows {len(table)} types {dtypes}")
-                        table.index.name = None
-                        table.to_sql(
-                            table_name, connection, index_label=f"{table_name}_id", if_exists="replace", dtype=dtypes
-                        )
-                    except StatementError:
-                        raise
-
-                    self._table_hash[table_name] = table_hash
+                    if table_hash is None:
+                        table_hash = self._row_hashes(table_name, table)
+
+                    changes = self._row_changes(table_name, table, table_hash)
+                    if changes is None:
+                        writer.replace_table(table_name, table_definition, table)
+                    else:
+                        writer.update_rows(table_name, table_definition, *changes)
+
+                    if table_name != "c_table_fingerprint":
+                        self._stored_fingerprints()[table_name] = _fingerprint(table_hash, _column_signature(table))
+                        self._fingerprints_changed = True
+                    self._mark_clean(table_name, table_hash)
                 else:
                     CODELOG.debug(f"{table_name} did not need to be written")
+            if self._fingerprints_changed:
+                self._write_fingerprints(writer)
 
         self._check_column_types_actually_written()
 
+    def _make_writer(self):
+        if self.writer == "sqlite3":
+            return SqliteWriter(self.engine, self.sqlite_pragmas)
+        elif self.writer == "pandas":
+            return PandasWriter(self.engine)
+        else:
+            raise ValueError(f"The DismodFile writer should be pandas or sqlite3, not {self.writer}.")
+
     def _check_column_types_actually_written(self):
         """
         They can be written differently than what you declare in metadata
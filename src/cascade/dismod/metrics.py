@@ -14,6 +14,13 @@ from .db.wrapper import DismodFile, get_engine
 
 CODELOG, MATHLOG = getLoggers(__name__)
 METRICS = list()
+METRIC_TABLES = [
+    "age", "avgint", "data", "integrand", "node", "nslist_pair",
+    "option", "rate", "smooth", "time", "var",
+]
+"""Tables the metrics read, so the metrics change only when one of these
+changes. The ``age_avg`` table is missing because every command rewrites
+it, but its size follows from the age table and options."""
 
 
 def metric(retrieval):
@@ -26,38 +33,40 @@ def metric(retrieval):
 def age_integration_points(db_file):
     """This table is re-created by every Dismod-AT function to contain
     the total number of age integration points."""
-    return len(db_file.age_avg)
+    return db_file.row_count("age_avg")
 
 
 @metric
 def age_extent(db_file):
     """Maximum age minus minimum age."""
-    age = db_file.age
+    age = db_file.read("age", ["age"])
     return age.age.max() - age.age.min()
 
 
 @metric
 def time_extent(db_file):
     """Maximum time minus minimum time."""
-    time = db_file.time
+    time = db_file.read("time", ["time"])
     return time.time.max() - time.time.min()
 
 
 @metric
 def smooth_count(db_file):
     """Total number of Smooth Grids, which are grids of prior distributions."""
-    return len(db_file.smooth)
+    return db_file.row_count("smooth")
 
 
 @metric
 def children(db_file):
     """Count of the number of child locations."""
-    option = db_file.option
+    option = db_file.read(
+        "option", ["option_name", "option_value"],
+        dict(option_name=["parent_node_id", "parent_node_name"]))
     # The file may have either the parent_node_id or parent_name set,
     # and it might be "none" as a string, or "", or None.
     parent_id = option[option.option_name == "parent_node_id"].option_value.iloc[0]
     parent_name = option[option.option_name == "parent_node_name"].option_value.iloc[0]
-    node = db_file.node
+    node = db_file.read("node", ["node_name", "parent"])
     try:
         parent_node_id = int(parent_id)
     except ValueError:
@@ -79,7 +88,8 @@ def children(db_file):
 @metric
 def rate_count(db_file):
     """How many rates are nonzero."""
-    return len(db_file.rate[db_file.rate.parent_smooth_id.notnull()])
+    rate = db_file.read("rate", ["parent_smooth_id"])
+    return int(rate.parent_smooth_id.notnull().sum())
 
 
 @metric
@@ -110,21 +120,23 @@ def random_effect_points(db_file):
 @metric
 def variables(db_file):
     """Total number of variables to solve for."""
-    return len(db_file.var)
+    return db_file.row_count("var")
 
 
 @metric
 def avgint(db_file):
     """How many predictions to make."""
-    return len(db_file.avgint)
+    return db_file.row_count("avgint")
 
 
 def data_records(db_file):
     """Data records counts. Extent marks those that have either age
     or time extent, and cohort marks those that are more expensive
     than the primary rates."""
-    integrand = db_file.integrand.reset_index(drop=True)
-    data = db_file.data.merge(integrand, on="integrand_id", how="left")
+    integrand = db_file.read("integrand", ["integrand_id", "integrand_name"]).reset_index(drop=True)
+    data = db_file.read(
+        "data", ["integrand_id", "age_lower", "age_upper", "time_lower", "time_upper"]
+    ).merge(integrand, on="integrand_id", how="left")
     has_extent = ((data.age_upper != data.age_lower) |
                   (data.time_lower != data.time_upper))
     cohort_cost = {k for (k, v) in INTEGRAND_COHORT_COST.items() if v}
@@ -148,8 +160,8 @@ def options(db_file):
         "tolerance_random", "quasi_fixed", "bound_frac_fixed",
         "limited_memory_max_fixed", "bound_random",
     }
-    opt = db_file.option[["option_name", "option_value"]]
-    return dict(opt[opt.option_name.isin(relevant)].to_records(index=False))
+    opt = db_file.read("option", ["option_name", "option_value"], dict(option_name=sorted(relevant)))
+    return dict(opt.to_records(index=False))
 
 
 def gather_metrics(db_file):
@@ -1,6 +1,7 @@
 from collections import defaultdict
 
 import numpy as np
+import pandas as pd
 from numpy import inf
 
 from cascade.core.log import getLoggers
@@ -15,27 +16,20 @@ def rectangular_data_to_var(gridded_data):
     """Using this very regular data, where every age and time is present,
     construct an initial guess as a Var object. Very regular means that there
     is a complete set of ages-cross-times."""
-    try:
-        initial_ages = np.sort(
-            np.unique(0.5 * (gridded_data.age_lower + gridded_data.age_upper))
-        )
-        initial_times = np.sort(
-            np.unique(0.5 * (gridded_data.time_lower + gridded_data.time_upper))
-        )
-    except AttributeError:
+    missing = {"age_lower", "age_upper", "time_lower", "time_upper", "mean"} - set(gridded_data.columns)
+    if missing:
         CODELOG.error(f"Data to make a var has columns {gridded_data.columns}")
         raise RuntimeError(
             f"Wrong columns in rectangular_data_to_var {gridded_data.columns}")
 
-    guess = Var(ages=initial_ages, times=initial_times)
-    for age, time in guess.age_time():
-        found = gridded_data.query(
-            "(age_lower <= @age) & (@age <= age_upper) & "
-            "(time_lower <= @time) & (@time <= time_upper)"
-        )
-        assert len(found) == 1, f"found {found}"
-        guess[age, time] = float(found.iloc[0]["mean"])
-    return guess
+    # Each row covers the midpoint of its own interval, so the midpoints
+    # line the rows up with the grid.
+    midpoints = pd.DataFrame(dict(
+        age=0.5 * (gridded_data.age_lower.values + gridded_data.age_upper.values),
+        time=0.5 * (gridded_data.time_lower.values + gridded_data.time_upper.values),
+        mean=gridded_data["mean"].values,
+    ))
+    return Var.from_frame(midpoints)
 
 
 def const_value(value):
@@ -181,8 +175,9 @@ def constraint_from_rectangular_data(rate_var, default_age_time):
         rate_var: A function of age and time to represent a rate.
     """
     omega_grid = SmoothGrid(ages=default_age_time["age"], times=default_age_time["time"])
-    for age, time in omega_grid.age_time():
-        omega_grid.value[age, time] = Constant(rate_var(age, time))
+    rates = np.array([[rate_var(age, time) for time in omega_grid.times] for age in omega_grid.ages], dtype=np.float)
+    # This is a Constant prior at every point.
+    omega_grid.value.set_parameters(density=Constant.density, mean=rates, lower=rates, upper=rates)
     return omega_grid
 
 
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from shutil import copyfile
 from timeit import default_timer as timer
 from types import SimpleNamespace
 
@@ -27,6 +28,8 @@ from cascade.input_data.db.locations import (
 )
 from cascade.input_data.db.study_covariates import get_study_covariates
 from cascade.model import ObjectWrapper
+from cascade.model.data_read_write import harvest_predict
+from cascade.model.grid_read_write import harvest_vars
 from cascade.model.integrands import make_average_integrand_cases_from_gbd
 from cascade.saver.save_prediction import save_predicted_value, uncertainty_from_prediction_draws
 
@@ -249,7 +252,9 @@ def compute_parent_fit_fixed(execution_context, db_path, local_settings, input_d
     CODELOG.info(f"fit fixed {timer() - begin}")
 
 
-def compute_parent_fit(execution_context, db_path, local_settings, simulate_idx=None):
+def compute_parent_fit(
+        execution_context, db_path, local_settings, simulate_idx=None, simulate=True
+):
     """
 
     Args:
@@ -257,12 +262,14 @@ def compute_parent_fit(execution_context, db_path, local_settings, simulate_idx=
         input_data: These include observations and initial guess.
         model (Model): A complete Model object.
         simulate_idx (int): Which simulation to fit.
+        simulate (bool): Whether to simulate data for draws to fit. There
+            is no need when uncertainty comes from asymptotic samples.
 
     Returns:
         The fit.
     """
     begin = timer()
-    dismod_objects = ObjectWrapper(str(db_path))
+    dismod_objects = ObjectWrapper(str(db_path), read_only_tables=True)
     dismod_objects.set_option(**make_options(local_settings.settings, local_settings.model_options))
     fit_var = dismod_objects.fit_var
     dismod_objects.start_var = fit_var
@@ -285,22 +292,83 @@ def compute_parent_fit(execution_context, db_path, local_settings, simulate_idx=
     dismod_objects.truth_var = dismod_objects.fit_var
     dismod_objects.run_dismod(["predict", "truth_var"])
 
-    draw_cnt = local_settings.number_of_fixed_effect_samples
-    dismod_objects.run_dismod(["simulate", str(draw_cnt)])
+    if simulate:
+        draw_cnt = local_settings.number_of_fixed_effect_samples
+        dismod_objects.run_dismod(["simulate", str(draw_cnt)])
+
+
+def gather_simulations_and_fit(fit_path, simulation_paths, predict_path):
+    """Reads predictions from the fit and predicts for every draw at once,
+    with :py:func:`predict_draws_together`.
+
+    Args:
+        fit_path (Path): Db file for the fit.
+        simulation_paths (List[Path]): Db file for each draw.
+        predict_path (Path): Db file in which to predict the draws.
+
+    Returns:
+        (pd.DataFrame, List[pd.DataFrame]): Predictions for the fit and
+        predictions for the draws, which are one DataFrame where
+        ``sample_index`` identifies the draw.
+    """
+    pred_fit = harvest_predict([fit_path])[0][0]
+    predictions = predict_draws_together(fit_path, simulation_paths, predict_path)
+    return pred_fit, [predictions]
 
 
-def gather_simulations_and_fit(fit_path, simulation_paths):
-    predictions = list()
-    for draw_path in simulation_paths:
-        draw_objects = ObjectWrapper(str(draw_path))
-        predicted, not_predicted = draw_objects.predict
-        predictions.append(predicted)
-        draw_objects.close()
+def predict_draws_together(fit_path, draw_paths, predict_path):
+    """Predicts from the fit of every draw with one run of Dismod-AT.
+    This reads the fit from each draw's db file, writes them all to the
+    sample table of one copy of the fit's db file, and runs
+    ``predict sample`` on that copy. All of these are copies of one
+    db file, so they share the layout of the var table, and the fits
+    are read with :py:func:`cascade.model.grid_read_write.harvest_vars`
+    straight into that layout.
 
-    fit_objects = ObjectWrapper(str(fit_path))
-    pred_fit, not_pred_fit = fit_objects.predict
-    fit_objects.close()
-    return pred_fit, predictions
+    Args:
+        fit_path (Path): Db file for the fit, which has the avgint table.
+        draw_paths (List[Path]): Db file for each draw, after its fit.
+        predict_path (Path): Where to write the db file that predicts.
+
+    Returns:
+        pd.DataFrame: Predictions for all draws, with a ``sample_index``
+        that is the position of the draw in the list.
+    """
+    begin = timer()
+    copyfile(str(fit_path), str(predict_path))
+    predict_objects = ObjectWrapper(str(predict_path), read_only_tables=True)
+    predict_objects.samples = harvest_vars(draw_paths, predict_objects.var_layout, "fit")
+    predict_objects.run_dismod(["predict", "sample"])
+    predicted, _not_predicted = predict_objects.predict
+    predict_objects.close()
+    CODELOG.info(f"predict {len(draw_paths)} draws {timer() - begin}")
+    return predicted
+
+
+def predict_asymptotic_samples(fit_path, predict_path, sample_cnt):
+    """Predicts for samples from the asymptotic distribution of the fit,
+    as an alternative to fitting each of a set of simulations.
+    Dismod-AT draws the samples around the fit, using the information
+    matrix of the fit, and predicts for all of them in one more run.
+    This works on a copy of the fit's db file.
+
+    Args:
+        fit_path (Path): Db file for the fit.
+        predict_path (Path): Where to write the db file that samples and predicts.
+        sample_cnt (int): How many samples to draw.
+
+    Returns:
+        pd.DataFrame: Predictions for all samples, with a ``sample_index``.
+    """
+    begin = timer()
+    copyfile(str(fit_path), str(predict_path))
+    dismod_objects = ObjectWrapper(str(predict_path))
+    dismod_objects.run_dismod(["sample", "asymptotic", str(sample_cnt)])
+    dismod_objects.run_dismod(["predict", "sample"])
+    predicted, _not_predicted = dismod_objects.predict
+    dismod_objects.close()
+    CODELOG.info(f"sample asymptotic and predict {sample_cnt} {timer() - begin}")
+    return predicted
 
 
 def save_outputs(
@@ -312,10 +380,26 @@ def save_outputs(
     )
 
 
-def fit_and_predict_fixed_effect_sample(db_path, draw_idx):
+def fit_draw(db_path, simulate_idx, db_only=False):
+    """Fits one draw, in a copy of the parent's db file. The parent
+    already set options, ran ``init``, and simulated data for every draw,
+    so this runs only ``fit both`` on the draw's simulation, which starts
+    from the same ``start_var`` that ``init`` made for the parent.
+    Draws are predicted together by ``predict_draws_together``.
+
+    Args:
+        db_path (Path): Copy of the parent's db file.
+        simulate_idx (int): Which simulation to fit, zero-based.
+        db_only (bool): Don't run the fit.
+    """
+    begin = timer()
     dismod_objects = ObjectWrapper(str(db_path))
-    # -1 because we are using 1-based draw index and Dismod-AT is zero-based.
-    dismod_objects.run_dismod(["fit", str(draw_idx - 1)])
-    dismod_objects.avgint = None  # Need to make an avgint table.
-    dismod_objects.truth_var = dismod_objects.fit_var
-    dismod_objects.run_dismod(["predict"])
+    if db_only:
+        MATHLOG.info(f"Ran with db_only so not running dismod fit both on {db_path}.")
+        dismod_objects.close()
+        return
+    stdout, stderr, _metrics = dismod_objects.run_dismod(["fit", "both", str(simulate_idx)])
+    CODELOG.debug(stdout)
+    CODELOG.debug(stderr)
+    dismod_objects.close()
+    CODELOG.info(f"fit draw {simulate_idx} {timer() - begin}")
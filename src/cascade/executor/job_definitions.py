@@ -13,10 +13,11 @@ from cascade.executor.covariate_description import create_covariate_specificatio
 from cascade.executor.estimate_location import (
     retrieve_data, modify_input_data, compute_parent_fit_fixed,
     compute_parent_fit, gather_simulations_and_fit, save_outputs,
-    one_location_data_from_global_data,
+    one_location_data_from_global_data, predict_asymptotic_samples, fit_draw,
 )
 from cascade.executor.priors_from_draws import set_priors_from_parent_draws
 from cascade.input_data.configuration.raw_input import validate_input_data_types
+from cascade.model.data_read_write import harvest_predict
 from cascade.runner.data_passing import ShelfFile, PandasFile, DbFile
 from cascade.runner.job_graph import CascadeJob, recipe_graph_to_job_graph
 
@@ -214,6 +215,7 @@ class FindBothMAP(CascadeJob):
             self.execution_context,
             self.inputs["db_file"].path,
             self.local_settings,
+            simulate=not uses_asymptotic_samples(self.local_settings),
         )
 
 
@@ -258,12 +260,7 @@ class ConstructDraw(CascadeJob):
             )
         copyfile(self.inputs["db_file"].path, draw_db)
         zero_based_dismod_simulation_idx = self.task_id - 1
-        compute_parent_fit(
-            self.execution_context,
-            draw_db,
-            self.local_settings,
-            simulate_idx=zero_based_dismod_simulation_idx,
-        )
+        fit_draw(draw_db, zero_based_dismod_simulation_idx, db_only=self.local_settings.run.db_only)
 
 
 class Summarize(CascadeJob):
@@ -275,17 +272,19 @@ class Summarize(CascadeJob):
         self.inputs.update(dict(
             db_file=DbFile(execution_context, "fit.db", parent_location_id, recipe_id.sex),
         ))
-        for draw_idx in range(draw_cnt):
+        for draw_idx in range(1, 1 + draw_cnt):
             draw_file = DbFile(execution_context, f"draw{draw_idx}.db", parent_location_id, recipe_id.sex)
             self.inputs[f"draw_file{draw_idx}"] = draw_file
         self.outputs.update(dict(
-            summary=PandasFile(execution_context, "summary.hdf", parent_location_id, recipe_id.sex)
+            summary=PandasFile(execution_context, "summary.hdf", parent_location_id, recipe_id.sex),
+            predict_db=DbFile(execution_context, "predict.db", parent_location_id, recipe_id.sex),
         ))
 
     def run_under_mathlog(self):
         fit_result, predictions = gather_simulations_and_fit(
             self.inputs["db_file"].path,
-            [self.inputs[draw].path for draw in self.inputs if draw.startswith("draw")]
+            [self.inputs[draw].path for draw in self.inputs if draw.startswith("draw")],
+            self.outputs["predict_db"].path,
         )
         save_outputs(
             fit_result,
@@ -296,6 +295,44 @@ class Summarize(CascadeJob):
         )
 
 
+class SummarizeAsymptotic(CascadeJob):
+    """Takes draws from the asymptotic distribution of the fit, instead of
+    refitting simulated data, predicts for all of them, and summarizes.
+    This one job replaces the draw task array and its summary."""
+    def __init__(self, recipe_id, local_settings, neighbors, execution_context):
+        super().__init__("summarize_asymptotic", recipe_id, local_settings, execution_context)
+        parent_location_id = local_settings.parent_location_id
+        self.inputs.update(dict(
+            db_file=DbFile(execution_context, "fit.db", parent_location_id, recipe_id.sex),
+        ))
+        self.outputs.update(dict(
+            summary=PandasFile(execution_context, "summary.hdf", parent_location_id, recipe_id.sex),
+            predict_db=DbFile(execution_context, "predict.db", parent_location_id, recipe_id.sex),
+        ))
+
+    def run_under_mathlog(self):
+        fit_path = self.inputs["db_file"].path
+        fit_result = harvest_predict([fit_path])[0][0]
+        predictions = predict_asymptotic_samples(
+            fit_path,
+            self.outputs["predict_db"].path,
+            self.local_settings.number_of_fixed_effect_samples,
+        )
+        save_outputs(
+            fit_result,
+            [predictions],
+            self.execution_context,
+            self.local_settings,
+            self.outputs["summary"].path,
+        )
+
+
+def uses_asymptotic_samples(local_settings):
+    """Whether uncertainty comes from asymptotic samples of the fit,
+    instead of from fits to simulated data."""
+    return getattr(local_settings.policies, "uncertainty_strategy", None) == "asymptotic"
+
+
 def recipe_to_jobs(
         recipe_identifier, local_settings, neighbors, included_locations, execution_context
 ):
@@ -337,10 +374,14 @@ def recipe_to_jobs(
                 FindSingleMAP(
                     recipe_identifier, local_settings, neighbors, execution_context
                 ))
-        sub_jobs.extend([
-            ConstructDraw(recipe_identifier, local_settings, execution_context),
-            Summarize(recipe_identifier, local_settings, neighbors, execution_context),
-        ])
+        if uses_asymptotic_samples(local_settings):
+            sub_jobs.append(
+                SummarizeAsymptotic(recipe_identifier, local_settings, neighbors, execution_context))
+        else:
+            sub_jobs.extend([
+                ConstructDraw(recipe_identifier, local_settings, execution_context),
+                Summarize(recipe_identifier, local_settings, neighbors, execution_context),
+            ])
     else:
         raise RuntimeError(f"Unknown recipe identifier {recipe_identifier}")
     return sub_jobs
@@ -1,7 +1,9 @@
-import itertools as it
 import numpy as np
 
 from cascade.core.log import getLoggers
+from cascade.model.priors import Constant, DENSITY_ID_TO_PRIOR, prior_distribution
+from cascade.model.sample_set import SampleSet
+from cascade.model.var import interpolate_vars
 
 CODELOG, MATHLOG = getLoggers(__name__)
 
@@ -25,7 +27,7 @@ def set_priors_from_draws(model, draws):
 
     Args:
         model (Model): A complete model for this location. It will be modified.
-        draws (List[DismodGroups]): A list of fits to this location.
+        draws (List[DismodGroups]|SampleSet): Fits to this location.
     """
     if draws is None:
         return
@@ -49,7 +51,7 @@ def set_priors_from_parent_draws(model, draws):
 
     Args:
         model (Model): A complete model for this location. It will be modified.
-        draws (List[DismodGroups]): A list of fits to the parent of this location.
+        draws (List[DismodGroups]|SampleSet): Fits to the parent of this location.
     """
     if draws is None:
         return
@@ -90,6 +92,14 @@ class DrawFunction:
     def __call__(self, idx, age, time):
         return self._draws[idx][self._group][self._key](age, time)
 
+    def on_grid(self, ages, times):
+        """All draws at every combination of ages and times.
+
+        Returns:
+            np.ndarray: With shape (draws, ages, times).
+        """
+        return _draws_on_grid(self._draws, self._group, self._key, ages, times)
+
 
 class RandomEffectDrawFunction:
     """This applies rate = underlying x exp(random effect)."""
@@ -107,6 +117,24 @@ class RandomEffectDrawFunction:
         random_effect = self._draws[idx]["random_effect"][(self._key, self._location)](age, time)
         return underlying * np.exp(random_effect)
 
+    def on_grid(self, ages, times):
+        """All draws at every combination of ages and times.
+
+        Returns:
+            np.ndarray: With shape (draws, ages, times).
+        """
+        underlying = _draws_on_grid(self._draws, self._group, self._key, ages, times)
+        random_effect = _draws_on_grid(self._draws, "random_effect", (self._key, self._location), ages, times)
+        return underlying * np.exp(random_effect)
+
+
+def _draws_on_grid(draws, group, key, ages, times):
+    """One random field of every draw at every combination of ages and times.
+    The draws are either a SampleSet or a list of DismodGroups of Vars."""
+    if isinstance(draws, SampleSet):
+        return draws.on_grid(group, key, ages, times)
+    return interpolate_vars([draw[group][key] for draw in draws], ages, times)
+
 
 def gather_draws_for_grid(draws, ages, times):
     """Gather data from incoming draws into an array of (draw, age, time)
@@ -121,12 +149,7 @@ def gather_draws_for_grid(draws, ages, times):
         of shape (age, time, draws) where the second two have one-fewer ages
         and one-fewer times.
     """
-    draw_data = np.zeros((len(draws), len(ages), len(times)))
-    for didx in range(len(draws)):
-        for aidx, age in enumerate(ages):
-            for tidx, time in enumerate(times):
-                draw_data[didx, aidx, tidx] = draws(didx, age, time)
-
+    draw_data = draws.on_grid(ages, times)
     draw_data = draw_data.transpose([1, 2, 0])
     draw_dage = np.diff(draw_data, n=1, axis=0)
     draw_dtime = np.diff(draw_data, n=1, axis=1)
@@ -134,10 +157,60 @@ def gather_draws_for_grid(draws, ages, times):
 
 
 def estimate_grid_parameters(grid_priors, draws, ages, times):
+    """Sets each prior in the grid to its maximum likelihood estimate
+    from the draws at that grid point. All points with the same kind of
+    prior are estimated at once, with that prior's ``batch_mle``.
+
+    Args:
+        grid_priors (_PriorGrid): The priors to change.
+        draws (np.ndarray): With shape (ages, times, draws).
+        ages (np.ndarray): Ages of the grid to set, which may be
+            fewer than those of the grid, as for age differences.
+        times (np.ndarray): Times of the grid to set.
+    """
     assert isinstance(draws, np.ndarray)
     assert len(draws.shape) == 3
 
-    for aidx, tidx in it.product(range(len(ages)), range(len(times))):
-        age = ages[aidx]
-        time = times[tidx]
-        grid_priors[age, time] = grid_priors[age, time].mle(draws[aidx, tidx, :])
+    if len(ages) == 0 or len(times) == 0:
+        return
+    # The ages and times to set are the first ones on the grid.
+    block = (slice(0, len(ages)), slice(0, len(times)))
+    assert np.allclose(grid_priors.ages[block[0]], ages) and np.allclose(grid_priors.times[block[1]], times)
+    draws = draws[:len(ages), :len(times), :]
+    planes = {column: grid_priors.to_array(column) for column in grid_priors.columns}
+    block_planes = {column: plane[block] for column, plane in planes.items()}
+
+    constant = np.isclose(block_planes["lower"], block_planes["upper"])
+    density = block_planes["density"]
+    families = [(constant, Constant)] + [
+        (~constant & (density == prior_class.density), prior_class)
+        for prior_class in DENSITY_ID_TO_PRIOR.values()
+    ]
+    estimated = np.zeros_like(constant)
+    for in_family, prior_class in families:
+        if not in_family.any():
+            continue
+        estimated |= in_family
+        point_idx = np.nonzero(in_family)
+        example = _prior_at(block_planes, (point_idx[0][0], point_idx[1][0]))
+        family_parameters = prior_class.batch_mle(
+            draws[point_idx],
+            *[block_planes[bound][point_idx] for bound in ["lower", "upper", "nu"]]
+        )
+        for column, values in family_parameters.items():
+            block_planes[column][point_idx] = values
+        # Setting a prior unsets the columns that aren't its parameters.
+        for column in set(grid_priors.columns) - set(example.parameters().keys()):
+            block_planes[column][point_idx] = np.nan
+
+    if not estimated.all():
+        raise ValueError(f"Cannot estimate priors with densities {set(density[~estimated])}.")
+
+    # The block planes are views into the planes.
+    for column, plane in planes.items():
+        grid_priors.set_plane(column, plane)
+
+
+def _prior_at(planes, point):
+    return prior_distribution({column: plane[point] for column, plane in planes.items()})
+
@@ -318,6 +318,12 @@ class Policies(Form):
         display="number of most recent iterations taken into account for quasi-Newton"
     )
     fit_strategy = OptionField(["fit", "fit_fixed_then_fit"], default="fit", constructor=int, nullable=True)
+    uncertainty_strategy = OptionField(
+        ["simulate_and_fit", "asymptotic"],
+        default="simulate_and_fit",
+        display="Whether draws refit simulated data or sample the fit's asymptotic distribution",
+        nullable=True
+    )
     decomp_step = StrField(nullable=True, default="step1")
     gbd_round_id = IntField(nullable=True, default=6)
 
@@ -1,5 +1,4 @@
 from datetime import timedelta
-from itertools import product
 from math import nan, inf
 
 import numpy as np
@@ -34,10 +33,16 @@ class AgeTimeGrid:
 
     >>> atg[:, :]["mean"] = [5.9]
 
-    Why is this in Pandas, when it's a regular array of data with an
-    index, which makes it better suited to XArray, or even a
-    Numpy array? It needs to interface with a database representation,
-    and Pandas is a better match there.
+    The values live in a dense array with one plane per column,
+    indexed by the position of the age and time. The ``grid`` DataFrame,
+    with ``age``, ``time``, and the columns, is made when it's asked for,
+    because it's the interface to a database representation.
+    Once code has that DataFrame, or assigns a new one, the DataFrame is
+    the state of the grid. Changes to it show up in the grid, and changes
+    to the grid are written into it, so the grid reads the DataFrame each
+    time it needs values, much as it would with no array. If the DataFrame
+    doesn't have one row per age and time, setting values changes only
+    the matching rows.
     """
     def __init__(self, ages, times, columns):
         try:
@@ -55,12 +60,17 @@ class AgeTimeGrid:
         for col_is_str in self.columns:
             if not isinstance(col_is_str, str):
                 raise TypeError(f"{type_constraint} {col_is_str}")
-        age_time = np.array(list(product(sorted(self.ages), sorted(self.times))))
-        self.grid = pd.DataFrame(dict(
-            age=age_time[:, 0],
-            time=age_time[:, 1],
-        ))
-        self.grid = self.grid.assign(**{new_col: nan for new_col in columns})
+        # Either the array or the frame is the current state. When both
+        # exist, the frame is a copy of the array nobody else has seen.
+        # A frame someone else has seen is checked out, and it is the
+        # current state from then on.
+        self._values = np.full((len(self.ages), len(self.times), len(self.columns)), nan, dtype=np.float)
+        self._frame = None
+        self._checked_out = False
+        # Columns of an assigned frame that aren't age, time, or one of
+        # the columns, in age-time order, and the frame's column order.
+        self._extra = dict()
+        self._frame_columns = ["age", "time"] + self.columns
         self._mulstd = dict()
         # Each mulstd is one record.
         for kind in PriorKindEnum:
@@ -71,6 +81,97 @@ class AgeTimeGrid:
             mulstd_df = mulstd_df.assign(**{new_col: nan for new_col in columns})
             self._mulstd[kind.name] = mulstd_df
 
+    @property
+    def grid(self):
+        """pd.DataFrame: One row per age and time, with columns ``age``,
+        ``time``, and the columns of this grid. Changes to this DataFrame
+        change the grid."""
+        frame = self._as_frame()
+        self._values = None
+        self._checked_out = True
+        return frame
+
+    @grid.setter
+    def grid(self, frame):
+        self._set_frame(frame, checked_out=True)
+
+    def _set_frame(self, frame, checked_out):
+        """Makes the frame the state of the grid. Subclasses that make
+        a frame nobody else has pass ``checked_out=False``, so that the grid
+        goes back to working from its array."""
+        self._frame = frame
+        self._values = None
+        self._extra = dict()
+        self._checked_out = checked_out
+
+    def _as_frame(self):
+        """The current DataFrame, made from the array if needed. This
+        doesn't hand the frame out, so the array stays current."""
+        if self._frame is None:
+            age_cnt, time_cnt = len(self.ages), len(self.times)
+            data = dict(age=np.repeat(self.ages, time_cnt), time=np.tile(self.times, age_cnt))
+            flat = self._values.reshape((age_cnt * time_cnt, len(self.columns)))
+            for column_idx, column in enumerate(self.columns):
+                data[column] = flat[:, column_idx]
+            data.update(self._extra)
+            frame = pd.DataFrame(data, columns=self._frame_columns)
+            if self._values.dtype == np.object:
+                frame = frame.infer_objects()
+            self._frame = frame
+        return self._frame
+
+    def _array(self):
+        """The array of values, with shape (ages, times, columns),
+        read back from the DataFrame if the DataFrame was handed out.
+        While the DataFrame is checked out, this is a new array each time,
+        and changing it doesn't change the grid.
+
+        Returns:
+            np.ndarray: Or None if the DataFrame doesn't have exactly one
+            row for each age and time in the grid.
+        """
+        if self._values is None:
+            frame = self._frame
+            position = self._frame_positions(frame)
+            if position is None:
+                return None
+            age_cnt, time_cnt = len(self.ages), len(self.times)
+            data = frame[self.columns]
+            if all(kind.kind in "biuf" for kind in data.dtypes):
+                dtype = np.result_type(*data.dtypes)
+            else:
+                dtype = np.object
+            values = np.empty((age_cnt * time_cnt, len(self.columns)), dtype=dtype)
+            values[position] = data.values
+            self._extra = dict()
+            for extra in frame.columns.difference(["age", "time"] + self.columns):
+                extra_values = np.empty((age_cnt * time_cnt,), dtype=frame[extra].dtype)
+                extra_values[position] = frame[extra].values
+                self._extra[extra] = extra_values
+            self._frame_columns = list(frame.columns)
+            values = values.reshape((age_cnt, time_cnt, len(self.columns)))
+            if self._checked_out:
+                return values
+            self._values = values
+            self._frame = None
+        return self._values
+
+    def _frame_positions(self, frame):
+        """For each row of the frame, its flat offset into the grid,
+        or None if the rows aren't exactly the ages and times of the grid."""
+        if not {"age", "time"}.issubset(frame.columns) or set(self.columns) - set(frame.columns):
+            return None
+        if len(frame) != len(self.ages) * len(self.times) or frame.columns.has_duplicates:
+            return None
+        age_idx = _exact_index(self.ages, frame["age"].values)
+        time_idx = _exact_index(self.times, frame["time"].values)
+        if age_idx is None or time_idx is None:
+            return None
+        position = age_idx * len(self.times) + time_idx
+        if len(np.unique(position)) != len(position):
+            return None
+        return position
+
     @property
     def mulstd(self):
         return self._mulstd
@@ -86,6 +187,23 @@ class AgeTimeGrid:
         Returns:
             pd.DataFrame or pd.Series with columns.
         """
+        age, time = self._point_key(age_time)
+        values = self._array()
+        if values is None:
+            grid = self._frame
+            rows = grid.query("age == @age and time == @time")
+            if len(rows) > 0:
+                return rows[self.columns]
+            else:
+                raise KeyError(f"Age {age} and time {time} not found.")
+        age_idx, time_idx = self._point_index(age, time)
+        row = pd.DataFrame(
+            values[age_idx:age_idx + 1, time_idx], columns=self.columns,
+            index=[age_idx * len(self.times) + time_idx],
+        )
+        return row.infer_objects() if values.dtype == np.object else row
+
+    def _point_key(self, age_time):
         try:
             age, time = age_time
         except TypeError as te:
@@ -95,11 +213,26 @@ class AgeTimeGrid:
                 raise
         if isinstance(age, slice) or isinstance(time, slice):
             raise TypeError(f"Cannot get a slice from an AgeTimeGrid.")
-        rows = self.grid.query("age == @age and time == @time")
-        if len(rows) > 0:
-            return rows[self.columns]
-        else:
+        return age, time
+
+    def _point_index(self, age, time):
+        """Offsets of an age and time that are exactly on the grid."""
+        age_idx = _exact_index(self.ages, age)
+        time_idx = _exact_index(self.times, time)
+        if age_idx is None or time_idx is None:
             raise KeyError(f"Age {age} and time {time} not found.")
+        return int(age_idx), int(time_idx)
+
+    def _point_values(self, age_time):
+        """The columns at one age and time, as a dictionary.
+        This is what ``__getitem__`` returns, without making a DataFrame."""
+        age, time = self._point_key(age_time)
+        values = self._array()
+        if values is None:
+            row = self[age, time]
+            return {column: row[column].iloc[0] for column in self.columns}
+        age_idx, time_idx = self._point_index(age, time)
+        return dict(zip(self.columns, values[age_idx, time_idx]))
 
     def __setitem__(self, at_slice, value):
         """
@@ -122,15 +255,112 @@ class AgeTimeGrid:
             start = one_slice.start if one_slice.start is not None else -inf
             stop = one_slice.stop if one_slice.stop is not None else inf
             at_range.append([start - GRID_SNAP_DISTANCE, stop + GRID_SNAP_DISTANCE])
-        ages = self.ages[(at_range[0][0] <= self.ages) & (self.ages <= at_range[0][1])]
-        times = self.times[(at_range[1][0] <= self.times) & (self.times <= at_range[1][1])]
-        if len(ages) == 0:
+        # Both ends of the range are inclusive.
+        age_slice, time_slice = [
+            slice(np.searchsorted(axis, lower, side="left"), np.searchsorted(axis, upper, side="right"))
+            for (axis, (lower, upper)) in zip([self.ages, self.times], at_range)
+        ]
+        if age_slice.start >= age_slice.stop:
             raise ValueError(f"No ages within range {at_range[0]} "
                              "Are you looking for a point not in the grid?")
-        if len(times) == 0:
+        if time_slice.start >= time_slice.stop:
             raise ValueError(f"No times within range {at_range[1]} "
                              "Are you looking for a point not in the grid?")
-        self.grid.loc[np.in1d(self.grid.age, ages) & np.in1d(self.grid.time, times), self.columns] = value
+        if self._array() is None:
+            grid = self._frame
+            ages = self.ages[age_slice]
+            times = self.times[time_slice]
+            grid.loc[np.in1d(grid.age, ages) & np.in1d(grid.time, times), self.columns] = value
+            return
+        self._store((age_slice, time_slice), value)
+
+    def to_array(self, column=None):
+        """The values of one column at every age and time.
+
+        >>> atg = AgeTimeGrid([0, 10], [2000, 2005, 2010], ["mean", "std"])
+        >>> atg[:, :] = [0.1, 0.01]
+        >>> assert atg.to_array("std").shape == (2, 3)
+
+        Args:
+            column (str): Which column. Defaults to the first column.
+
+        Returns:
+            np.ndarray: With shape (ages, times), where the ages and times
+            are in increasing order. This is a copy.
+        """
+        column_idx = self._column_index(column if column is not None else self.columns[0])
+        values = self._array()
+        if values is None:
+            raise ValueError("The grid doesn't have one row per age and time, so it isn't an array.")
+        plane = values[:, :, column_idx]
+        if plane.dtype == np.object:
+            try:
+                return plane.astype(np.float)
+            except (TypeError, ValueError):
+                pass
+        return plane.copy()
+
+    def set_plane(self, column, values):
+        """Set one column at every age and time at once.
+
+        >>> atg = AgeTimeGrid([0, 10], [2000, 2005, 2010], ["mean", "std"])
+        >>> atg.set_plane("mean", [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]])
+        >>> atg.set_plane("std", 0.01)
+
+        Args:
+            column (str): Which column to set.
+            values (np.ndarray): Anything that broadcasts to the shape
+                (ages, times), with ages and times in increasing order.
+        """
+        column_idx = self._column_index(column)
+        if self._array() is None:
+            raise ValueError("The grid doesn't have one row per age and time, so it can't set an array.")
+        incoming = np.asarray(values)
+        try:
+            np.broadcast_to(incoming, (len(self.ages), len(self.times)))
+        except ValueError:
+            raise ValueError(
+                f"Values with shape {incoming.shape} don't fit ages and times "
+                f"{(len(self.ages), len(self.times))}.")
+        self._store((slice(None), slice(None), column_idx), values)
+
+    def _column_index(self, column):
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(f"Column {column} isn't one of {self.columns}.")
+
+    def _store(self, index, value):
+        """Write into the array, widening its type when the value
+        doesn't fit, as a DataFrame column would."""
+        values = self._array()
+        if not isinstance(value, (str, np.ndarray)) and np.iterable(value):
+            value = list(value)
+        incoming = np.asarray(value)
+        if incoming.dtype.kind not in "biuf":
+            incoming = np.empty(incoming.shape, dtype=np.object)
+            incoming[...] = value
+        if not np.can_cast(incoming.dtype, values.dtype):
+            if incoming.dtype.kind in "biuf":
+                values = values.astype(np.result_type(values.dtype, incoming.dtype))
+            else:
+                values = values.astype(np.object)
+        values[index] = incoming
+        if self._checked_out:
+            self._write_frame(values)
+        else:
+            self._values = values
+            self._frame = None
+
+    def _write_frame(self, values):
+        """Writes the array into the checked-out frame, in place,
+        so that code holding that frame sees the change."""
+        frame = self._frame
+        position = self._frame_positions(frame)
+        flat = values.reshape((len(self.ages) * len(self.times), len(self.columns)))
+        for column_idx, column in enumerate(self.columns):
+            column_values = pd.Series(flat[position, column_idx], index=frame.index)
+            frame[column] = column_values.infer_objects() if values.dtype == np.object else column_values
 
     def __len__(self):
         return self.variable_count()
@@ -159,7 +389,7 @@ class AgeTimeGrid:
                 CODELOG.debug("assert frame equal false on mulstd")
                 return False
         try:
-            pd.testing.assert_frame_equal(self.grid, other.grid, check_like=True, check_exact=False)
+            pd.testing.assert_frame_equal(self._as_frame(), other._as_frame(), check_like=True, check_exact=False)
             return True
         except AssertionError as ae:
             if "values are different" in str(ae):
@@ -167,3 +397,14 @@ class AgeTimeGrid:
                 return False
             else:
                 raise
+
+
+def _exact_index(axis, points):
+    """Offsets of points into a sorted axis, or None if any point isn't
+    exactly one of the values on the axis."""
+    if len(axis) == 0:
+        return None
+    index = np.searchsorted(axis, points).clip(0, len(axis) - 1)
+    if not np.all(axis[index] == points):
+        return None
+    return index
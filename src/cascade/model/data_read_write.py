@@ -4,6 +4,7 @@ import numpy as np
 
 from cascade.core import getLoggers
 from cascade.dismod.constants import DensityEnum, INTEGRAND_TO_WEIGHT, IntegrandEnum
+from cascade.dismod.db.read_only import harvest, read_tables
 
 CODELOG, MATHLOG = getLoggers(__name__)
 
@@ -132,18 +133,66 @@ def avgint_to_dataframe(dismod_file, avgint, covariate_rename):
 
 def read_avgint(dismod_file):
     """Read average integrand cases, translating to locations and covariates."""
-    avgint = dismod_file.avgint
+    return _avgint_from_tables(dismod_file.avgint, dismod_file.node, dismod_file.covariate)
+
+
+def _avgint_from_tables(avgint, node, covariate):
     with_integrand = avgint.assign(integrand=avgint.integrand_id.apply(lambda x: IntegrandEnum(x).name))
-    with_location = with_integrand.merge(dismod_file.node, on="node_id", how="left") \
+    # Tables read from the file are indexed by node_id, which is ambiguous for merge.
+    with_location = with_integrand.merge(node.reset_index(drop=True), on="node_id", how="left") \
         .rename(columns={"c_location_id": "location"})
     usual_columns = ["avgint_id", "location", "integrand", "age_lower", "age_upper",
                      "time_lower", "time_upper"]
-    covariate_map = _dataframe_as_dict(dismod_file.covariate, "covariate_id", "covariate_name")
+    covariate_map = _dataframe_as_dict(covariate, "covariate_id", "covariate_name")
     covariate_rename = {cc: covariate_map[int(cc.lstrip("x_"))] for cc in with_location.columns if cc.startswith("x_")}
     with_covariates = with_location.rename(columns=covariate_rename)
     return with_covariates[usual_columns + list(covariate_rename.values())]
 
 
+def read_predict(dismod_file):
+    """Reads predictions and the average integrand cases they predict.
+
+    Returns:
+        (pd.DataFrame, pd.DataFrame): The points predicted and the points
+        excluded because their covariates were out of bounds.
+    """
+    return _predict_from_tables(dismod_file.predict, read_avgint(dismod_file))
+
+
+def harvest_predict(file_paths, threads=None):
+    """Reads predictions from many db files that Dismod-AT has finished
+    with, without a ``DismodFile``. This opens each file read-only
+    and reads just the tables that ``read_predict`` needs.
+
+    Args:
+        file_paths (List[Path]): Db files that have a predict table.
+        threads (int): How many files to read at once.
+
+    Returns:
+        List[(pd.DataFrame, pd.DataFrame)]: For each file, the same
+        as ``read_predict``.
+    """
+    return harvest(file_paths, _read_only_predict, threads)
+
+
+def _read_only_predict(file_path):
+    tables = read_tables(file_path, dict(
+        predict=["predict_id", "sample_index", "avgint_id", "avg_integrand"],
+        avgint=None,
+        node=["node_id", "c_location_id"],
+        covariate=["covariate_id", "covariate_name"],
+    ))
+    avgint = _avgint_from_tables(tables["avgint"], tables["node"], tables["covariate"])
+    return _predict_from_tables(tables["predict"], avgint)
+
+
+def _predict_from_tables(predict, avgint):
+    raw = predict.merge(avgint, on="avgint_id", how="left")
+    normalized = raw.drop(columns=["avgint_id", "predict_id"]).rename(columns={"avg_integrand": "mean"})
+    not_predicted = avgint[~avgint.avgint_id.isin(raw.avgint_id)].drop(columns=["avgint_id"])
+    return normalized, not_predicted
+
+
 def _dataframe_as_dict(df, key_column, value_column):
     """Given DataFrame(id=[1,2,3], name=['a', 'b', 'c']), this gives
     {1: 'a', 2: 'b', 3: 'c'}.
@@ -173,13 +222,13 @@ def read_simulation_data(dismod_file, data, index):
     """
     # The saved dataset links the unique name to the data_id, but use the data
     # passed in for the rest.
-    db_data = dismod_file.data
+    db_data = dismod_file.read("data", ["data_id", "data_name"])
     # Links data_subset_id to data_id.
-    data_subset = dismod_file.data_subset.reset_index(drop=True)
-    data_sim = dismod_file.data_sim  # The actual answer.
+    data_subset = dismod_file.read("data_subset", ["data_subset_id", "data_id"]).reset_index(drop=True)
 
     keep_sim_columns = ["data_subset_id", "data_sim_value", "data_sim_delta"]
-    index_subset = data_sim.loc[data_sim.simulate_index == index, keep_sim_columns]
+    # The actual answer.
+    index_subset = dismod_file.read("data_sim", keep_sim_columns, dict(simulate_index=index))
 
     aligned = index_subset.merge(data_subset, on="data_subset_id", how="left") \
         .merge(db_data[["data_id", "data_name"]], on="data_id") \
@@ -1,58 +1,57 @@
-from functools import partial
+import os
+from collections import OrderedDict
+from hashlib import sha1
 from math import isnan, nan
+from pathlib import Path
+from tempfile import mkstemp
+from zipfile import BadZipFile
 
 import numpy as np
 import pandas as pd
 
 from cascade.core import getLoggers
 from cascade.dismod.constants import IntegrandEnum, RateEnum, PriorKindEnum
+from cascade.dismod.db.read_only import harvest, read_tables
 from cascade.model.age_time_grid import AgeTimeGrid
 from cascade.model.dismod_groups import DismodGroups
+from cascade.model.sample_set import SampleSet
 from cascade.model.smooth_grid import SmoothGrid
-from cascade.model.var import Var
+from cascade.model.var_layout import VarLayout
 
 CODELOG, MATHLOG = getLoggers(__name__)
+VAR_LAYOUT_CACHE_SIZE = 8
+"""How many var layouts to remember in this process."""
+VAR_LAYOUT_TABLES = ["var", "node", "nslist_pair", "rate", "mulcov", "covariate", "age", "time"]
+"""Tables that determine which random field each ``var_id`` belongs to.
+The parent node, from the option table, does too."""
+_VAR_LAYOUTS = OrderedDict()  # Fingerprint to VarLayout, least recently used first.
 
 
-def write_vars(dismod_file, new_vars, var_ids, which):
+def write_vars(dismod_file, new_vars, var_layout, which):
     """
+    Writes a table full of vars (start, truth, scale, fit).
 
     Args:
         dismod_file:
         new_vars (DismodGroups): The new vars to write.
-        var_ids (DismodGroups): The output of ``read_var_table_as_id``.
+        var_layout (VarLayout): The output of ``read_var_layout``.
         which (str): Could be "start_var", "truth_var", "scale_var", "fit_var".
     """
     var_name = f"{which}_var"
-    id_column = f"{var_name}_id"
-    total = list()
-    for group_name, group in var_ids.items():
-        for key, value in group.items():
-            total.append(_construct_vars_one_field(var_name, value, new_vars[group_name][key]))
-    new_table = pd.concat(total).sort_values(by=[id_column])
-    setattr(dismod_file, var_name, new_table)
-
-
-def _construct_vars_one_field(name, var_id, new_var):
-    id_column = f"{name}_id"
-    var_column = f"{name}_value"
-    with_id = new_var.grid.merge(var_id.grid[["age", "time", "var_id"]], on=["age", "time"], how="left")
-    if with_id.var_id.isna().any():
-        na_vals = with_id[with_id.var_id.isna()]
-        raise RuntimeError(f"Could not align {id_column} with var_id. {na_vals} when writing to db file.")
-    return pd.DataFrame({
-        id_column: with_id.var_id.values,
-        var_column: with_id["mean"].values,
+    new_table = pd.DataFrame({
+        f"{var_name}_id": np.arange(var_layout.size),
+        f"{var_name}_value": var_layout.pack(new_vars),
     })
+    setattr(dismod_file, var_name, new_table)
 
 
-def read_vars(dismod_file, var_ids, which):
+def read_vars(dismod_file, var_layout, which):
     """
     Reads a table full of vars (start, truth, scale).
 
     Args:
         dismod_file:
-        var_ids (DismodGroups): The output of ``read_var_table_as_id``.
+        var_layout (VarLayout): The output of ``read_var_layout``.
         which (str): Could be "start_var", "truth_var", "scale_var", "fit_var".
 
     Returns:
@@ -60,7 +59,43 @@ def read_vars(dismod_file, var_ids, which):
     """
     var_name = f"{which}_var"
     table = getattr(dismod_file, var_name)
-    return _assign_from_var_ids(table, var_ids, partial(_read_vars_one_field, name=var_name))
+    if table.empty:
+        raise AttributeError(f"Dismod file has no data in table {table.columns} during read from vars.")
+    vector = np.full((var_layout.size,), nan, dtype=np.float)
+    vector[table[f"{var_name}_id"].values.astype(np.int)] = table[f"{var_name}_value"].values
+    return var_layout.unpack(vector)
+
+
+def harvest_vars(file_paths, var_layout, which, threads=None):
+    """Reads a table of vars from many db files that Dismod-AT has finished
+    with, without a ``DismodFile``, such as the fits of draws. The files
+    must be copies of one db file, so that one layout fits all of them.
+    See :py:mod:`cascade.dismod.db.read_only`.
+
+    Args:
+        file_paths (List[Path]): Db files to read.
+        var_layout (VarLayout): The layout of the db file they copy.
+        which (str): Could be "start", "truth", "scale", "fit".
+        threads (int): How many files to read at once.
+
+    Returns:
+        SampleSet: With a row for each file, in order.
+    """
+    var_name = f"{which}_var"
+
+    def read_vector(file_path):
+        table = read_tables(file_path, {var_name: [f"{var_name}_id", f"{var_name}_value"]})[var_name]
+        if table.empty:
+            raise AttributeError(f"Dismod file {file_path} has no data in table {var_name}.")
+        var_id = table[f"{var_name}_id"].values.astype(np.int)
+        if var_id.max() >= var_layout.size:
+            raise ValueError(f"Dismod file {file_path} has more vars than the layout's {var_layout.size}.")
+        vector = np.full((var_layout.size,), nan, dtype=np.float)
+        vector[var_id] = table[f"{var_name}_value"].values
+        return vector
+
+    vectors = harvest(file_paths, read_vector, threads)
+    return SampleSet(var_layout, np.array(vectors).reshape((len(vectors), var_layout.size)))
 
 
 def _assign_from_var_ids(table, var_ids, var_builder):
@@ -77,33 +112,6 @@ def _assign_from_var_ids(table, var_ids, var_builder):
     return var_groups
 
 
-def _read_vars_one_field(table, id_draw, name):
-    """Read one rate or random effect's values.
-
-    Args:
-        table: Dismod-AT table represented by a Pandas dataframe.
-        id_draw (AgeTimeGrid): An AgeTimeGrid that contains rows of ["var_id"].
-        name (str): name of the table, following Dismod-AT conventions.
-
-    Returns:
-        A new Var containing the values at these ages and times.
-    """
-    id_column = f"{name}_id"
-    var_column = f"{name}_value"
-    table = table.reset_index(drop=True)
-    with_var = id_draw.grid.merge(table, left_on="var_id", right_on=id_column, how="left")
-
-    vals = Var(id_draw.ages, id_draw.times)
-    vals.grid = vals.grid.assign(age=with_var["age"], time=with_var["time"], mean=with_var[var_column])
-
-    for mulstd, mul_id in id_draw.mulstd.items():
-        if mul_id.var_id.notna().all():
-            mulstd_id = int(mul_id.var_id.iloc[0])
-            row = table.loc[table[id_column] == mulstd_id, var_column]
-            vals.set_mulstd("value", float(row))
-    return vals
-
-
 def read_prior_residuals(dismod_file, var_ids):
     """Read residuals on value, dage, and dtime priors. Includes lagrange values."""
     return _assign_from_var_ids(dismod_file.fit_var, var_ids, _read_residuals_one_field)
@@ -134,36 +142,41 @@ def _read_residuals_one_field(table, id_draw):
     return vals
 
 
-def read_samples(dismod_file, var_ids):
-    """Get output of Dismod-AT sample command."""
-    return _assign_from_var_ids(dismod_file.sample, var_ids, _samples_one_field)
+def read_samples(dismod_file, var_layout):
+    """Get output of Dismod-AT sample command.
 
+    Args:
+        dismod_file:
+        var_layout (VarLayout): The output of ``read_var_layout``.
 
-def _samples_one_field(table, id_draw):
-    # Get the data out.
-    table = table.reset_index(drop=True)
-    with_var = table.merge(id_draw.grid, left_on="var_id", right_on="var_id", how="inner")
+    Returns:
+        SampleSet: All samples.
+    """
+    table = dismod_file.sample
+    if table.empty:
+        raise AttributeError(f"Dismod file has no data in table {table.columns} during read from samples.")
+    return SampleSet.from_table(table, var_layout)
 
-    # This is an AgeTimeGrid container, with multiple samples.
-    # It will use the idx column to represent the sample index.
-    vals = AgeTimeGrid(id_draw.ages, id_draw.times, columns=["mean", "idx"])
-    vals.grid = with_var[["age", "time", "var_value", "sample_index"]].rename(
-        columns={"var_value": "mean", "sample_index": "idx"})
 
-    for mulstd, mul_id in id_draw.mulstd.items():
-        if mul_id.var_id.notna().all():
-            mulstd_id = int(mul_id.var_id.iloc[0])  # noqa: F841
-            vals.mulstd[mulstd] = table[table.var_id == mulstd_id][["sample_index", "var_value"]] \
-                .rename(columns={"sample_index": "idx", "var_value": "mean"}) \
-                .assign(age=nan, time=nan)
+def write_samples(dismod_file, samples, var_layout):
+    """Writes samples to the sample table, as input to ``predict sample``.
+    Dismod-AT numbers samples from zero, so the ``sample_index`` written
+    is the position of each sample in the SampleSet.
 
-    return vals
+    Args:
+        dismod_file:
+        samples (SampleSet): Samples of all model variables.
+        var_layout (VarLayout): The output of ``read_var_layout``.
+    """
+    renumbered = SampleSet(var_layout, samples.in_layout(var_layout).values)
+    table = pd.DataFrame(renumbered.to_table())
+    dismod_file.sample = table.assign(sample_id=table.index)
 
 
 def read_simulation_model(dismod_file, original_model, var_ids, index):
     """After simulate was run, it makes a new model. This takes
     an existing model and modifies its priors so that we can run again."""
-    sim_priors = dismod_file.prior_sim[dismod_file.prior_sim.simulate_index == index]
+    sim_priors = dismod_file.read("prior_sim", where=dict(simulate_index=index))
     sim_model = original_model.model_like()
     for group_name, group in var_ids.items():
         for var_key, var_grid in group.items():
@@ -225,6 +238,76 @@ def _read_one_prior_sim_mulstd(model_grid, priors, sim_priors_df, var_grid):
             getattr(priors, mulstd_kind).mulstd_prior = source_prior
 
 
+def read_var_layout(dismod_file, sidecar=None):
+    """The position of every model variable in a vector ordered by ``var_id``.
+
+    Every draw of a location runs on a copy of the same db file, so they
+    share a layout. This remembers the last few layouts it made, keyed by
+    a fingerprint of the tables that determine the layout, and it can
+    also save the layout to a sidecar file, for other processes that
+    read copies of the same db file. The key comes from fingerprints
+    the file stores, where it has them, so a copy of a db file
+    whose layout was read before doesn't read those tables again.
+
+    Args:
+        dismod_file (DismodFile): The db file.
+        sidecar (Path): An ``.npz`` file in which to keep the layout. It's read
+            if it holds the layout for this fingerprint, and written if it doesn't.
+
+    Returns:
+        VarLayout: Made from ``read_var_table_as_id``.
+    """
+    fingerprint = var_layout_fingerprint(dismod_file)
+    if fingerprint in _VAR_LAYOUTS:
+        _VAR_LAYOUTS.move_to_end(fingerprint)
+        return _VAR_LAYOUTS[fingerprint]
+    layout = _read_layout_sidecar(sidecar, fingerprint) if sidecar is not None else None
+    if layout is None:
+        layout = VarLayout(read_var_table_as_id(dismod_file), len(dismod_file.var))
+        if sidecar is not None:
+            _write_layout_sidecar(sidecar, fingerprint, layout)
+    _VAR_LAYOUTS[fingerprint] = layout
+    while len(_VAR_LAYOUTS) > VAR_LAYOUT_CACHE_SIZE:
+        _VAR_LAYOUTS.popitem(last=False)
+    return layout
+
+
+def var_layout_fingerprint(dismod_file):
+    """A hash of the fingerprints of the tables that determine which
+    random field each ``var_id`` belongs to, and of the parent node.
+    See :py:meth:`cascade.dismod.db.wrapper.DismodFile.current_fingerprints`."""
+    digest = sha1()
+    for table_name, fingerprint in zip(VAR_LAYOUT_TABLES, dismod_file.current_fingerprints(VAR_LAYOUT_TABLES)):
+        digest.update(f"{table_name}:{fingerprint}".encode())
+    digest.update(f"parent:{read_parent_node(dismod_file)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _read_layout_sidecar(sidecar, fingerprint):
+    """Reads arrays only, never pickles, because the file is shared."""
+    try:
+        with np.load(str(sidecar), allow_pickle=False) as saved:
+            if str(saved["fingerprint"]) != fingerprint:
+                return None
+            return VarLayout.from_arrays(saved)
+    except (OSError, ValueError, KeyError, BadZipFile) as read_error:
+        CODELOG.debug(f"Could not read var layout from {sidecar}: {read_error}")
+        return None
+
+
+def _write_layout_sidecar(sidecar, fingerprint, layout):
+    sidecar = Path(sidecar)
+    handle, build_name = mkstemp(prefix=sidecar.stem, suffix=".tmp", dir=str(sidecar.parent))
+    try:
+        with os.fdopen(handle, "wb") as build_file:
+            np.savez(build_file, fingerprint=np.array(fingerprint), **layout.to_arrays())
+        # Replace is atomic, so another process sees either the old layout or the new one.
+        os.replace(build_name, str(sidecar))
+    finally:
+        if os.path.exists(build_name):
+            os.unlink(build_name)
+
+
 def read_var_table_as_id(dismod_file):
     """
     This reads the var table in order to find the ids for all of the vars.
@@ -342,7 +425,8 @@ def _read_mulcov_smooths(mulcov_table, covariate_table, smooths):
 
 def read_parent_node(dismod_file):
     """Get ``node_id`` for parent location."""
-    return int(dismod_file.option.query("option_name == 'parent_node_id'").option_value)
+    option = dismod_file.read("option", ["option_value"], dict(option_name="parent_node_id"))
+    return int(option.option_value.iloc[0])
 
 
 def read_child_nodes(dismod_file, parent_node):
@@ -30,13 +30,20 @@ class ModelWriter:
      * Rates and integrands are always in the same order.
     """
 
-    def __init__(self, object_wrapper, dismod_file):
+    def __init__(self, object_wrapper, dismod_file, intern_priors=False, share_child_smooths=False):
         """
         Args:
             object_wrapper (Session): The Dismod-AT Session into which this writes.
+            intern_priors (bool): Write each distinct prior once, so that
+                grid points with the same prior share a ``prior_id``.
+            share_child_smooths (bool): Children of one rate with equal
+                random effects use one smooth, instead of one each.
         """
         self._object_wrapper = object_wrapper
         self._dismod_file = dismod_file
+        self._intern_priors = intern_priors
+        self._share_child_smooths = share_child_smooths
+        self._interned_priors = dict()  # Prior parameters to prior_id.
         self._ages = np.empty((0,), dtype=np.float)
         self._times = np.empty((0,), dtype=np.float)
         self._rate_rows = list()  # List of dictionaries for rates.
@@ -44,6 +51,13 @@ class ModelWriter:
         self._rate_id = dict()  # The rate ids with the primary rates.
         self._nslist = dict()  # rate to integer
         self._nslist_pair_rows = list()  # list of nslist id, node, and smooth
+        self._child_smooths = dict()  # rate and random field contents to smooth_id
+        # Tables for random fields are built in blocks and made once on close.
+        self._prior_cnt = 0
+        self._prior_blocks = list()  # List of prior tables, one for each field.
+        self._smooth_rows = list()  # List of dictionaries for smooths.
+        self._smooth_grid_cnt = 0
+        self._smooth_grid_blocks = list()  # List of dictionaries of columns for smooth grids.
         self._flushed = False
         self._children = None
         self._clear_previous_model()
@@ -65,9 +79,8 @@ class ModelWriter:
         if not self._dismod_file.rate.empty:
             cleared_tables.append("rate")
             # Then the rate has all five entries.
-            self._dismod_file.rate.loc[:, "parent_smooth_id"] = nan
-            self._dismod_file.rate.loc[:, "child_smooth_id"] = nan
-            self._dismod_file.rate.loc[:, "child_nslist_id"] = nan
+            self._dismod_file.rate = self._dismod_file.rate.assign(
+                parent_smooth_id=nan, child_smooth_id=nan, child_nslist_id=nan)
         if cleared_tables:
             CODELOG.debug(f"Writing model cleared tables from previous model: {', '.join(cleared_tables)}")
 
@@ -91,7 +104,14 @@ class ModelWriter:
         """A rate needs a smooth, which has priors and ages/times."""
         self._flush_ages_times_locations()
         smooth_id = self.add_random_field(rate_name, random_field)
-        self._dismod_file.rate.loc[self._rate_id_func(rate_name), "parent_smooth_id"] = smooth_id
+        self._set_rate_column(self._rate_id_func(rate_name), "parent_smooth_id", smooth_id)
+
+    def _set_rate_column(self, rate_id, column, value):
+        """Modifies a copy of the rate table, so this works when
+        the db file hands out read-only tables."""
+        rate = self._dismod_file.rate.copy()
+        rate.loc[rate_id, column] = value
+        self._dismod_file.rate = rate
 
     def write_random_effect(self, rate_name, child_location, random_field):
         self._flush_ages_times_locations()
@@ -99,11 +119,14 @@ class ModelWriter:
             grid_name = f"{rate_name}_re"
         else:
             grid_name = f"{rate_name}_re_{child_location}"
-        smooth_id = self.add_random_field(grid_name, random_field)
+        if child_location is not None and self._share_child_smooths:
+            smooth_id = self._add_child_random_field(rate_name, random_field)
+        else:
+            smooth_id = self.add_random_field(grid_name, random_field)
         rate_id = self._rate_id_func(rate_name)
         CODELOG.debug(f"random effect {rate_name} {child_location} {smooth_id}")
         if child_location is None:
-            self._dismod_file.rate.loc[rate_id, "child_smooth_id"] = smooth_id
+            self._set_rate_column(rate_id, "child_smooth_id", smooth_id)
         else:
             locs = self._object_wrapper.locations
             node_id = locs[locs.location_id == child_location].node_id.iloc[0]
@@ -112,13 +135,34 @@ class ModelWriter:
                 self._nslist[rate_name] = ns_id
             else:
                 ns_id = self._nslist[rate_name]
-            self._dismod_file.rate.loc[rate_id, "child_nslist_id"] = ns_id
+            self._set_rate_column(rate_id, "child_nslist_id", ns_id)
             self._nslist_pair_rows.append(dict(
                 nslist_id=ns_id,
                 node_id=node_id,
                 smooth_id=smooth_id,
             ))
 
+    def _add_child_random_field(self, rate_name, random_field):
+        """Child random effects of one rate that have the same ages, times,
+        and priors share one smooth, named for the rate and the order
+        in which its shared smooths were made, such as ``iota_re_shared_0``.
+        Dismod-AT's nslist lets many nodes use one smooth,
+        and each node still gets its own model variables. Children of
+        different rates don't share, so a smooth and node identify
+        one random field."""
+        priors = random_field.priors
+        key = (
+            rate_name,
+            random_field.ages.tobytes(),
+            random_field.times.tobytes(),
+            pd.util.hash_pandas_object(priors, index=False).values.tobytes(),
+        )
+        if key not in self._child_smooths:
+            shared_idx = sum(1 for made_key in self._child_smooths if made_key[0] == rate_name)
+            grid_name = f"{rate_name}_re_shared_{shared_idx}"
+            self._child_smooths[key] = self.add_random_field(grid_name, random_field)
+        return self._child_smooths[key]
+
     def write_mulcov(self, kind, covariate, rate_or_integrand, random_field):
         self._flush_ages_times_locations()
         CODELOG.debug(f"write_mulcov {kind} {covariate} {rate_or_integrand}")
@@ -161,6 +205,21 @@ class ModelWriter:
         self._dismod_file.weight_grid = total
 
     def close(self):
+        if self._prior_blocks:
+            self._dismod_file.prior = pd.concat(self._prior_blocks, ignore_index=True)
+        else:
+            self._dismod_file.prior = self._dismod_file.empty_table("prior")
+        self._dismod_file.smooth = pd.DataFrame(
+            self._smooth_rows,
+            columns=self._dismod_file.empty_table("smooth").columns
+        )
+        if self._smooth_grid_blocks:
+            self._dismod_file.smooth_grid = pd.DataFrame({
+                column: np.concatenate([block[column] for block in self._smooth_grid_blocks])
+                for column in self._smooth_grid_blocks[0]
+            })
+        else:
+            self._dismod_file.smooth_grid = self._dismod_file.empty_table("smooth_grid")
         if self._mulcov_rows:
             self._dismod_file.mulcov = pd.DataFrame(self._mulcov_rows)
         else:
@@ -190,38 +249,39 @@ class ModelWriter:
 
     def _add_field_grid(self, complete_table, smooth_id):
         """Each age-time entry in the smooth_grid table, including the mulstds."""
-        long_table = complete_table.loc[complete_table.age_id.notna()][["age_id", "time_id", "prior_id", "kind"]]
-        grid_table = long_table[["age_id", "time_id"]].sort_values(["age_id", "time_id"]).drop_duplicates()
+        long_table = complete_table.loc[complete_table.age_id.notna()]
+        grid_block = dict()
         for kind in ["value", "dage", "dtime"]:
-            grid_values = long_table.loc[long_table.kind == kind] \
-                .drop("kind", axis="columns") \
-                .rename(columns={"prior_id": f"{kind}_prior_id"})
-            grid_table = grid_table.merge(grid_values, on=["age_id", "time_id"])
-        grid_table = grid_table.sort_values(["age_id", "time_id"], axis=0).reindex()
-        grid_table = grid_table.assign(const_value=nan, smooth_id=smooth_id)
-        if self._dismod_file.smooth_grid.empty:
-            self._dismod_file.smooth_grid = grid_table.assign(smooth_grid_id=grid_table.index)
-        else:
-            grid_table = grid_table.assign(smooth_grid_id=grid_table.index + len(self._dismod_file.smooth_grid))
-            self._dismod_file.smooth_grid = self._dismod_file.smooth_grid.append(grid_table, ignore_index=True)
+            one_kind = long_table.loc[long_table.kind == kind]
+            age_id = one_kind.age_id.values.astype(np.int)
+            time_id = one_kind.time_id.values.astype(np.int)
+            by_age_time = np.lexsort((time_id, age_id))
+            if not grid_block:
+                grid_block["age_id"] = age_id[by_age_time]
+                grid_block["time_id"] = time_id[by_age_time]
+            elif not (np.array_equal(grid_block["age_id"], age_id[by_age_time]) and
+                      np.array_equal(grid_block["time_id"], time_id[by_age_time])):
+                raise RuntimeError(f"The {kind} priors of smooth {smooth_id} are on a different age-time grid.")
+            grid_block[f"{kind}_prior_id"] = one_kind.prior_id.values[by_age_time]
+        grid_cnt = len(grid_block["age_id"])
+        grid_block["const_value"] = np.full((grid_cnt,), nan, dtype=np.float)
+        grid_block["smooth_id"] = np.full((grid_cnt,), smooth_id, dtype=np.int)
+        grid_block["smooth_grid_id"] = np.arange(self._smooth_grid_cnt, self._smooth_grid_cnt + grid_cnt)
+        self._smooth_grid_cnt += grid_cnt
+        self._smooth_grid_blocks.append(grid_block)
 
     def _add_field_smooth(self, grid_name, prior_table, age_time_cnt):
         """Ths one row in the smooth grid table."""
         smooth_row = dict(smooth_name=grid_name)
         smooth_row["n_age"] = age_time_cnt[0]
         smooth_row["n_time"] = age_time_cnt[1]
-        for prior_kind in ["value", "dage", "dtime"]:
-            mulstd_row = prior_table.loc[prior_table.age.isna() & (prior_table.kind == prior_kind)]
-            if all(mulstd_row.assigned):
-                smooth_row[f"mulstd_{prior_kind}_prior_id"] = int(mulstd_row.prior_id)
-        if self._dismod_file.smooth.empty:
-            smooth_row["smooth_id"] = 0
-            self._dismod_file.smooth = self._dismod_file.empty_table("smooth").append(smooth_row, ignore_index=True)
-        else:
-            smooth_row["smooth_id"] = len(self._dismod_file.smooth)
-            self._dismod_file.smooth = self._dismod_file.smooth.append(smooth_row, ignore_index=True)
-        smooth_id = smooth_row["smooth_id"]
-        return smooth_id
+        mulstds = prior_table.loc[prior_table.age.isna()]
+        for kind, assigned, prior_id in zip(mulstds.kind.values, mulstds.assigned.values, mulstds.prior_id.values):
+            if assigned:
+                smooth_row[f"mulstd_{kind}_prior_id"] = int(prior_id)
+        smooth_row["smooth_id"] = len(self._smooth_rows)
+        self._smooth_rows.append(smooth_row)
+        return smooth_row["smooth_id"]
 
     def _add_field_priors(self, grid_name, complete_table):
         """These are all entries in the priors table for this smooth grid."""
@@ -230,9 +290,13 @@ class ModelWriter:
         complete_table.loc[complete_table.density.isnull(), ["density", "mean", "lower", "upper"]] = \
             ["uniform", 0, -inf, inf]
         complete_table = complete_table.assign(density_id=complete_table.density.apply(lambda x: DensityEnum[x].value))
-        # Create new prior IDs that don't overlap.
-        complete_table = complete_table.assign(prior_id=complete_table.index + len(self._dismod_file.prior))
         complete_table = complete_table.rename(columns={"name": "prior_name"})
+        # Create new prior IDs that don't overlap.
+        prior_ids = self._new_prior_ids(complete_table)
+        complete_table = complete_table.assign(
+            prior_id=prior_ids,
+            new_prior=(prior_ids >= self._prior_cnt) & ~pd.Series(prior_ids).duplicated().values,
+        )
         # Unique, informative names for the priors require care.
         null_names = complete_table.prior_name.isnull()
         complete_table.loc[~null_names, "prior_name"] = (
@@ -251,13 +315,32 @@ class ModelWriter:
         ]
         # Remove columns before saving, but keep extra columns in complete_table for
         # further construction of grids.
-        prior_table = complete_table.sort_values(by="prior_id").reset_index(drop=True)[priors_columns]
-        if not self._dismod_file.prior.empty:
-            self._dismod_file.prior = self._dismod_file.prior.append(prior_table)
-        else:
-            self._dismod_file.prior = prior_table
+        prior_table = complete_table[complete_table.new_prior] \
+            .sort_values(by="prior_id").reset_index(drop=True)[priors_columns]
+        self._prior_blocks.append(prior_table)
+        self._prior_cnt += len(prior_table)
         return complete_table
 
+    def _new_prior_ids(self, complete_table):
+        """Assigns a ``prior_id`` to each row of a field's priors. Without
+        interning, every row is a new prior. With interning, a row gets the
+        id of the first prior written with the same density, parameters,
+        and name, and new ids are given in order of first appearance.
+        """
+        next_id = self._prior_cnt
+        if not self._intern_priors:
+            return np.arange(next_id, next_id + len(complete_table))
+        prior_ids = np.empty((len(complete_table),), dtype=np.int)
+        key_columns = ["density_id", "lower", "upper", "mean", "std", "eta", "nu", "prior_name"]
+        for row_idx, key in enumerate(complete_table[key_columns].itertuples(index=False, name=None)):
+            # Nan isn't equal to itself, so it can't be part of a key.
+            key = tuple(None if pd.isna(part) else part for part in key)
+            if key not in self._interned_priors:
+                self._interned_priors[key] = next_id
+                next_id += 1
+            prior_ids[row_idx] = self._interned_priors[key]
+        return prior_ids
+
     def _flush_ages_times_locations(self):
         if self._flushed:
             return
@@ -299,17 +382,20 @@ class ModelWriter:
         or times."""
         assert "age" in df.columns
         assert "time" in df.columns
-        df = df.assign(save_idx=df.index)
+        assigned = dict()
         for dat in ["age", "time"]:
-            col_id = f"{dat}_id"
-            sort_by = df.sort_values(dat)
-            in_grid = sort_by[dat].notna()
+            # The age and time tables are sorted when they are flushed.
             at_table = getattr(self._dismod_file, dat)
-            aged = pd.merge_asof(sort_by[in_grid], at_table, on=dat, direction="nearest")
-            df = df.merge(aged[["save_idx", col_id]], on="save_idx", how="left")
-        assert "age_id" in df.columns
-        assert "time_id" in df.columns
-        return df.drop("save_idx", axis=1)
+            points = df[dat].values.astype(np.float)
+            in_grid = ~np.isnan(points)
+            nearest = at_table[f"{dat}_id"].values[_nearest_index(at_table[dat].values, points[in_grid])]
+            if in_grid.all():
+                assigned[f"{dat}_id"] = nearest
+            else:
+                with_nan = np.full(points.shape, nan, dtype=np.float)
+                with_nan[in_grid] = nearest
+                assigned[f"{dat}_id"] = with_nan
+        return df.assign(**assigned)
 
     def write_covariate(self, covariates):
         self._dismod_file.covariate = self._dismod_file.empty_table("covariate")
@@ -323,3 +409,13 @@ class ModelWriter:
             reorder.append(lookup[remaining])
         CODELOG.debug(f"covariates {', '.join(c.name for c in reorder)}")
         self._object_wrapper.covariates = reorder
+
+
+def _nearest_index(sorted_values, points):
+    """For each point, the index of the nearest of the sorted values."""
+    if len(sorted_values) == 1:
+        return np.zeros(points.shape, dtype=np.int)
+    upper = np.searchsorted(sorted_values, points).clip(1, len(sorted_values) - 1)
+    lower = upper - 1
+    closer_below = points - sorted_values[lower] <= sorted_values[upper] - points
+    return np.where(closer_below, lower, upper)
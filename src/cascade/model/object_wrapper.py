@@ -1,8 +1,14 @@
+import os
+import shutil
+import stat
 from collections import Iterable
 from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha1
 from math import nan, isnan
 from numbers import Real
 from pathlib import Path
+from tempfile import gettempdir, mkdtemp, mkstemp
 
 import numpy as np
 import pandas as pd
@@ -14,22 +20,28 @@ from cascade.core.subprocess_utils import (
 from cascade.core.subprocess_utils import run_with_logging
 from cascade.dismod.constants import COMMAND_IO
 from cascade.dismod.constants import DensityEnum, RateEnum, IntegrandEnum
+from cascade.dismod.db.metadata import Base
+from cascade.dismod.db.sqlite_writer import sqlite_table_ddl
 from cascade.dismod.db.wrapper import DismodFile, get_engine
-from cascade.dismod.metrics import gather_metrics
+from cascade.dismod.metrics import gather_metrics, METRIC_TABLES
 from cascade.dismod.process_behavior import check_command
 from cascade.model.data_read_write import (
-    write_data, avgint_to_dataframe, read_avgint, read_data_residuals,
+    write_data, avgint_to_dataframe, read_predict, read_data_residuals,
     read_simulation_data, amend_data_input, point_age_time_to_interval
 )
 from cascade.model.grid_read_write import (
-    read_var_table_as_id, read_vars, write_vars, read_prior_residuals, read_samples,
-    read_simulation_model
+    read_var_layout, read_vars, write_vars, read_prior_residuals, VAR_LAYOUT_TABLES,
+    read_samples, write_samples, read_simulation_model
 )
 from cascade.model.model_writer import ModelWriter
 from cascade.model.serialize import default_integrand_names, make_log_table
 
 CODELOG, MATHLOG = getLoggers(__name__)
 
+TEMPLATE_VERSION = 1
+"""Increment this when the default tables change, so that new db files
+don't start from a template made by an earlier version of this code."""
+
 
 class ObjectWrapper:
     """
@@ -46,22 +58,78 @@ class ObjectWrapper:
     consistent. This class groups sets of tables and columns
     within those tables into higher-level objects that are then
     easier to reason about.
+
+    With ``in_memory=True``, the db file is built in an in-memory
+    sqlite database, and the whole image is written to the file only when
+    it closes, which happens before each Dismod-AT command. Afterwards,
+    it reads the file back into memory. This trades many small writes to
+    the file for one large write and one large read per command.
+    The in-memory database belongs to the thread that made it.
+
+    A new db file starts as a copy of a template file that has the
+    default tables, those that don't depend on the model. See
+    :py:func:`template_db_file`.
     """
-    def __init__(self, filename):
+    def __init__(
+            self, filename, in_memory=False, template=True, intern_priors=False, var_layout_file=None,
+            read_only_tables=False, share_child_smooths=False
+    ):
         """
         Args:
             filename (Path|str|None): Path to filename or None if this
                 DismodFile should be in memory, as used for testing.
+            in_memory (bool): Whether to build the file in memory and
+                write it to ``filename`` only when Dismod-AT runs. If the
+                file exists, it is read into memory.
+            template (bool): Whether a new file starts as a copy of
+                the template file.
+            intern_priors (bool): Whether a model is written with one
+                row in the prior table for each distinct prior,
+                instead of one for each grid point.
+            var_layout_file (Path|str|None): A file in which to keep
+                the layout of the var table, so that processes reading
+                copies of one db file, such as draws, find it once.
+            read_only_tables (bool): Whether tables read from or written to
+                the file become read-only, so that a flush knows they are
+                clean without hashing them. Use it when tables are only
+                ever replaced, never changed in place. See
+                :py:class:`cascade.dismod.db.wrapper.DismodFile`.
+            share_child_smooths (bool): Whether a model is written with
+                one smooth for all children of a rate whose random effects
+                have the same ages, times, and priors, instead of one
+                smooth for each child.
         """
         if filename is not None:
             assert isinstance(filename, (Path, str))
             self._filename = Path(filename)
         else:
             self._filename = filename
+        self._in_memory = in_memory and filename is not None
+        self.intern_priors = intern_priors
+        self.share_child_smooths = share_child_smooths
+        self.var_layout_file = Path(var_layout_file) if var_layout_file is not None else None
+        # Metrics on the db file, with the fingerprints of the tables they read.
+        self._metrics = None
+        # The var layout, with the versions of the tables it was read from.
+        self._var_layout = None
         self.dismod_file = DismodFile()
-        self.dismod_file.engine = get_engine(self._filename)
+        self.dismod_file.read_only_tables = read_only_tables
+        self._open_engine(template)
         self.ensure_dismod_file_has_default_tables()
 
+    def _open_engine(self, template=False):
+        exists = self._filename is not None and self._filename.exists()
+        if self._in_memory or self._filename is None:
+            self.dismod_file.engine = get_engine(None)
+            if exists:
+                self.dismod_file.load_from(self._filename)
+            elif template:
+                self.dismod_file.load_from(template_db_file())
+        else:
+            if template and not exists:
+                shutil.copyfile(str(template_db_file()), str(self._filename))
+            self.dismod_file.engine = get_engine(self._filename, persistent=True)
+
     @property
     def db_filename(self):
         """pathlib.Path: path to the file. Read-only. Make
@@ -151,7 +219,8 @@ class ObjectWrapper:
         """When you write a model, it deletes the file."""
         if self.locations.empty:
             raise RuntimeError("Cannot create a model until locations exist")
-        writer = ModelWriter(self, self.dismod_file)
+        writer = ModelWriter(
+            self, self.dismod_file, intern_priors=self.intern_priors, share_child_smooths=self.share_child_smooths)
         new_model.write(writer)
         writer.close()
 
@@ -166,10 +235,10 @@ class ObjectWrapper:
         The exact allowed options are described here:
 
         .. literalinclude:: ../../../src/cascade/model/object_wrapper.py
-           :pyobject: ObjectWrapper._create_options_table
+           :pyobject: _default_options
 
         """
-        option = self.dismod_file.option
+        option = self.dismod_file.option.copy()
         unknowns = list()
         for name in kwargs.keys():
             if not (option.option_name == name).any():
@@ -288,13 +357,23 @@ class ObjectWrapper:
     def truth_var(self, new_vars):
         self.set_var("truth", new_vars)
 
+    @property
+    def var_layout(self):
+        """cascade.model.var_layout.VarLayout: Where each model variable
+        is in the var table. This wrapper keeps it until one of the
+        tables it comes from is assigned or read again, and
+        ``read_var_layout`` remembers it across db files that have the
+        same model."""
+        versions = self.dismod_file.table_versions(VAR_LAYOUT_TABLES + ["option"])
+        if self._var_layout is None or self._var_layout[0] != versions:
+            self._var_layout = (versions, read_var_layout(self.dismod_file, self.var_layout_file))
+        return self._var_layout[1]
+
     def get_var(self, name):
-        var_id = read_var_table_as_id(self.dismod_file)
-        return read_vars(self.dismod_file, var_id, name)
+        return read_vars(self.dismod_file, self.var_layout, name)
 
     def set_var(self, name, new_vars):
-        var_id = read_var_table_as_id(self.dismod_file)
-        write_vars(self.dismod_file, new_vars, var_id, name)
+        write_vars(self.dismod_file, new_vars, self.var_layout, name)
         self.flush()
 
     def set_minimum_meas_cv(self, integrand, value):
@@ -313,14 +392,16 @@ class ObjectWrapper:
         integrand = IntegrandEnum[integrand]
         dmf = self.dismod_file
         if dmf:
-            dmf.integrand.loc[dmf.integrand.integrand_name == integrand.name, "minimum_meas_cv"] = fvalue
+            integrand_table = dmf.integrand.copy()
+            integrand_table.loc[integrand_table.integrand_name == integrand.name, "minimum_meas_cv"] = fvalue
+            dmf.integrand = integrand_table
         else:
             CODELOG.info(f"minimum_meas_cv not set because dismod_file is None.")
 
     @property
     def prior_residuals(self):
         """pd.DataFrame: Reads prior residuals into a dataframe."""
-        var_id = read_var_table_as_id(self.dismod_file)
+        var_id = self.var_layout.var_ids
         return read_prior_residuals(self.dismod_file, var_id)
 
     @property
@@ -330,9 +411,14 @@ class ObjectWrapper:
 
     @property
     def samples(self):
-        """pd.DataFrame: These are generated by the simulate command."""
-        var_id = read_var_table_as_id(self.dismod_file)
-        return read_samples(self.dismod_file, var_id)
+        """cascade.model.sample_set.SampleSet: These are generated by the
+        sample command. Can read or write."""
+        return read_samples(self.dismod_file, self.var_layout)
+
+    @samples.setter
+    def samples(self, new_samples):
+        write_samples(self.dismod_file, new_samples, self.var_layout)
+        self.flush()
 
     def read_simulation_model_and_data(self, model, data, index):
         """The Dismod-AT simulate command creates a new model and new data
@@ -347,7 +433,7 @@ class ObjectWrapper:
             (Model, pd.DataFrame): the model and data for a single simulation.
 
         """
-        var_id = read_var_table_as_id(self.dismod_file)
+        var_id = self.var_layout.var_ids
         sim_model = read_simulation_model(self.dismod_file, model, var_id, index)
         sim_data = read_simulation_data(self.dismod_file, data, index)
         return sim_model, sim_data
@@ -370,8 +456,10 @@ class ObjectWrapper:
         """Closes the database engine. This makes sure that the running
         Python application isn't connected to the file Dismod-AT has
         to read because Dismod-AT can't read it while the application
-        reads it."""
+        reads it. If the db is in memory, this writes it to the file."""
         self.flush()
+        if self._in_memory and self.dismod_file.engine is not None:
+            self.dismod_file.save_to(self._filename)
         if self.dismod_file.engine is not None:
             self.dismod_file.engine.dispose()
             self.dismod_file.engine = None
@@ -380,19 +468,29 @@ class ObjectWrapper:
     def close_db_while_running(self):
         """
         A context manager to make it easier to work with this object
-        and run Dismod-AT. It closes the file, flushes it, and then
-        refreshes the file afterwards.
+        and run Dismod-AT. It flushes the file so that Dismod-AT sees
+        every change. If the db is in memory, this writes it to the file
+        and reads it back afterwards.
+
+        When the db is a file, its one connection stays open. Every
+        read and write finishes its transaction, so the idle connection
+        holds no lock on the file while Dismod-AT runs, and sqlite sees
+        that the file changed on the next read.
 
         .. code::
 
             with dismod_objects.close_db_while_running():
                 dismod_objects.run_dismod(["fit"])
         """
-        self.close()
-        try:
+        if self._in_memory or self.dismod_file.engine is None:
+            self.close()
+            try:
+                yield
+            finally:
+                self._open_engine()
+        else:
+            self.flush()
             yield
-        finally:
-            self.dismod_file.engine = get_engine(self._filename)
 
     def run_dismod(self, command):
         """Pushes tables to the db file, runs Dismod-AT, and refreshes
@@ -408,12 +506,23 @@ class ObjectWrapper:
         """
         if isinstance(command, str):
             command = command.split()
+        # Dismod-AT drops and remakes tables besides those a command lists
+        # as output, so keep fingerprints only of the tables that define
+        # the model, which no command but ``set`` writes, and of the var
+        # table, which only ``init`` writes.
+        if command[0] in COMMAND_IO and command[0] != "set":
+            command_output = COMMAND_IO[command[0]].output
+            model_tables = (set(COMMAND_IO["init"].input) | {"var"}) - set(command_output)
+            self.dismod_file.forget_fingerprints(keep=model_tables)
+        else:
+            command_output = METRIC_TABLES
+            self.dismod_file.forget_fingerprints()
         self.flush()
         CODELOG.debug(f"Running Dismod-AT {command}")
         str_command = [str(word) for word in command]
         include_dismod = ["dmdismod", str(self.db_filename)] + str_command
         timed_command, timing_out_file = add_gross_timing(include_dismod)
-        metrics = gather_metrics(self.dismod_file)
+        metrics = self._command_metrics()
         metrics["dismod_at command"] = " ".join(str(x) for x in command)
         metrics.update({"processor type": processor_type()})
         try:
@@ -422,12 +531,27 @@ class ObjectWrapper:
                 return_code, stdout, stderr = run_with_logging(timed_command)
         finally:
             metrics.update(read_gross_timing(timing_out_file))
+            if set(command_output) & set(METRIC_TABLES):
+                self._metrics = None
         log = self.log
         check_command(str_command[0], log, return_code, stdout, stderr)
         if command[0] in COMMAND_IO:
             self.refresh(COMMAND_IO[command[0]].output)
         return stdout, stderr, metrics
 
+    def _command_metrics(self):
+        """Metrics on the db file to report with a command. Gathering them
+        reads the data table, so they are kept until this wrapper writes
+        a table they read or runs a command that writes one.
+
+        Returns:
+            Dict: A new dictionary of metric values.
+        """
+        fingerprints = self.dismod_file.fingerprints(METRIC_TABLES)
+        if self._metrics is None or self._metrics[0] != fingerprints:
+            self._metrics = (fingerprints, gather_metrics(self.dismod_file))
+        return dict(self._metrics[1])
+
     @property
     def log(self):
         """pd.DataFrame: Each record is a log entry indicating what
@@ -447,11 +571,7 @@ class ObjectWrapper:
         ``mean``, and any covariates. If you drop the sample index,
         and add standard deviation, this can serve as data values.
         """
-        avgint = read_avgint(self.dismod_file)
-        raw = self.dismod_file.predict.merge(avgint, on="avgint_id", how="left")
-        normalized = raw.drop(columns=["avgint_id", "predict_id"]).rename(columns={"avg_integrand": "mean"})
-        not_predicted = avgint[~avgint.avgint_id.isin(raw.avgint_id)].drop(columns=["avgint_id"])
-        return normalized, not_predicted
+        return read_predict(self.dismod_file)
 
     @property
     def age_extents(self):
@@ -594,65 +714,133 @@ class ObjectWrapper:
         doesn't change them.
         """
         db_file = self.dismod_file
-        # Density table does not depend on model.
-        if db_file.density.empty:
-            db_file.density = pd.DataFrame({"density_name": [x.name for x in DensityEnum]})
-
-        # Standard integrand naming scheme.
-        all_integrands = default_integrand_names()
-        if db_file.integrand.empty:
-            self.dismod_file.integrand = all_integrands
-            # Fill in the min_meas_cv later if required. Ensure integrand kinds have
-            # known IDs early. Not nan because this "is non-negative and less than
-            # or equal to one."
-            self.dismod_file.integrand["minimum_meas_cv"] = 0
-
-        if db_file.rate.empty:
-            db_file.rate = pd.DataFrame(dict(
-                rate_id=[rate.value for rate in RateEnum],  # Will be 0-4.
-                rate_name=[rate.name for rate in RateEnum],
-                parent_smooth_id=nan,
-                child_smooth_id=nan,
-                child_nslist_id=nan,
-            ))
+        # Density, integrand, rate, and option tables don't depend on the model.
+        # Fill in the integrand min_meas_cv later if required.
+        for table_name, table in _default_tables().items():
+            if db_file.row_count(table_name) == 0:
+                setattr(db_file, table_name, table)
 
         # Defaults, empty, b/c Brad makes them empty even if there are none.
         for create_name in ["nslist", "nslist_pair", "mulcov", "smooth_grid", "smooth", "data", "avgint"]:
-            if getattr(db_file, create_name).empty:
+            if not db_file.has_table(create_name):
                 setattr(db_file, create_name, self.dismod_file.empty_table(create_name))
-        if db_file.log.empty:
+        if db_file.row_count("log") == 0:
             db_file.log = make_log_table()
-        if db_file.option.empty:
-            self._create_options_table()
-
-    def _create_options_table(self):
-        # https://bradbell.github.io/dismod_at/doc/option_table.htm
-        # Only options in this list can be set.
-        option = pd.DataFrame([
-            dict(option_name="parent_node_id", option_value=nan),
-            dict(option_name="parent_node_name", option_value=nan),
-            dict(option_name="meas_noise_effect", option_value="add_var_scale_log"),
-            dict(option_name="zero_sum_random", option_value=nan),
-            dict(option_name="data_extra_columns", option_value=nan),
-            dict(option_name="avgint_extra_columns", option_value=nan),
-            dict(option_name="warn_on_stderr", option_value="true"),
-            dict(option_name="ode_step_size", option_value="5.0"),
-            dict(option_name="age_avg_split", option_value=nan),
-            dict(option_name="random_seed", option_value="0"),
-            dict(option_name="rate_case", option_value="iota_pos_rho_zero"),
-            dict(option_name="derivative_test_fixed", option_value="none"),
-            dict(option_name="derivative_test_random", option_value="none"),
-            dict(option_name="max_num_iter_fixed", option_value="100"),
-            dict(option_name="max_num_iter_random", option_value="100"),
-            dict(option_name="print_level_fixed", option_value=5),
-            dict(option_name="print_level_random", option_value=5),
-            dict(option_name="accept_after_max_steps_fixed", option_value="5"),
-            dict(option_name="accept_after_max_steps_random", option_value="5"),
-            dict(option_name="tolerance_fixed", option_value="1e-8"),
-            dict(option_name="tolerance_random", option_value="1e-8"),
-            dict(option_name="quasi_fixed", option_value="false"),
-            dict(option_name="bound_frac_fixed", option_value="1e-2"),
-            dict(option_name="limited_memory_max_history_fixed", option_value="30"),
-            dict(option_name="bound_random", option_value=nan),
-        ], columns=["option_name", "option_value"])
-        self.dismod_file.option = option.assign(option_id=option.index)
+
+
+def _default_options():
+    # https://bradbell.github.io/dismod_at/doc/option_table.htm
+    # Only options in this list can be set.
+    option = pd.DataFrame([
+        dict(option_name="parent_node_id", option_value=nan),
+        dict(option_name="parent_node_name", option_value=nan),
+        dict(option_name="meas_noise_effect", option_value="add_var_scale_log"),
+        dict(option_name="zero_sum_random", option_value=nan),
+        dict(option_name="data_extra_columns", option_value=nan),
+        dict(option_name="avgint_extra_columns", option_value=nan),
+        dict(option_name="warn_on_stderr", option_value="true"),
+        dict(option_name="ode_step_size", option_value="5.0"),
+        dict(option_name="age_avg_split", option_value=nan),
+        dict(option_name="random_seed", option_value="0"),
+        dict(option_name="rate_case", option_value="iota_pos_rho_zero"),
+        dict(option_name="derivative_test_fixed", option_value="none"),
+        dict(option_name="derivative_test_random", option_value="none"),
+        dict(option_name="max_num_iter_fixed", option_value="100"),
+        dict(option_name="max_num_iter_random", option_value="100"),
+        dict(option_name="print_level_fixed", option_value=5),
+        dict(option_name="print_level_random", option_value=5),
+        dict(option_name="accept_after_max_steps_fixed", option_value="5"),
+        dict(option_name="accept_after_max_steps_random", option_value="5"),
+        dict(option_name="tolerance_fixed", option_value="1e-8"),
+        dict(option_name="tolerance_random", option_value="1e-8"),
+        dict(option_name="quasi_fixed", option_value="false"),
+        dict(option_name="bound_frac_fixed", option_value="1e-2"),
+        dict(option_name="limited_memory_max_history_fixed", option_value="30"),
+        dict(option_name="bound_random", option_value=nan),
+    ], columns=["option_name", "option_value"])
+    return option.assign(option_id=option.index)
+
+
+def _default_tables():
+    """The tables every db file starts with that have rows, by name."""
+    # Integrand kinds have known IDs early. The minimum_meas_cv is not nan because
+    # this "is non-negative and less than or equal to one."
+    return dict(
+        density=pd.DataFrame({"density_name": [x.name for x in DensityEnum]}),
+        integrand=default_integrand_names().assign(minimum_meas_cv=0),
+        rate=pd.DataFrame(dict(
+            rate_id=[rate.value for rate in RateEnum],  # Will be 0-4.
+            rate_name=[rate.name for rate in RateEnum],
+            parent_smooth_id=nan,
+            child_smooth_id=nan,
+            child_nslist_id=nan,
+        )),
+        option=_default_options(),
+    )
+
+
+@lru_cache(maxsize=1)
+def _template_fingerprint():
+    """A hash of ``TEMPLATE_VERSION``, the schema, and the contents of the
+    default tables, so that a change to any of them makes a new template."""
+    schema = "\n".join(
+        sqlite_table_ddl(table_name, table_definition)
+        for (table_name, table_definition) in sorted(Base.metadata.tables.items())
+    )
+    digest = sha1(f"{TEMPLATE_VERSION}\n{schema}".encode())
+    for table_name, table in sorted(_default_tables().items()):
+        digest.update(f"{table_name}:{','.join(table.columns)}".encode())
+        digest.update(pd.util.hash_pandas_object(table, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _template_directory():
+    """A directory for templates that only this user can write, so that
+    nobody else can leave a template there for this user to copy.
+    If the shared one isn't private, this makes a new one for the process."""
+    directory = Path(gettempdir()) / f"cascade_dismod_{os.getuid()}"
+    try:
+        directory.mkdir(mode=0o700, exist_ok=True)
+        status = directory.lstat()
+    except OSError as mkdir_error:
+        CODELOG.warning(f"Cannot use template directory {directory}: {mkdir_error}")
+        return _process_template_directory()
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        CODELOG.warning(f"Template directory {directory} isn't private to this user, so not using it.")
+        return _process_template_directory()
+    return directory
+
+
+@lru_cache(maxsize=1)
+def _process_template_directory():
+    return Path(mkdtemp(prefix="cascade_dismod_"))
+
+
+def template_db_file():
+    """A db file that has only the default tables, which are the same for
+    every model. The file is in a directory in the temporary directory
+    that belongs to this user, and its name includes a hash of the schema,
+    the default tables, and ``TEMPLATE_VERSION``, so processes
+    share it until any of them changes. It's made the first time it's needed.
+    The log table is empty so that each new file logs its own command.
+
+    Returns:
+        Path: The template file.
+    """
+    template_path = _template_directory() / f"cascade_dismod_template_{_template_fingerprint()}.db"
+    if not template_path.exists():
+        handle, build_name = mkstemp(prefix=template_path.stem, suffix=".db", dir=str(template_path.parent))
+        os.close(handle)
+        build_path = Path(build_name)
+        build_path.unlink()
+        try:
+            builder = ObjectWrapper(build_path, template=False)
+            builder.dismod_file.log = builder.dismod_file.empty_table("log")
+            builder.close()
+            # Replace is atomic, so another process sees either no template or all of it.
+            os.replace(str(build_path), str(template_path))
+        finally:
+            if build_path.exists():
+                build_path.unlink()
+        CODELOG.debug(f"Made template db file {template_path}")
+    return template_path
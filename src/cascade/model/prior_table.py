@@ -0,0 +1,234 @@
+"""
+A table of many priors, stored as one array per parameter.
+"""
+from math import nan
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from cascade.dismod.constants import DensityEnum
+from cascade.model.priors import PriorError, prior_distribution
+
+_WITH_STD = [DensityEnum[name].value for name in
+             ["gaussian", "laplace", "students", "log_gaussian", "log_laplace", "log_students"]]
+_WITH_NU = [DensityEnum.students.value, DensityEnum.log_students.value]
+
+
+class PriorTable:
+    """Holds many priors as arrays of their parameters, in the order of
+    the columns of Dismod-AT's prior table. Where a list of Prior objects
+    would hold a dictionary per prior, this holds a handful of arrays,
+    and it checks, samples, and writes all of its priors at once.
+
+    >>> table = PriorTable.from_priors([Gaussian(0, 0.1), Uniform(-1, 1), Constant(0.3)])
+    >>> table.validate()
+    >>> samples = table.rvs(size=100)
+    >>> dismod_prior = table.to_dismod()
+
+    A prior is constant when its lower and upper bounds are equal,
+    as for :py:func:`cascade.model.priors.prior_distribution`.
+
+    Args:
+        density_id (np.ndarray): Integer ids from
+            :py:class:`cascade.dismod.constants.DensityEnum`.
+        mean (np.ndarray): Means.
+        std (np.ndarray): Standard deviations, nan where unused.
+        lower (np.ndarray): Lower bounds.
+        upper (np.ndarray): Upper bounds.
+        eta (np.ndarray): Offsets for log densities, nan where unused.
+        nu (np.ndarray): Degrees of freedom, nan where unused.
+        name (np.ndarray): Names, which can be None.
+    """
+    PARAMETERS = ["mean", "std", "lower", "upper", "eta", "nu"]
+
+    def __init__(self, density_id, mean, std, lower, upper, eta, nu, name=None):
+        self.density_id = np.asarray(density_id, dtype=np.int)
+        count = len(self.density_id)
+        for parameter, values in zip(self.PARAMETERS, [mean, std, lower, upper, eta, nu]):
+            as_array = np.array(values, dtype=np.float)
+            if as_array.shape != (count,):
+                raise ValueError(f"Prior parameter {parameter} has shape {as_array.shape} instead of {(count,)}.")
+            setattr(self, parameter, as_array)
+        if name is None:
+            name = [None] * count
+        self.name = np.empty((count,), dtype=np.object)
+        self.name[:] = name
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Make a table from a DataFrame with a ``density`` column of
+        density names and columns for the parameters, as in
+        :py:attr:`cascade.model.SmoothGrid.priors`. Missing parameter
+        columns are nan.
+        """
+        density_id = frame.density.map({density.name: density.value for density in DensityEnum})
+        if density_id.isna().any():
+            unknown = set(frame.density[density_id.isna()])
+            raise PriorError(f"Unknown densities {unknown}.")
+        columns = {
+            parameter: frame[parameter].values if parameter in frame.columns else np.full(len(frame), nan)
+            for parameter in cls.PARAMETERS
+        }
+        name = frame["name"].values if "name" in frame.columns else None
+        return cls(density_id.values, name=name, **columns)
+
+    @classmethod
+    def from_priors(cls, priors):
+        """Make a table from a list of Prior objects."""
+        rows = [dict(prior.parameters(), name=prior.name) for prior in priors]
+        return cls.from_frame(pd.DataFrame(rows, columns=["density", "name"] + cls.PARAMETERS))
+
+    def __len__(self):
+        return len(self.density_id)
+
+    def __getitem__(self, index):
+        """A single Prior object, or a new PriorTable for a slice or an array index."""
+        if np.isscalar(index):
+            parameters = {parameter: getattr(self, parameter)[index] for parameter in self.PARAMETERS}
+            parameters["density"] = DensityEnum(self.density_id[index]).name
+            prior = prior_distribution(parameters)
+            return prior.assign(name=self.name[index])
+        return PriorTable(
+            self.density_id[index],
+            name=self.name[index],
+            **{parameter: getattr(self, parameter)[index] for parameter in self.PARAMETERS}
+        )
+
+    @property
+    def constant(self):
+        """np.ndarray: True where a prior is constant."""
+        return np.isclose(self.lower, self.upper)
+
+    def invalid(self):
+        """Finds priors that the Prior classes would refuse to make.
+
+        Returns:
+            np.ndarray: An array of messages, empty strings where a prior is valid.
+        """
+        message = np.full((len(self),), "", dtype=np.object)
+        known = np.isin(self.density_id, [density.value for density in DensityEnum])
+        message[~known] = "unknown density"
+        bounds = np.stack([self.lower, self.mean, self.upper])
+        with np.errstate(invalid="ignore"):
+            missing_bound = np.isnan(bounds).any(axis=0)
+            inconsistent = ~missing_bound & ~((self.lower <= self.mean) & (self.mean <= self.upper))
+            # Constants have only a mean.
+            checked = known & ~self.constant
+            bad_std = checked & np.isin(self.density_id, _WITH_STD) & ~(self.std >= 0)
+            bad_nu = checked & np.isin(self.density_id, _WITH_NU) & ~(self.nu > 2)
+            bad_eta = checked & (self.density_id == DensityEnum.log_students.value) & ~(self.mean + self.eta > 0)
+        for failed, reason in [
+            (missing_bound, "bounds contain invalid values"),
+            (inconsistent, "bounds are inconsistent"),
+            (bad_std, "standard deviation must be positive"),
+            (bad_nu, "nu must be greater than 2"),
+            (bad_eta, "mean plus eta must be positive"),
+        ]:
+            message[failed & (message == "")] = reason
+        return message
+
+    def validate(self):
+        """Raises a :py:class:`PriorError` if any prior is invalid,
+        using the same rules as the Prior classes."""
+        message = self.invalid()
+        failed = np.nonzero(message != "")[0]
+        if len(failed) > 0:
+            examples = "; ".join(f"{idx}: {message[idx]}" for idx in failed[:5])
+            raise PriorError(f"{len(failed)} of {len(self)} priors are invalid: {examples}")
+
+    def rvs(self, size=1, random_state=None):
+        """Sample from every prior at once. Each sample is drawn within
+        the lower and upper bounds of its prior, by inverting the
+        distribution function over the part of it between the bounds.
+
+        Args:
+            size (int): Number of random variates for each prior, default 1.
+            random_state (numpy.random.RandomState): For repeatable draws.
+
+        Returns:
+            np.ndarray: Floats with shape (priors, size).
+        """
+        if random_state is None:
+            random_state = np.random.RandomState()
+        uniform_draws = random_state.uniform(size=(len(self), size))
+        samples = np.full((len(self), size), nan, dtype=np.float)
+        constant = self.constant
+        samples[constant] = self.mean[constant, np.newaxis]
+        for density in DensityEnum:
+            use = (self.density_id == density.value) & ~constant
+            if not use.any():
+                continue
+            if density == DensityEnum.uniform:
+                lower, upper = self.lower[use, np.newaxis], self.upper[use, np.newaxis]
+                samples[use] = lower + (upper - lower) * uniform_draws[use]
+                continue
+            distribution = self._scipy_distribution(density, use)
+            low = distribution.cdf(self.lower[use, np.newaxis])
+            high = distribution.cdf(self.upper[use, np.newaxis])
+            samples[use] = distribution.ppf(low + (high - low) * uniform_draws[use])
+        return samples
+
+    def _scipy_distribution(self, density, use):
+        """A frozen scipy distribution for the priors with this density,
+        with the same parameters the Prior classes use for their rvs."""
+        mean, std = self.mean[use, np.newaxis], self.std[use, np.newaxis]
+        if density == DensityEnum.gaussian:
+            return stats.norm(loc=mean, scale=std)
+        elif density == DensityEnum.laplace:
+            return stats.laplace(loc=mean, scale=std / np.sqrt(2))
+        elif density == DensityEnum.students:
+            nu = self.nu[use, np.newaxis]
+            return stats.t(df=nu, loc=mean, scale=std / np.sqrt(nu / (nu - 2)))
+        elif density in (DensityEnum.log_gaussian, DensityEnum.log_laplace):
+            return stats.lognorm(loc=mean, s=std, scale=np.exp(mean))
+        elif density == DensityEnum.log_students:
+            # Dismod-AT's log densities have their standard deviation in
+            # log space, as the difference of logs of the offset mean and the
+            # offset mean plus the standard deviation.
+            nu, eta = self.nu[use, np.newaxis], self.eta[use, np.newaxis]
+            log_std = np.log(mean + eta + std) - np.log(mean + eta)
+            log_t = stats.t(df=nu, loc=np.log(mean + eta), scale=log_std / np.sqrt(nu / (nu - 2)))
+            return _OffsetLog(log_t, eta)
+        else:
+            raise PriorError(f"Cannot sample from priors with density {density.name}.")
+
+    def to_dismod(self, prior_id_start=0):
+        """The Dismod-AT prior table for these priors.
+
+        Args:
+            prior_id_start (int): The ``prior_id`` of the first prior.
+
+        Returns:
+            pd.DataFrame: With columns ``prior_id``, ``prior_name``,
+            ``lower``, ``upper``, ``mean``, ``std``, ``eta``, ``nu``,
+            and ``density_id``.
+        """
+        return pd.DataFrame(dict(
+            prior_id=np.arange(prior_id_start, prior_id_start + len(self)),
+            prior_name=self.name,
+            lower=self.lower,
+            upper=self.upper,
+            mean=self.mean,
+            std=self.std,
+            eta=self.eta,
+            nu=self.nu,
+            density_id=self.density_id,
+        ))
+
+
+class _OffsetLog:
+    """The distribution of ``x`` when ``log(x + eta)`` has the given
+    distribution, with the ``cdf`` and ``ppf`` that ``rvs`` uses."""
+    def __init__(self, log_distribution, eta):
+        self.log_distribution = log_distribution
+        self.eta = eta
+
+    def cdf(self, x):
+        offset = np.broadcast_to(x + self.eta, np.broadcast(x, self.eta).shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_offset = np.log(np.where(offset > 0, offset, 1.0))
+        return np.where(offset > 0, self.log_distribution.cdf(log_offset), 0.0)
+
+    def ppf(self, q):
+        return np.exp(self.log_distribution.ppf(q)) - self.eta
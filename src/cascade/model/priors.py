@@ -21,6 +21,8 @@ class _Prior:
     """
 
     density = None
+    # Slots keep each prior small when there are many of them.
+    __slots__ = ("name",)
 
     def __init__(self, name=None):
         self.name = name
@@ -34,10 +36,12 @@ class _Prior:
     def assign(self, **kwargs):
         """Create a new distribution with modified parameters."""
         modified = copy(self)
-        if set(kwargs.keys()) - set(self.__dict__.keys()):
-            missing = list(sorted(set(kwargs.keys()) - set(self.__dict__.keys())))
+        attributes = {slot for klass in type(self).__mro__ for slot in getattr(klass, "__slots__", ())}
+        if set(kwargs.keys()) - attributes:
+            missing = list(sorted(set(kwargs.keys()) - attributes))
             raise AttributeError(f"The prior doesn't have these attributes {missing}.")
-        modified.__dict__.update(kwargs)
+        for attribute, value in kwargs.items():
+            setattr(modified, attribute, value)
         return modified
 
     def __hash__(self):
@@ -81,6 +85,7 @@ def _validate_nu(nu):
 
 class Uniform(_Prior):
     density = "uniform"
+    __slots__ = ("lower", "upper", "mean", "eta")
 
     def __init__(self, lower, upper, mean=None, eta=None, name=None):
         """
@@ -112,6 +117,22 @@ class Uniform(_Prior):
         """
         return self.assign(mean=min(self.upper, max(self.lower, np.mean(draws))))
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Using draws at many points, find a new mean at each point,
+        guaranteed between lower and upper, as :py:meth:`mle` does.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Unused.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` at each point.
+        """
+        return dict(mean=np.clip(np.mean(draws, axis=-1), lower, upper))
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -130,6 +151,7 @@ class Uniform(_Prior):
 
 class Constant(_Prior):
     density = "uniform"
+    __slots__ = ("mean",)
 
     def __init__(self, mean, name=None):
         """
@@ -145,6 +167,11 @@ class Constant(_Prior):
         """Don't change the const value. It is unaffected by this call."""
         return copy(self)
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Don't change the const values. Returns an empty dictionary."""
+        return dict()
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -179,6 +206,7 @@ class Gaussian(_Prior):
         name (str): Name for this prior.
     """
     density = "gaussian"
+    __slots__ = ("lower", "upper", "mean", "standard_deviation", "eta")
 
     def __init__(self, mean, standard_deviation, lower=float("-inf"), upper=float("inf"), eta=None, name=None):
         super().__init__(name=name)
@@ -210,6 +238,23 @@ class Gaussian(_Prior):
             standard_deviation=std
         )
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Assign new mean and stdev at many points at once, with the same
+        clamping as :py:meth:`mle`.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Unused.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` and ``std`` at each point.
+        """
+        mean, std = _normal_fit(draws)
+        return dict(mean=np.clip(mean, lower, upper), std=std)
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -259,6 +304,7 @@ class Laplace(Gaussian):
     The standard deviation assigned is :math:`\sigma`.
     """
     density = "laplace"
+    __slots__ = ()
 
     def mle(self, draws):
         """Assign new mean and stdev, with mean clamped between
@@ -277,6 +323,23 @@ class Laplace(Gaussian):
             standard_deviation=scale * np.sqrt(2)  # This is the adjustment.
         )
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Assign new mean and stdev at many points at once, with the same
+        clamping and scaling as :py:meth:`mle`.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Unused.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` and ``std`` at each point.
+        """
+        mean, scale = _laplace_fit(draws)
+        return dict(mean=np.clip(mean, lower, upper), std=scale * np.sqrt(2))
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -318,6 +381,7 @@ class StudentsT(_Prior):
 
     """
     density = "students"
+    __slots__ = ("lower", "upper", "mean", "standard_deviation", "nu", "eta")
 
     def __init__(self, mean, standard_deviation, nu, lower=float("-inf"), upper=float("inf"), eta=None, name=None):
         super().__init__(name=name)
@@ -350,6 +414,24 @@ class StudentsT(_Prior):
             standard_deviation=scale * np.sqrt(nu / (nu - 2))
         )
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Assign new mean and stdev at many points at once, keeping
+        each point's nu, with the same clamping as :py:meth:`mle`.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Degrees of freedom at each point.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` and ``std`` at each point.
+        """
+        nu = np.asarray(nu, dtype=np.float)
+        mean, scale = _students_fit(draws, nu)
+        return dict(mean=np.clip(mean, lower, upper), std=scale * np.sqrt(nu / (nu - 2)))
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -393,6 +475,7 @@ class LogGaussian(_Prior):
 
     """
     density = "log_gaussian"
+    __slots__ = ("lower", "upper", "mean", "standard_deviation", "eta")
 
     def __init__(self, mean, standard_deviation, eta, lower=float("-inf"), upper=float("inf"), name=None):
         super().__init__(name=name)
@@ -424,6 +507,23 @@ class LogGaussian(_Prior):
             standard_deviation=std
         )
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Assign new mean and stdev at many points at once, with the same
+        clamping as :py:meth:`mle`.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Unused.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` and ``std`` at each point.
+        """
+        mean, std = _normal_fit(draws)
+        return dict(mean=np.clip(mean, lower, upper), std=std)
+
     def rvs(self, size=1, random_state=None):
         """Sample from this distribution.
 
@@ -456,10 +556,12 @@ class LogGaussian(_Prior):
 
 class LogLaplace(LogGaussian):
     density = "log_laplace"
+    __slots__ = ()
 
 
 class LogStudentsT(_Prior):
     density = "log_students"
+    __slots__ = ("lower", "upper", "mean", "standard_deviation", "nu", "eta")
 
     def __init__(self, mean, standard_deviation, nu, eta, lower=float("-inf"), upper=float("inf"), name=None):
         super().__init__(name=name)
@@ -493,6 +595,23 @@ class LogStudentsT(_Prior):
             standard_deviation=std
         )
 
+    @classmethod
+    def batch_mle(cls, draws, lower, upper, nu=None):
+        """Assign new mean and stdev at many points at once, with the same
+        clamping as :py:meth:`mle`.
+
+        Args:
+            draws (np.ndarray): 2D array of floats, (points, draws).
+            lower (np.ndarray): Lower bound at each point.
+            upper (np.ndarray): Upper bound at each point.
+            nu (np.ndarray): Unused.
+
+        Returns:
+            Dict[str, np.ndarray]: The ``mean`` and ``std`` at each point.
+        """
+        mean, std = _normal_fit(draws)
+        return dict(mean=np.clip(mean, lower, upper), std=std)
+
     def _parameters(self):
         return {
             "lower": self.lower,
@@ -504,6 +623,54 @@ class LogStudentsT(_Prior):
         }
 
 
+def _normal_fit(draws):
+    """Location and scale for each row of draws, as
+    ``scipy.stats.norm.fit`` would find them."""
+    draws = np.asarray(draws, dtype=np.float)
+    return draws.mean(axis=-1), draws.std(axis=-1)
+
+
+def _laplace_fit(draws):
+    """Location and scale for each row of draws, as
+    ``scipy.stats.laplace.fit`` would find them. These have a closed form."""
+    draws = np.asarray(draws, dtype=np.float)
+    location = np.median(draws, axis=-1)
+    return location, np.abs(draws - location[..., np.newaxis]).mean(axis=-1)
+
+
+def _students_fit(draws, nu, iterations=500, tolerance=1e-10):
+    """Location and scale for each row of draws, with fixed degrees
+    of freedom, as ``scipy.stats.t.fit`` would find them. This uses
+    the EM iteration for the Students-t, which works on all rows at once.
+
+    Args:
+        draws (np.ndarray): 2D array of floats, (points, draws).
+        nu (np.ndarray): Degrees of freedom for each point.
+        iterations (int): Most iterations to do.
+        tolerance (float): Relative change at which to stop.
+
+    Returns:
+        (np.ndarray, np.ndarray): Location and scale.
+    """
+    draws = np.asarray(draws, dtype=np.float)
+    nu = np.broadcast_to(nu, draws.shape[:-1])[..., np.newaxis]
+    location = np.median(draws, axis=-1)
+    scale = draws.std(axis=-1)
+    for _ in range(iterations):
+        # Draws that are all the same have a scale of zero, and stay there.
+        safe_scale = np.where(scale > 0, scale, 1.0)[..., np.newaxis]
+        deviation = draws - location[..., np.newaxis]
+        weight = (nu + 1) / (nu + (deviation / safe_scale) ** 2)
+        next_location = (weight * draws).sum(axis=-1) / weight.sum(axis=-1)
+        next_scale = np.sqrt((weight * (draws - next_location[..., np.newaxis]) ** 2).mean(axis=-1))
+        converged = np.all(np.abs(next_location - location) <= tolerance * (np.abs(location) + scale)) \
+            and np.all(np.abs(next_scale - scale) <= tolerance * scale)
+        location, scale = next_location, next_scale
+        if converged:
+            break
+    return location, scale
+
+
 # Useful predefined priors
 
 NO_PRIOR = Uniform(float("-inf"), float("inf"), 0, name="null_prior")
@@ -0,0 +1,155 @@
+"""
+Many samples of the model variables, held as one array.
+"""
+from math import nan
+
+import numpy as np
+
+from cascade.model.var import bilinear
+
+
+class SampleSet:
+    """Samples of every model variable, such as those from Dismod-AT's
+    ``sample`` command or a set of fits to draws. The values are an array
+    with a row for each sample and a column for each ``var_id``, and the
+    :py:class:`cascade.model.var_layout.VarLayout` says which column
+    belongs to which grid point of which random field.
+
+    Summaries work on all samples at once and return a DismodGroups
+    of Vars. Indexing with an integer makes the DismodGroups of Vars for
+    that one sample, and indexing with a slice or array makes a
+    smaller SampleSet.
+
+    >>> samples = SampleSet.from_table(dismod_file.sample, layout)
+    >>> mean_var = samples.mean()
+    >>> upper_var = samples.quantile(0.975)
+    >>> iota = samples.field("rate", "iota")  # Shape (samples, ages, times).
+    >>> first_sample = samples[0]
+
+    Args:
+        layout (VarLayout): Where each random field is in a row.
+        values (np.ndarray): Floats with shape (samples, vars).
+        sample_index (np.ndarray): Dismod-AT's ``sample_index`` for each row.
+            Defaults to the row number.
+    """
+    def __init__(self, layout, values, sample_index=None):
+        self.layout = layout
+        self.values = np.atleast_2d(np.asarray(values, dtype=np.float))
+        if self.values.shape[1] != layout.size:
+            raise ValueError(f"Samples have {self.values.shape[1]} vars but the layout has {layout.size}.")
+        if sample_index is None:
+            sample_index = np.arange(self.values.shape[0])
+        self.sample_index = np.asarray(sample_index, dtype=np.int)
+
+    @classmethod
+    def from_table(cls, sample_table, layout):
+        """Make samples from a table with columns ``sample_index``,
+        ``var_id``, and ``var_value``, as in Dismod-AT's sample table.
+        Vars missing from the table are nan."""
+        sample_index, row = np.unique(sample_table.sample_index.values, return_inverse=True)
+        values = np.full((len(sample_index), layout.size), nan, dtype=np.float)
+        values[row, sample_table.var_id.values.astype(np.int)] = sample_table.var_value.values
+        return cls(layout, values, sample_index)
+
+    @classmethod
+    def from_vars(cls, var_groups_list, layout):
+        """Make samples from a list of DismodGroups of Vars, such as fits to draws."""
+        return cls(layout, layout.pack_many(var_groups_list))
+
+    def in_layout(self, layout):
+        """The same samples, with columns in the order of another layout
+        of the same random fields, such as the var table of another db file.
+
+        Args:
+            layout (VarLayout): Has the same random fields, on the same ages and times.
+
+        Returns:
+            SampleSet: With the given layout.
+        """
+        if layout is self.layout:
+            return self
+        values = np.full((len(self), layout.size), nan, dtype=np.float)
+        for group_name, key in layout.keys():
+            ages, times, positions, mulstd = layout.positions(group_name, key)
+            try:
+                own_ages, own_times, own_positions, own_mulstd = self.layout.positions(group_name, key)
+            except KeyError:
+                raise ValueError(f"Samples have no {group_name} {key} to put into the layout.")
+            if not (np.array_equal(ages, own_ages) and np.array_equal(times, own_times)):
+                raise ValueError(f"Samples of {group_name} {key} are on a different age-time grid from the layout.")
+            values[:, positions] = self.values[:, own_positions]
+            for kind, position in mulstd.items():
+                if kind in own_mulstd:
+                    values[:, position] = self.values[:, own_mulstd[kind]]
+        return SampleSet(layout, values, self.sample_index)
+
+    def to_table(self):
+        """The samples as columns ``sample_index``, ``var_id``,
+        and ``var_value``, which is the layout of Dismod-AT's sample table.
+
+        Returns:
+            Dict[str, np.ndarray]: Columns, sorted by sample and var.
+        """
+        sample_cnt, var_cnt = self.values.shape
+        return dict(
+            sample_index=np.repeat(self.sample_index, var_cnt),
+            var_id=np.tile(np.arange(var_cnt), sample_cnt),
+            var_value=self.values.ravel(),
+        )
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    def __getitem__(self, index):
+        if np.isscalar(index):
+            return self.layout.unpack(self.values[index])
+        return SampleSet(self.layout, self.values[index], self.sample_index[index])
+
+    def __iter__(self):
+        for row_idx in range(len(self)):
+            yield self[row_idx]
+
+    def keys(self):
+        """Iterate over (group name, key) of every random field."""
+        return self.layout.keys()
+
+    def field(self, group_name, key):
+        """The samples of one random field.
+
+        Returns:
+            np.ndarray: With shape (samples, ages, times).
+        """
+        _ages, _times, positions, _mulstd = self.layout.positions(group_name, key)
+        return self.values[:, positions]
+
+    def on_grid(self, group_name, key, ages, times):
+        """The samples of one random field at every combination of ages and times,
+        interpolated as :py:meth:`cascade.model.Var.__call__` does.
+
+        Returns:
+            np.ndarray: With shape (samples, ages, times).
+        """
+        field_ages, field_times, positions, _mulstd = self.layout.positions(group_name, key)
+        ages = np.atleast_1d(np.asarray(ages, dtype=np.float))
+        times = np.atleast_1d(np.asarray(times, dtype=np.float))
+        return bilinear(
+            field_ages, field_times, self.values[:, positions], ages[:, np.newaxis], times[np.newaxis, :])
+
+    def mean(self):
+        """DismodGroups: The mean over samples, as a Var for each random field."""
+        return self.layout.unpack(np.mean(self.values, axis=0))
+
+    def std(self, ddof=1):
+        """DismodGroups: The standard deviation over samples, as a Var for each random field."""
+        return self.layout.unpack(np.std(self.values, axis=0, ddof=ddof))
+
+    def quantile(self, q):
+        """The quantile over samples, as a Var for each random field.
+
+        Args:
+            q (float): Between 0 and 1.
+
+        Returns:
+            DismodGroups: Of Vars.
+        """
+        return self.layout.unpack(np.percentile(self.values, 100 * q, axis=0))
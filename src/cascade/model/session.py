@@ -6,6 +6,7 @@ from cascade.core import getLoggers
 from cascade.model import Model
 from cascade.model.data_read_write import amend_data_input, point_age_time_to_interval
 from cascade.model.object_wrapper import ObjectWrapper
+from cascade.model.sample_set import SampleSet
 
 CODELOG, MATHLOG = getLoggers(__name__)
 
@@ -16,7 +17,8 @@ class Session:
     predicts rates, and simulates. Collaborates with the ObjectWrapper
     to manipulate the DismodFile.
     """
-    def __init__(self, locations, parent_location, filename):
+    def __init__(self, locations, parent_location, filename, in_memory=False, intern_priors=False,
+                 share_child_smooths=False):
         """
         A session represents a connection with a Dismod-AT backend through
         a single Dismod-AT db file, the sqlite file it uses for input and
@@ -31,6 +33,14 @@ class Session:
                 data, but it isn't in the model. This is a location ID supplied
                 in the locations argument.
             filename (str|Path): Location of the Dismod db to overwrite.
+            in_memory (bool): Build the db in memory and write it to
+                ``filename`` only when Dismod-AT runs. See
+                :py:class:`cascade.model.object_wrapper.ObjectWrapper`.
+            intern_priors (bool): Write each distinct prior once in the
+                prior table, which makes smaller db files for large models.
+            share_child_smooths (bool): Write one smooth for children of
+                a rate that have the same random effect, which makes smaller
+                db files when there are many children.
         """
         assert isinstance(locations, pd.DataFrame)
         assert isinstance(parent_location, int)
@@ -38,7 +48,8 @@ class Session:
 
         self._filename = Path(filename)
         self._delete_db_file()
-        self._objects = ObjectWrapper(filename)
+        self._objects = ObjectWrapper(
+            filename, in_memory=in_memory, intern_priors=intern_priors, share_child_smooths=share_child_smooths)
         # Every time a new file is made, these local objects are set again
         # in the dismod objects.
         self._locations = locations
@@ -184,6 +195,42 @@ class Session:
         predicted, not_predicted = self._objects.predict
         return predicted, not_predicted
 
+    def predict_many(self, samples, avgint, parent_location, weights=None, covariates=None):
+        """Predicts the average integrands for many sets of rates with one
+        run of Dismod-AT's ``predict sample``, which predicts for every
+        sample in the sample table. The arguments are those of
+        :py:meth:`predict`, except for the samples.
+
+        Args:
+            samples (SampleSet|List[DismodGroups]): Sets of Var objects
+                with rates, all on the same grids.
+            avgint (pd.DataFrame): Request data, as for ``predict``.
+            parent_location: The id of the parent location.
+            weights (Dict[Var]): Weights, as for ``predict``.
+            covariates (List[Covariate]): Covariates, as for ``predict``.
+
+        Returns:
+            (pd.DataFrame, pd.DataFrame): The predicted avgints, in one
+            long DataFrame for all samples, and those not predicted. The
+            ``sample_index`` column is the ``sample_index`` of the SampleSet,
+            or the position in the list of sets of Vars.
+        """
+        if not isinstance(samples, SampleSet):
+            samples = list(samples)
+        var = samples[0]
+        self._check_vars(var)
+        model = Model.from_var(var, parent_location, weights=weights, covariates=covariates)
+        self.setup_model_for_fit(model)
+        avgint = point_age_time_to_interval(avgint)
+        self._objects.avgint = avgint
+        if not isinstance(samples, SampleSet):
+            samples = SampleSet.from_vars(samples, self._objects.var_layout)
+        self._objects.samples = samples
+        self._objects.run_dismod(["predict", "sample"])
+        predicted, not_predicted = self._objects.predict
+        predicted = predicted.assign(sample_index=samples.sample_index[predicted.sample_index.values])
+        return predicted, not_predicted
+
     def simulate(self, model, data, fit_var, simulate_count):
         """Simulates posterior distribution for model variables.
 
@@ -222,7 +269,8 @@ class Session:
             simulate_result (SimulateResult): Output of a simulate command.
 
         Returns:
-            DismodGroups[Var] with multiple samples.
+            SampleSet: All of the samples, which can make a DismodGroups
+            of Vars for each sample or for summaries across samples.
         """
         self._objects.run_dismod(["sample", "simulate", simulate_result.count])
         return self._objects.samples
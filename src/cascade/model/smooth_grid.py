@@ -51,7 +51,7 @@ class _PriorGrid(AgeTimeGrid):
             self._mulstd[self._kind].loc[:, self.columns] = [None, 0, .1, -inf, inf, nan, nan, None]
 
     def __getitem__(self, at_slice):
-        return prior_distribution(super().__getitem__(at_slice).iloc[0])
+        return prior_distribution(self._point_values(at_slice))
 
     def __setitem__(self, at_slice, value):
         """
@@ -65,12 +65,32 @@ class _PriorGrid(AgeTimeGrid):
         to_set = value.parameters()
         super().__setitem__(at_slice, [to_set[setp] if setp in to_set else nan for setp in self.columns])
 
+    def set_parameters(self, **parameters):
+        """Set the prior at every grid point from arrays of parameters.
+        This is the array form of setting a prior with ``grid[:, :] = prior``,
+        so the parameters are named as in a prior's ``parameters()``,
+        and any column not given is unset.
+
+        >>> grid = SmoothGrid([0, 5, 10], [2000, 2010])
+        >>> rates = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+        >>> grid.value.set_parameters(density="gaussian", mean=rates, std=0.1 * rates)
+
+        Args:
+            parameters: Each keyword is a column, ``density``, ``mean``,
+                ``std``, ``lower``, ``upper``, ``eta``, or ``nu``, and each
+                value broadcasts to an array with shape (ages, times).
+        """
+        if "density" not in parameters:
+            raise ValueError(f"Prior parameters need a density, not only {list(parameters.keys())}.")
+        unknown = set(parameters.keys()) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Prior parameters {list(sorted(unknown))} aren't in {self.columns}.")
+        for column in self.columns:
+            self.set_plane(column, parameters.get(column, nan))
+
     def apply(self, transform):
-        for idx, row in self.grid.loc[:, self.columns + ["age", "time"]].iterrows():
-            new_distribution = transform(row.age, row.time, prior_distribution(row))
-            to_set = new_distribution.parameters()
-            self.grid.iloc[idx, self.columns] = [
-                to_set[setp] if setp in to_set else nan for setp in self.columns]
+        for age, time in self.age_time():
+            self[age, time] = transform(age, time, self[age, time])
 
 
 class SmoothGrid:
@@ -100,10 +120,7 @@ class SmoothGrid:
             Var: A new Var object with the same ages and times and value
             equal to the mean.
         """
-        var = Var(self.ages, self.times)
-        for age, time in self.age_time():
-            var[age, time] = self.value[age, time].mean
-        return var
+        return Var.from_array(self.ages, self.times, self.value.to_array("mean"))
 
     def __len__(self):
         return self.variable_count()
@@ -150,7 +167,7 @@ class SmoothGrid:
         """All priors in one dataframe. Used for serialization."""
         total = list()
         for kind, view in self._view.items():
-            total.append(view.grid.assign(kind=kind))
+            total.append(view._as_frame().assign(kind=kind))
             total.append(view.mulstd[kind].assign(kind=kind))
         return pd.concat(total).reset_index(drop=True)
 
@@ -169,11 +186,9 @@ def uninformative_grid_from_var(var, strictly_positive):
     """
     smooth_grid = SmoothGrid(var.ages, var.times)
     if strictly_positive:
-        smooth_grid.value.grid.loc[:, ["density", "mean", "lower", "upper"]] = [
-            "uniform", 1e-2, 1e-9, 5
-        ]
+        smooth_grid.value.set_parameters(density="uniform", mean=1e-2, lower=1e-9, upper=5)
     else:
-        smooth_grid.value.grid.loc[:, ["density", "lower", "upper", "mean"]] = ["uniform", -inf, inf, 0]
-    smooth_grid.dage.grid.loc[:, ["density", "lower", "upper", "mean"]] = ["uniform", -inf, inf, 0]
-    smooth_grid.dtime.grid.loc[:, ["density", "lower", "upper", "mean"]] = ["uniform", -inf, inf, 0]
+        smooth_grid.value.set_parameters(density="uniform", lower=-inf, upper=inf, mean=0)
+    smooth_grid.dage.set_parameters(density="uniform", lower=-inf, upper=inf, mean=0)
+    smooth_grid.dtime.set_parameters(density="uniform", lower=-inf, upper=inf, mean=0)
     return smooth_grid
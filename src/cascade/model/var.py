@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.interpolate import RectBivariateSpline, interp1d
 
 from cascade.dismod.constants import PriorKindEnum
 from cascade.model.age_time_grid import AgeTimeGrid
@@ -27,15 +26,74 @@ class Var(AgeTimeGrid):
     def __init__(self, ages, times, column_name="mean"):
         self._column_name = column_name
         super().__init__(ages, times, columns=self._column_name)
+        # Cached values used for interpolation, with the array they came from.
         self._spline = None
 
+    @classmethod
+    def from_array(cls, ages, times, values, column_name="mean", copy=True):
+        """Make a Var from values on every age and time.
+
+        >>> var = Var.from_array([0, 50], [2000, 2010], [[0.1, 0.2], [0.3, 0.4]])
+        >>> assert var[50, 2000] == 0.3
+
+        Args:
+            ages (List[float]): Points along the age axis.
+            times (List[float]): Points in time.
+            values (np.ndarray): With shape (ages, times), so that
+                ``values[i, j]`` is the value at ``ages[i]`` and ``times[j]``.
+            column_name (str): Name of the column, as in the constructor.
+            copy (bool): If False, and the values are floats with shape
+                (ages, times) on increasing ages and times, the Var
+                holds a view of them, so that changing either changes both,
+                until the Var's ``grid`` DataFrame is used. Otherwise,
+                the Var has a copy.
+
+        Returns:
+            Var: A new Var.
+        """
+        ages = np.atleast_1d(np.asarray(ages, dtype=np.float))
+        times = np.atleast_1d(np.asarray(times, dtype=np.float))
+        var = cls(ages, times, column_name)
+        values = np.asarray(values, dtype=np.float)
+        in_order = (np.diff(ages) > 0).all() and (np.diff(times) > 0).all()
+        if not copy and in_order and values.shape == (len(ages), len(times)):
+            var._values = values[:, :, np.newaxis]
+            return var
+        values = np.broadcast_to(values, (len(ages), len(times)))
+        var.set_plane(column_name, values[np.ix_(np.argsort(ages), np.argsort(times))])
+        return var
+
+    @classmethod
+    def from_frame(cls, frame, column_name="mean"):
+        """Make a Var from a long DataFrame with one row for every age
+        and time. The ages and times of the Var are those in the DataFrame.
+
+        Args:
+            frame (pd.DataFrame): With columns ``age``, ``time``, and the
+                column name.
+            column_name (str): Name of the column, as in the constructor.
+
+        Returns:
+            Var: A new Var.
+        """
+        ages = np.unique(frame.age.values.astype(np.float))
+        times = np.unique(frame.time.values.astype(np.float))
+        var = cls(ages, times, column_name)
+        var._set_frame(frame[["age", "time", column_name]].astype(np.float), checked_out=False)
+        if var._array() is None:
+            raise ValueError(
+                f"Var needs one row for each age and time but has {len(frame)} rows "
+                f"for {len(ages)} ages and {len(times)} times."
+            )
+        return var
+
     def check(self, name=None):
         """This raises a :py:class:`ValueError` if any part of the
         Var is uninitialized. None of the means should be nan. There should only be the
         three mulstds."""
-        if not self.grid[self._column_name].notna().all():
-            raise ValueError(
-                f"Var {name} has {self.grid[self._column_name].isna().sum()} nan values")
+        missing = self._as_frame()[self._column_name].isna()
+        if missing.any():
+            raise ValueError(f"Var {name} has {missing.sum()} nan values")
         if set(self.mulstd.keys()) - {"value", "dage", "dtime"}:
             raise ValueError(
                 f"Var {name} has mulstds besides the three: {list(self.mulstd.keys())}"
@@ -82,7 +140,7 @@ class Var(AgeTimeGrid):
         Returns:
             float: The value at this age and time.
         """
-        return float(super().__getitem__(age_and_time)[self._column_name])
+        return float(self._point_values(age_and_time)[self._column_name])
 
     def set_mulstd(self, kind, value):
         """Set the value of the multiplier on the standard deviation.
@@ -144,58 +202,122 @@ class Var(AgeTimeGrid):
         The grid points in a Var represent a continuous function, determined
         by bivariate interpolation. All points outside the grid are equal
         to the nearest point inside the grid.
+
+        Age and time can also be arrays, which broadcast against each other,
+        so that the result has a value for each pair. Use :py:meth:`on_grid`
+        for every combination of ages and times.
         """
-        if self._spline is None:
-            self._spline = self._as_function()
-        result = self._spline(age, time)
-        # Result can be a numpy array, so undo that if input wasn't an array.
+        result = bilinear(self.ages, self.times, self._heights(), np.asarray(age), np.asarray(time))
+        # Result is a numpy array, so undo that if input wasn't an array.
         if np.isscalar(age) and np.isscalar(time):
             return result.item()  # Numpy array has item().
         else:
             return result
 
-    def _as_function(self):
-        """Constructs a function which mimics how Dismod-AT turns a field of
-        points in age and time into a continuous function.
+    def on_grid(self, ages, times):
+        """Evaluate the Var at every combination of the given ages and times.
+
+        >>> var = Var([0, 100], [1990, 2000])
+        >>> var[:, :] = 0.01
+        >>> assert var.on_grid([0, 10, 50], [1995, 2000]).shape == (3, 2)
+
+        Args:
+            ages (np.ndarray): Ages at which to evaluate.
+            times (np.ndarray): Times at which to evaluate.
 
         Returns:
-            function: Of age and time.
+            np.ndarray: With shape (ages, times).
         """
-        age_time_df = self.grid
-        ordered = age_time_df.sort_values(["age", "time"])
-        age = np.sort(np.unique(age_time_df.age.values))
-        time = np.sort(np.unique(age_time_df.time.values))
-        if len(age) > 1 and len(time) > 1:
-            heights = ordered[self._column_name].values.reshape(len(age), len(time))
-            spline = RectBivariateSpline(age, time, heights, kx=1, ky=1)
+        return interpolate_vars([self], ages, times)[0]
 
-            def bivariate_function(x, y):
-                return spline(x, y)[0]
-
-            return bivariate_function
+    def _store(self, index, value):
+        super()._store(index, value)
+        self._spline = None
 
-        elif len(age) * len(time) > 1:
-            fill = (ordered[self._column_name].values[0], ordered[self._column_name].values[-1])
-            independent = age if len(age) != 1 else time
-            spline = interp1d(
-                independent, ordered[self._column_name].values, kind="linear", bounds_error=False, fill_value=fill)
+    def _heights(self):
+        """Values as floats with shape (ages, times). Float values are
+        a view, so they are current even when the array is a view of
+        someone else's, as from ``from_array``. Other values are converted
+        and cached until the values change, either by setting them or
+        through the ``grid`` DataFrame."""
+        values = self._array()
+        if values is None:
+            raise ValueError(
+                f"Cannot interpolate a Var that doesn't have one value per age and time: "
+                f"{len(self._frame)} rows for ages {len(self.ages)} times {len(self.times)}"
+            )
+        if len(self.ages) == 0 or len(self.times) == 0:
+            raise RuntimeError(f"Cannot interpolate if ages or times are length zero: "
+                               f"ages {len(self.ages)} times {len(self.times)}")
+        if values.dtype == np.float:
+            return values[:, :, 0]
+        if self._spline is None or self._spline[0] is not values:
+            self._spline = (values, values[:, :, 0].astype(np.float))
+        return self._spline[1]
 
-            def age_spline(x, _):
-                return spline(x)
 
-            def time_spline(_, y):
-                return spline(y)
+def interpolate_vars(stack, ages, times):
+    """Evaluate a stack of Vars at every combination of ages and times.
+    Vars that share an age-time grid are interpolated together.
 
-            if len(age) != 1:
-                return age_spline
-            else:
-                return time_spline
-        elif len(age) == 1 and len(time) == 1:
+    Args:
+        stack (List[Var]): Vars to evaluate. They can have different grids.
+        ages (np.ndarray): Ages at which to evaluate.
+        times (np.ndarray): Times at which to evaluate.
 
-            def constant_everywhere(_a, _t):
-                return ordered[self._column_name].values[0]
+    Returns:
+        np.ndarray: With shape (vars, ages, times).
+    """
+    ages = np.atleast_1d(np.asarray(ages, dtype=np.float))
+    times = np.atleast_1d(np.asarray(times, dtype=np.float))
+    result = np.empty((len(stack), len(ages), len(times)), dtype=np.float)
+    same_grid = dict()
+    for var_idx, var in enumerate(stack):
+        grid_key = (var.ages.tobytes(), var.times.tobytes())
+        same_grid.setdefault(grid_key, list()).append(var_idx)
+    for var_indices in same_grid.values():
+        first = stack[var_indices[0]]
+        heights = np.stack([stack[var_idx]._heights() for var_idx in var_indices])
+        result[var_indices] = bilinear(first.ages, first.times, heights, ages[:, np.newaxis], times[np.newaxis, :])
+    return result
+
+
+def bilinear(ages, times, heights, age, time):
+    """Mimics how Dismod-AT turns a field of points in age and time into
+    a continuous function. It interpolates linearly in age and in time,
+    and points outside the grid take the value of the nearest point on
+    the edge of the grid.
 
-            return constant_everywhere
-        else:
-            raise RuntimeError(f"Cannot interpolate if ages or times are length zero: "
-                               f"ages {len(age)} times {len(time)}")
+    Args:
+        ages (np.ndarray): Sorted ages of the grid.
+        times (np.ndarray): Sorted times of the grid.
+        heights (np.ndarray): Values with shape (..., ages, times),
+            so that leading axes are a stack of grids.
+        age (np.ndarray): Ages at which to evaluate.
+        time (np.ndarray): Times at which to evaluate, which broadcast
+            against the ages.
+
+    Returns:
+        np.ndarray: With shape of the leading axes of heights, followed by
+        the broadcast shape of age and time.
+    """
+    age_lower, age_upper, age_fraction = _bracket(ages, age)
+    time_lower, time_upper, time_fraction = _bracket(times, time)
+    low_age = heights[..., age_lower, time_lower] * (1 - time_fraction) \
+        + heights[..., age_lower, time_upper] * time_fraction
+    high_age = heights[..., age_upper, time_lower] * (1 - time_fraction) \
+        + heights[..., age_upper, time_upper] * time_fraction
+    return low_age * (1 - age_fraction) + high_age * age_fraction
+
+
+def _bracket(axis, points):
+    """For each point, the grid points below and above it, and how far
+    it is from the one below to the one above. Points are clamped to the axis."""
+    points = np.asarray(points, dtype=np.float)
+    if len(axis) == 1:
+        zero = np.zeros(points.shape, dtype=np.int)
+        return zero, zero, np.zeros(points.shape, dtype=np.float)
+    points = np.clip(points, axis[0], axis[-1])
+    upper = np.searchsorted(axis, points, side="right").clip(1, len(axis) - 1)
+    lower = upper - 1
+    return lower, upper, (points - axis[lower]) / (axis[upper] - axis[lower])
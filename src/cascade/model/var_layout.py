@@ -0,0 +1,175 @@
+"""
+Places every model variable at its ``var_id`` in one vector of floats.
+"""
+import json
+from math import nan
+
+import numpy as np
+
+from cascade.dismod.constants import PriorKindEnum
+from cascade.model.age_time_grid import AgeTimeGrid
+from cascade.model.dismod_groups import DismodGroups
+from cascade.model.var import Var
+
+
+class VarLayout:
+    """Dismod-AT numbers its model variables with a ``var_id``, and tables
+    such as ``start_var``, ``fit_var``, and ``sample`` list values by
+    that ``var_id``. The layout knows where each grid point and mulstd
+    of a DismodGroups of Vars goes in a vector indexed by ``var_id``,
+    so that a whole set of vars packs into a vector, and a set of draws
+    packs into a two-dimensional array, with one row per draw.
+
+    >>> layout = VarLayout(read_var_table_as_id(dismod_file), len(dismod_file.var))
+    >>> vector = layout.pack(fit_var)
+    >>> start_var = layout.unpack(vector)
+
+    Args:
+        var_ids (DismodGroups): The output of ``read_var_table_as_id``,
+            an AgeTimeGrid of ``var_id`` for each random field.
+        var_cnt (int): The number of model variables, which is the
+            length of the ``var`` table.
+    """
+    def __init__(self, var_ids, var_cnt):
+        self.var_ids = var_ids
+        self.size = var_cnt
+        # For each field, its ages, times, var_id at each grid point, and mulstd var_ids.
+        self._fields = dict()
+        for group_name, group in var_ids.items():
+            for key, id_grid in group.items():
+                positions = id_grid.to_array("var_id")
+                if np.isnan(positions).any():
+                    raise RuntimeError(f"Var ids for {group_name} {key} are missing at some ages and times.")
+                mulstd = dict()
+                for kind in PriorKindEnum:
+                    mulstd_id = float(id_grid.mulstd[kind.name]["var_id"].iloc[0])
+                    if not np.isnan(mulstd_id):
+                        mulstd[kind.name] = int(mulstd_id)
+                self._fields[(group_name, key)] = (
+                    id_grid.ages, id_grid.times, positions.astype(np.int), mulstd)
+
+    def __len__(self):
+        return self.size
+
+    def to_arrays(self):
+        """The layout as a dictionary of arrays, for ``np.savez``, so that
+        it can be saved without pickle. The inverse is ``from_arrays``.
+
+        Returns:
+            Dict[str,np.ndarray]: An ``index`` that is a JSON string of
+            the size and of each field's group, key, and mulstd var_ids,
+            and the ages, times, and positions of each field by number.
+        """
+        fields = list()
+        arrays = dict()
+        for field_idx, ((group_name, key), (ages, times, positions, mulstd)) in enumerate(self._fields.items()):
+            fields.append([group_name, key, mulstd])
+            arrays[f"ages_{field_idx}"] = ages
+            arrays[f"times_{field_idx}"] = times
+            arrays[f"positions_{field_idx}"] = positions
+        # Location ids in keys can be numpy integers.
+        arrays["index"] = np.array(json.dumps(dict(size=self.size, fields=fields), default=lambda value: value.item()))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Makes a layout from the arrays of ``to_arrays``.
+
+        Args:
+            arrays (Mapping[str,np.ndarray]): Such as what ``np.load`` returns.
+
+        Returns:
+            VarLayout
+        """
+        index = json.loads(str(arrays["index"]))
+        var_ids = DismodGroups()
+        for field_idx, (group_name, key, mulstd) in enumerate(index["fields"]):
+            id_grid = AgeTimeGrid(arrays[f"ages_{field_idx}"], arrays[f"times_{field_idx}"], "var_id")
+            id_grid.set_plane("var_id", arrays[f"positions_{field_idx}"])
+            for kind, mulstd_id in mulstd.items():
+                id_grid.mulstd[kind].loc[:, "var_id"] = mulstd_id
+            # JSON makes tuple keys into lists.
+            var_ids[group_name][tuple(key) if isinstance(key, list) else key] = id_grid
+        return cls(var_ids, index["size"])
+
+    def keys(self):
+        """Iterate over (group name, key) of every random field."""
+        yield from self._fields.keys()
+
+    def positions(self, group_name, key):
+        """Where one random field is in the vector.
+
+        Returns:
+            (np.ndarray, np.ndarray, np.ndarray, dict): The ages, the times,
+            the position of each grid point with shape (ages, times), and
+            the position of each mulstd the field has, by kind.
+        """
+        return self._fields[(group_name, key)]
+
+    def pack(self, var_groups, out=None):
+        """Put the values of a set of vars into a vector ordered by ``var_id``.
+
+        Args:
+            var_groups (DismodGroups): A Var for each random field in the layout,
+                on the same ages and times as the layout.
+            out (np.ndarray): A vector of length ``size`` to fill. Optional.
+
+        Returns:
+            np.ndarray: Floats, with nan for mulstds that aren't set.
+        """
+        if out is None:
+            out = np.full((self.size,), nan, dtype=np.float)
+        for (group_name, key), (ages, times, positions, mulstd) in self._fields.items():
+            var = var_groups[group_name][key]
+            if not (np.array_equal(var.ages, ages) and np.array_equal(var.times, times)):
+                raise RuntimeError(
+                    f"Could not align {group_name} {key} with var_id because the ages "
+                    f"{var.ages} and times {var.times} aren't ages {ages} and times {times}."
+                )
+            out[positions] = var.to_array()
+            for kind, mulstd_id in mulstd.items():
+                out[mulstd_id] = var.get_mulstd(kind)
+        return out
+
+    def pack_many(self, var_groups_list):
+        """Pack a list of sets of vars, such as draws, into one array.
+
+        Returns:
+            np.ndarray: With shape (len(var_groups_list), size).
+        """
+        packed = np.empty((len(var_groups_list), self.size), dtype=np.float)
+        for row_idx, var_groups in enumerate(var_groups_list):
+            self.pack(var_groups, out=packed[row_idx])
+        return packed
+
+    def unpack(self, vector):
+        """Make a set of vars from a vector ordered by ``var_id``. Where the
+        ``var_id`` of a field are in order, age by age, its Var holds a view
+        into the vector, so that changing the Var changes the vector until
+        the Var's ``grid`` DataFrame is used.
+
+        Args:
+            vector (np.ndarray): Floats of length ``size``.
+
+        Returns:
+            DismodGroups: With a Var for every random field.
+        """
+        vector = np.asarray(vector, dtype=np.float)
+        if vector.shape != (self.size,):
+            raise ValueError(f"Var vector has shape {vector.shape} but there are {self.size} vars.")
+        var_groups = DismodGroups()
+        for (group_name, key), (ages, times, positions, mulstd) in self._fields.items():
+            var = Var.from_array(ages, times, _view_or_copy(vector, positions), copy=False)
+            for kind, mulstd_id in mulstd.items():
+                var.set_mulstd(kind, vector[mulstd_id])
+            var_groups[group_name][key] = var
+        return var_groups
+
+
+def _view_or_copy(vector, positions):
+    """The values at the positions, as a view when the positions are
+    a contiguous run in order and a copy otherwise."""
+    start = positions.flat[0]
+    if np.array_equal(positions.ravel(), np.arange(start, start + positions.size)):
+        return vector[start:start + positions.size].reshape(positions.shape)
+    return vector[positions]
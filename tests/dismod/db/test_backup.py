@@ -0,0 +1,65 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from cascade.dismod.db.backup import save_database, load_database, _copy_through_attach
+from cascade.dismod.db.wrapper import DismodFile, get_engine
+
+
+def _schema(db_file):
+    conn = sqlite3.connect(str(db_file))
+    schema = conn.execute("SELECT type, name, tbl_name FROM sqlite_master ORDER BY name").fetchall()
+    age = conn.execute("SELECT * FROM age").fetchall()
+    conn.close()
+    return schema, age
+
+
+def test_save_then_load(tmp_path):
+    db_file = Path(tmp_path) / "saved.db"
+    memory = sqlite3.connect(":memory:")
+    memory.execute("CREATE TABLE age (age_id integer primary key, age real)")
+    memory.execute("CREATE INDEX ix_age ON age (age)")
+    memory.executemany("INSERT INTO age VALUES (?, ?)", [(0, 0.0), (1, 50.0)])
+    save_database(memory, db_file)
+    schema, age = _schema(db_file)
+    assert schema == [("table", "age", "age"), ("index", "ix_age", "age")]
+    assert age == [(0, 0.0), (1, 50.0)]
+
+    other = sqlite3.connect(":memory:")
+    other.execute("CREATE TABLE time (time_id integer primary key, time real)")
+    load_database(other, db_file)
+    tables = other.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    assert tables == [("age",)]
+    assert other.execute("SELECT age FROM age WHERE age_id = 1").fetchone() == (50.0,)
+
+
+def test_attach_copy_replaces_file(tmp_path):
+    db_file = Path(tmp_path) / "attached.db"
+    previous = sqlite3.connect(str(db_file))
+    previous.execute("CREATE TABLE time (time_id integer primary key, time real)")
+    previous.commit()
+    previous.close()
+
+    memory = sqlite3.connect(":memory:")
+    memory.execute("CREATE TABLE age (age_id integer primary key, age real)")
+    memory.execute("INSERT INTO age VALUES (3, 7.0)")
+    memory.commit()
+    _copy_through_attach(memory, db_file, "main", "dmfile")
+    schema, age = _schema(db_file)
+    assert schema == [("table", "age", "age")]
+    assert age == [(3, 7.0)]
+
+
+def test_dismod_file_save_to(tmp_path):
+    db_file = Path(tmp_path) / "dmfile.db"
+    dm_file = DismodFile(get_engine(None))
+    dm_file.age = pd.DataFrame(dict(age=[0.0, 1.0, 100.0]))
+    dm_file.save_to(db_file)
+
+    reread = DismodFile(get_engine(db_file))
+    assert reread.age.age.tolist() == [0.0, 1.0, 100.0]
+
+    loaded = DismodFile(get_engine(None))
+    loaded.load_from(db_file)
+    assert loaded.age.age_id.tolist() == [0, 1, 2]
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cascade.dismod.db.read_only import read_only_connection, read_table, read_tables, harvest
+from cascade.dismod.db.wrapper import DismodFile, get_engine
+
+
+@pytest.fixture
+def sample_files(tmp_path):
+    paths = list()
+    for file_idx in range(4):
+        db_file = Path(tmp_path) / f"draw{file_idx}.db"
+        dm_file = DismodFile(get_engine(db_file))
+        dm_file.sample = pd.DataFrame(dict(
+            sample_index=np.repeat([0, 1], 3),
+            var_id=np.tile([0, 1, 2], 2),
+            var_value=file_idx + np.linspace(0, 1, 6),
+        ))
+        dm_file.flush()
+        dm_file.engine.dispose()
+        paths.append(db_file)
+    return paths
+
+
+def test_read_table__columns_and_where(sample_files):
+    connection = read_only_connection(sample_files[1])
+    sample = read_table(connection, "sample", ["var_id", "var_value"], dict(sample_index=1))
+    connection.close()
+    assert list(sample.columns) == ["var_id", "var_value"]
+    assert sample.var_id.tolist() == [0, 1, 2]
+    assert sample.var_value.tolist() == pytest.approx(1 + np.linspace(0, 1, 6)[3:])
+
+
+def test_read_table__missing(sample_files):
+    connection = read_only_connection(sample_files[0])
+    assert read_table(connection, "predict", ["avg_integrand"]).empty
+    with pytest.raises(KeyError):
+        read_table(connection, "sample", ["var_mean"])
+    connection.close()
+
+
+def test_read_only_is_read_only(sample_files):
+    connection = read_only_connection(sample_files[0])
+    with pytest.raises(Exception):
+        connection.execute("DELETE FROM sample")
+    connection.close()
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_only_connection(Path(tmp_path) / "nothere.db")
+
+
+@pytest.mark.parametrize("threads", [None, 3])
+def test_harvest_keeps_order(sample_files, threads):
+    tables = harvest(sample_files, lambda path: read_tables(path, dict(sample=["var_value"])), threads)
+    first_values = [table["sample"].var_value.iloc[0] for table in tables]
+    assert first_values == [0.0, 1.0, 2.0, 3.0]
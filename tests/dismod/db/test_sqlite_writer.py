@@ -0,0 +1,130 @@
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cascade.dismod.db.metadata import Base
+from cascade.dismod.db.sqlite_writer import (
+    sqlite_table_ddl, sqlite_column_values, SqliteWriter
+)
+from cascade.dismod.db.wrapper import DismodFile, get_engine
+
+
+def test_ddl_uses_dismod_types():
+    ddl = sqlite_table_ddl("smooth_grid", Base.metadata.tables["smooth_grid"])
+    lines = ddl.splitlines()
+    assert lines[0] == "CREATE TABLE smooth_grid ("
+    assert lines[1].strip() == "smooth_grid_id integer primary key,"
+    assert "\tage_id integer," in lines
+    assert "\tconst_value real" in lines
+    assert "unique" not in ddl.lower()
+
+
+def test_ddl_enum_and_string_are_text():
+    ddl = sqlite_table_ddl("option", Base.metadata.tables["option"])
+    assert "option_name text" in ddl
+    assert "option_value text" in ddl
+
+
+@pytest.mark.parametrize("column,kind,expected", [
+    (pd.Series([1, 2], dtype=np.int64), "integer", [1, 2]),
+    (pd.Series([1.0, np.nan]), "integer", [1, None]),
+    (pd.Series([1, None], dtype="Int64"), "integer", [1, None]),
+    (pd.Series([0.5, np.nan, np.inf]), "real", [0.5, None, np.inf]),
+    (pd.Series(["a", None, 5], dtype=object), "text", ["a", None, "5"]),
+])
+def test_column_values_are_python_objects(column, kind, expected):
+    values = sqlite_column_values(column, kind)
+    assert list(values) == expected
+    for value, want in zip(values, expected):
+        if want is not None:
+            assert type(value) == type(want)
+
+
+def test_writer_rolls_back_on_error(tmp_path):
+    db_file = Path(tmp_path) / "rollback.db"
+    engine = get_engine(db_file)
+    age = pd.DataFrame(dict(age_id=[0, 1], age=[0.0, 50.0]))
+    with pytest.raises(RuntimeError):
+        with SqliteWriter(engine) as writer:
+            writer.replace_table("age", Base.metadata.tables["age"], age)
+            raise RuntimeError("fail after write")
+    conn = sqlite3.connect(str(db_file))
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+    assert not tables
+
+
+def test_writer_puts_pragmas_back(tmp_path):
+    engine = get_engine(Path(tmp_path) / "pragmas.db", persistent=True)
+    age = pd.DataFrame(dict(age_id=[0, 1], age=[0.0, 50.0]))
+    pooled = engine.raw_connection()
+    before = pooled.connection.execute("PRAGMA synchronous").fetchone()[0]
+    pooled.close()
+    with SqliteWriter(engine, dict(synchronous="off")) as writer:
+        assert writer.connection.execute("PRAGMA synchronous").fetchone()[0] == 0
+        writer.replace_table("age", Base.metadata.tables["age"], age)
+    pooled = engine.raw_connection()
+    assert pooled.connection.execute("PRAGMA synchronous").fetchone()[0] == before
+    pooled.close()
+
+
+def test_sqlite3_writer_round_trip(tmp_path):
+    db_file = Path(tmp_path) / "sqlite3.db"
+    dm_file = DismodFile(get_engine(db_file), writer="sqlite3")
+    dm_file.age = pd.DataFrame(dict(age=[0.0, 20.0, 100.0]))
+    dm_file.rate = pd.DataFrame(dict(
+        rate_id=[0, 1],
+        rate_name=["pini", "iota"],
+        parent_smooth_id=[np.nan, 2.0],
+        child_smooth_id=[np.nan, np.nan],
+        child_nslist_id=[np.nan, np.nan],
+    ))
+    dm_file.data = pd.DataFrame(dict(
+        data_name=["a", "b"],
+        integrand_id=pd.Series([1, 2], dtype="Int64"),
+        density_id=[1, 1],
+        node_id=[0, 0],
+        weight_id=[0, 0],
+        hold_out=[0, 1],
+        meas_value=[0.1, 0.2],
+        meas_std=[0.01, 0.01],
+        eta=[np.nan, 1e-4],
+        nu=[np.nan, np.nan],
+        age_lower=[0.0, 10.0],
+        age_upper=[0.0, 20.0],
+        time_lower=[2000.0, 2000.0],
+        time_upper=[2000.0, 2000.0],
+        x_0=[0.5, -0.5],
+    ))
+    dm_file.flush()
+
+    reread = DismodFile(get_engine(db_file))
+    assert reread.age.age.tolist() == [0.0, 20.0, 100.0]
+    assert reread.age.age_id.tolist() == [0, 1, 2]
+    assert reread.rate.rate_name.tolist() == ["pini", "iota"]
+    assert np.isnan(reread.rate.parent_smooth_id.iloc[0])
+    assert reread.rate.parent_smooth_id.iloc[1] == 2
+    assert reread.data.x_0.tolist() == [0.5, -0.5]
+    assert reread.data.integrand_id.tolist() == [1, 2]
+
+
+def test_sqlite3_and_pandas_write_same_schema(tmp_path):
+    schemas = dict()
+    for writer in ["pandas", "sqlite3"]:
+        db_file = Path(tmp_path) / f"{writer}.db"
+        dm_file = DismodFile(get_engine(db_file), writer=writer)
+        dm_file.node = pd.DataFrame(dict(node_name=["global", "child"], parent=[np.nan, 0]))
+        dm_file.flush()
+        conn = sqlite3.connect(str(db_file))
+        schemas[writer] = conn.execute("PRAGMA table_info(node)").fetchall()
+        conn.close()
+    assert schemas["pandas"] == schemas["sqlite3"]
+
+
+def test_unknown_writer():
+    dm_file = DismodFile(get_engine(None), writer="csv")
+    dm_file.age = pd.DataFrame(dict(age=[0.0]))
+    with pytest.raises(ValueError):
+        dm_file.flush()
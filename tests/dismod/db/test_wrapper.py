@@ -388,3 +388,356 @@ def test_write_empty_table(tmp_path):
     res = c.fetchall()
     print(res)
     assert not res
+
+
+@pytest.fixture(params=["pandas", "sqlite3"])
+def start_var_file(request, tmp_path):
+    db_file = Path(tmp_path) / "start_var.db"
+    dm_file = DismodFile(get_engine(db_file), writer=request.param)
+    dm_file.start_var = pd.DataFrame(dict(start_var_value=np.linspace(0.0, 1.0, 20)))
+    dm_file.flush()
+    return dm_file, db_file
+
+
+def _read_start_var(db_file):
+    conn = sqlite3.connect(str(db_file))
+    rows = conn.execute("SELECT start_var_id, start_var_value FROM start_var ORDER BY start_var_id").fetchall()
+    conn.close()
+    return rows
+
+
+def _replaced_tables(replace_spy):
+    return [call[0][1] for call in replace_spy.call_args_list if call[0][1] != "c_table_fingerprint"]
+
+
+def test_flush__changes_only_rows(start_var_file, mocker):
+    dm_file, db_file = start_var_file
+    replace = mocker.spy(type(dm_file._make_writer()), "replace_table")
+    start_var = dm_file.start_var
+    start_var.loc[3, "start_var_value"] = 7.0
+    start_var = start_var.drop(index=5)
+    dm_file.start_var = start_var.append(
+        dict(start_var_id=20, start_var_value=9.0), ignore_index=True).astype({"start_var_id": np.int64})
+    dm_file.flush()
+
+    assert _replaced_tables(replace) == []
+    rows = dict(_read_start_var(db_file))
+    assert len(rows) == 20
+    assert rows[3] == 7.0
+    assert 5 not in rows
+    assert rows[20] == 9.0
+    assert rows[4] == pytest.approx(4 / 19)
+    assert not dm_file._is_dirty("start_var")
+
+
+def test_flush__rows_after_reread(start_var_file, mocker):
+    dm_file, db_file = start_var_file
+    dm_file2 = DismodFile(dm_file.engine, writer=dm_file.writer)
+    replace = mocker.spy(type(dm_file2._make_writer()), "replace_table")
+    dm_file2.start_var.loc[0, "start_var_value"] = -1.0
+    dm_file2.flush()
+    assert _replaced_tables(replace) == []
+    assert _read_start_var(db_file)[0] == (0, -1.0)
+
+
+def test_flush__file_changed_underneath_replaces(start_var_file, mocker):
+    dm_file, db_file = start_var_file
+    # Stands in for Dismod-AT, which rewrites a table that the wrapper holds.
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("UPDATE start_var SET start_var_value = -5.0 WHERE start_var_id = 10")
+    conn.commit()
+    conn.close()
+    dm_file.forget_fingerprints(["start_var"])
+
+    replace = mocker.spy(type(dm_file._make_writer()), "replace_table")
+    start_var = dm_file.start_var.copy()
+    start_var.loc[3, "start_var_value"] = 7.0
+    dm_file.start_var = start_var
+    dm_file.flush()
+    assert _replaced_tables(replace) == ["start_var"]
+    rows = dict(_read_start_var(db_file))
+    assert rows[3] == 7.0
+    assert rows[10] == pytest.approx(10 / 19)
+
+
+def test_flush__many_changes_replace(start_var_file, mocker):
+    dm_file, db_file = start_var_file
+    replace = mocker.spy(type(dm_file._make_writer()), "replace_table")
+    dm_file.start_var = dm_file.start_var.assign(start_var_value=2.0)
+    dm_file.flush()
+    assert _replaced_tables(replace) == ["start_var"]
+    assert all(value == 2.0 for _, value in _read_start_var(db_file))
+
+
+def test_flush__column_type_change_replaces(start_var_file, mocker):
+    dm_file, db_file = start_var_file
+    replace = mocker.spy(type(dm_file._make_writer()), "replace_table")
+    dm_file.start_var = dm_file.start_var.astype({"start_var_id": np.int32})
+    dm_file.flush()
+    assert _replaced_tables(replace) == ["start_var"]
+    assert len(_read_start_var(db_file)) == 20
+
+
+def test_table_versions__change_on_assign_and_refresh(base_file):
+    base_file.flush()
+    first = base_file.table_versions(["age", "time"])
+    assert base_file.table_versions(["age", "time"]) == first
+    base_file.time = base_file.time.copy()
+    second = base_file.table_versions(["age", "time"])
+    assert second[0] == first[0] and second[1] != first[1]
+    base_file.refresh(["age"])
+    base_file.age  # Read again from the file, which keeps the version.
+    third = base_file.table_versions(["age", "time"])
+    assert third[0] != second[0] and third[1] == second[1]
+
+
+@pytest.fixture
+def read_only_file(base_file):
+    base_file.read_only_tables = True
+    base_file.flush()
+    return base_file
+
+
+def test_read_only__clean_without_hashing(read_only_file, mocker):
+    hashes = mocker.spy(read_only_file, "_row_hashes")
+    assert not read_only_file._is_dirty("age")
+    assert hashes.call_count == 0
+
+
+def test_read_only__in_place_assignment_fails(read_only_file):
+    with pytest.raises(ValueError):
+        read_only_file.age.loc[0, "age"] = 3.0
+    assert not read_only_file._is_dirty("age")
+
+
+def test_read_only__assign_copy_is_dirty(read_only_file):
+    age = read_only_file.age.copy()
+    age.loc[0, "age"] = 3.0
+    read_only_file.age = age
+    assert read_only_file._is_dirty("age")
+    read_only_file.flush()
+    assert not read_only_file._is_dirty("age")
+    assert DismodFile(read_only_file.engine).age.age.iloc[0] == 3.0
+
+
+def test_read_only__assign_same_values_is_clean(read_only_file):
+    read_only_file.age = read_only_file.age.copy()
+    assert not read_only_file._is_dirty("age")
+
+
+def test_read_only__new_column_is_dirty(read_only_file):
+    read_only_file.age["c_comment"] = "hi"
+    assert read_only_file._is_dirty("age")
+
+
+def test_read_only__caller_arrays_stay_writable(read_only_file):
+    ages = pd.DataFrame(dict(age_id=[0, 1], age=[1.0, 2.0]))
+    read_only_file.age = ages
+    read_only_file.flush()
+    assert not read_only_file._is_dirty("age")
+    assert all(ages[column].values.flags.writeable for column in ages.columns)
+    ages.loc[0, "age"] = 3.0
+    assert read_only_file.age.age.iloc[0] == 1.0
+    with pytest.raises(ValueError):
+        read_only_file.age.loc[0, "age"] = 3.0
+
+
+def test_read_only__on_read(read_only_file, mocker):
+    dm_file2 = DismodFile(read_only_file.engine)
+    dm_file2.read_only_tables = True
+    age = dm_file2.age
+    hashes = mocker.spy(dm_file2, "_row_hashes")
+    assert not dm_file2._is_dirty("age")
+    assert hashes.call_count == 0
+    with pytest.raises(ValueError):
+        age.loc[1, "age"] = 0.0
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    db_file = Path(tmp_path) / "sample.db"
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.sample = pd.DataFrame(dict(
+        sample_index=np.repeat([0, 1, 2], 4),
+        var_id=np.tile([0, 1, 2, 3], 3),
+        var_value=np.linspace(0, 1, 12),
+    ))
+    dm_file.flush()
+    return DismodFile(get_engine(db_file))
+
+
+def test_read__projected_and_filtered(sample_file):
+    sample = sample_file.read("sample", ["var_id", "var_value"], dict(sample_index=1))
+    assert list(sample.columns) == ["var_id", "var_value"]
+    assert sample.index.tolist() == [4, 5, 6, 7]
+    assert sample.var_id.tolist() == [0, 1, 2, 3]
+    assert "sample" not in sample_file._table_data
+
+
+def test_read__list_of_values(sample_file):
+    sample = sample_file.read("sample", where=dict(sample_index=[0, 2], var_id=np.int64(3)))
+    assert sample.sample_id.tolist() == [3, 11]
+    assert set(sample.columns) == {"sample_id", "sample_index", "var_id", "var_value"}
+
+
+def test_read__chunks(sample_file):
+    chunks = list(sample_file.read("sample", ["var_value"], chunksize=5))
+    assert [len(chunk) for chunk in chunks] == [5, 5, 2]
+    assert pd.concat(chunks).index.tolist() == list(range(12))
+
+
+def test_read__prefers_memory(sample_file):
+    sample = sample_file.sample.copy()
+    sample.loc[0, "var_value"] = -1.0
+    sample_file.sample = sample
+    assert sample_file.read("sample", ["var_value"], dict(var_id=0)).var_value.tolist()[0] == -1.0
+    assert sample_file.row_count("sample", dict(sample_index=0)) == 4
+
+
+def test_read__missing_table(sample_file):
+    assert sample_file.read("data_sim", ["data_sim_value"]).empty
+    assert sample_file.row_count("data_sim") == 0
+
+
+def test_read__unknown_column(sample_file):
+    with pytest.raises(DismodFileError):
+        sample_file.read("sample", ["var_mean"])
+
+
+def test_row_count(sample_file):
+    assert sample_file.row_count("sample") == 12
+    assert sample_file.row_count("sample", dict(sample_index=2, var_id=[1, 2])) == 2
+
+
+def test_schema__shared_until_columns_added(dummy_data_row):
+    dm_file = DismodFile(get_engine(None))
+    assert dm_file._table_definitions["data"] is DismodFileBase.metadata.tables["data"]
+    dm_file.data = dummy_data_row
+    dm_file.flush()
+    assert "x_sex" in dm_file._table_definitions["data"].c
+    assert "x_sex" not in DismodFileBase.metadata.tables["data"].c
+    assert dm_file._table_definitions["age"] is DismodFileBase.metadata.tables["age"]
+    assert set(dm_file._table_definitions.keys()) == set(DismodFileBase.metadata.tables.keys())
+
+
+@pytest.fixture
+def fingerprinted(tmp_path):
+    db_file = Path(tmp_path) / "fingerprint.db"
+    ages = pd.DataFrame(dict(age=[0.0, 1.0, 5.0, 100.0]))
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.age = ages
+    dm_file.time = pd.DataFrame(dict(time=[1990.0, 2000.0]))
+    dm_file.flush()
+    dm_file.engine.dispose()
+    return db_file, ages
+
+
+def test_fingerprint__reopened_file_skips_same_table(fingerprinted, mocker):
+    db_file, ages = fingerprinted
+    dm_file = DismodFile(get_engine(db_file))
+    replace = mocker.spy(type(dm_file._make_writer()), "replace_table")
+    dm_file.age = ages.copy()
+    assert not dm_file._is_dirty("age")
+    dm_file.flush()
+    assert _replaced_tables(replace) == []
+
+
+def test_fingerprint__reopened_file_writes_changed_table(fingerprinted):
+    db_file, ages = fingerprinted
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.age = ages.assign(age=ages.age + 1)
+    assert dm_file._is_dirty("age")
+    dm_file.flush()
+
+    reopened = DismodFile(get_engine(db_file))
+    reopened.age = ages.assign(age=ages.age + 1)
+    assert not reopened._is_dirty("age")
+    reopened.time = pd.DataFrame(dict(time=[1990.0, 2000.0]))
+    assert not reopened._is_dirty("time")
+
+
+def test_fingerprint__forgotten(fingerprinted):
+    db_file, ages = fingerprinted
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.forget_fingerprints(["age"])
+    dm_file.flush()
+
+    reopened = DismodFile(get_engine(db_file))
+    reopened.age = ages
+    reopened.time = pd.DataFrame(dict(time=[1990.0, 2000.0]))
+    assert reopened._is_dirty("age")
+    assert not reopened._is_dirty("time")
+
+
+def test_fingerprint__row_count_checked(fingerprinted):
+    db_file, ages = fingerprinted
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("DELETE FROM age WHERE age_id = 3")
+    conn.commit()
+    conn.close()
+
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.age = ages
+    assert dm_file._is_dirty("age")
+
+
+def test_fingerprint__dropped_table_is_dirty(fingerprinted):
+    db_file, ages = fingerprinted
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("DROP TABLE age")
+    conn.commit()
+    conn.close()
+
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.age = ages
+    assert dm_file._is_dirty("age")
+
+
+def test_fingerprint__forget_all_but_kept(fingerprinted):
+    db_file, ages = fingerprinted
+    dm_file = DismodFile(get_engine(db_file))
+    dm_file.forget_fingerprints(keep=["time"])
+    assert dm_file.fingerprints(["age", "time"])[0] is None
+    assert dm_file.fingerprints(["age", "time"])[1] is not None
+
+
+def test_current_fingerprints__stored_for_tables_read(fingerprinted, mocker):
+    db_file, ages = fingerprinted
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("DELETE FROM c_table_fingerprint WHERE table_name = 'time'")
+    conn.commit()
+    conn.close()
+
+    dm_file = DismodFile(get_engine(db_file))
+    current = dm_file.current_fingerprints(["age", "time"])
+    assert current[0] == dm_file.fingerprints(["age"])[0]
+    assert "age" not in dm_file._table_data
+    # The time table is read and its fingerprint goes to the file.
+    assert current[1] == dm_file.fingerprints(["time"])[0]
+    dm_file.flush()
+
+    reopened = DismodFile(get_engine(db_file))
+    hashes = mocker.spy(reopened, "_row_hashes")
+    assert reopened.current_fingerprints(["age", "time"]) == current
+    assert hashes.call_count == 0
+    reopened.time = pd.DataFrame(dict(time=[1990.0, 2005.0]))
+    assert reopened.current_fingerprints(["time"])[0] != current[1]
+    assert reopened.fingerprints(["time"])[0] == current[1]
+
+
+def test_attribute_read_types_match_read_sql_table(tmp_path):
+    db_path = tmp_path / "types.db"
+    writer = DismodFile(get_engine(db_path))
+    writer.covariate = pd.DataFrame(dict(
+        covariate_id=[0, 1], covariate_name=["sex", "one"], reference=[0.0, 0.0], max_difference=[np.nan, np.nan]
+    ))
+    writer.data = writer.empty_table("data")
+    writer.flush()
+
+    reader = DismodFile(get_engine(db_path, persistent=True))
+    for table_name in ["covariate", "data"]:
+        with reader.engine.connect() as connection:
+            expected = pd.read_sql_table(table_name, connection)
+        found = getattr(reader, table_name)
+        assert (found.dtypes == expected.dtypes).all(), table_name
+        pd.testing.assert_frame_equal(found.reset_index(drop=True), expected, check_index_type=False)
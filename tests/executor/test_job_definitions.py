@@ -8,7 +8,7 @@ from cascade.executor.cascade_plan import global_recipe_graph
 from cascade.executor.create_settings import create_settings
 from cascade.executor.execution_context import make_execution_context
 from cascade.executor.job_definitions import (
-    GlobalPrepareData, FindSingleMAP, add_job_list
+    GlobalPrepareData, FindSingleMAP, add_job_list, recipe_to_jobs
 )
 from cascade.runner.job_graph import RecipeIdentifier, recipe_graph_to_job_graph
 
@@ -75,6 +75,23 @@ def test_global_estimate(context):
     assert single.done()
 
 
+@pytest.mark.parametrize("strategy,job_names", [
+    ("simulate_and_fit", ["find_single_maximum", "draw", "summarize"]),
+    ("asymptotic", ["find_single_maximum", "summarize_asymptotic"]),
+])
+def test_uncertainty_strategy_jobs(context, strategy, job_names):
+    ec = context["ec"]
+    recipe_id = RecipeIdentifier(1, "estimate_location", "both")
+    local_settings = SimpleNamespace(
+        parent_location_id=1,
+        number_of_fixed_effect_samples=3,
+        policies=SimpleNamespace(fit_strategy="fit", uncertainty_strategy=strategy),
+    )
+    neighbors = dict(predecessors=[RecipeIdentifier(1, "bundle_setup", "both")])
+    jobs = recipe_to_jobs(recipe_id, local_settings, neighbors, None, ec)
+    assert [job.name for job in jobs] == job_names
+
+
 @pytest.mark.skip("find how to run_mock")
 def test_recipe_level(context, pyramid_locations):
     ec = context["ec"]
@@ -12,7 +12,8 @@ from cascade.executor.cascade_plan import (
 )
 from cascade.executor.construct_model import construct_model
 from cascade.executor.create_settings import create_settings, make_locations
-from cascade.model.priors import Uniform, Gaussian
+from cascade.model import DismodGroups, Var
+from cascade.model.priors import Uniform, Gaussian, Laplace, Constant
 from cascade.model.smooth_grid import SmoothGrid
 from gridengineapp import execution_ordered
 
@@ -116,3 +117,45 @@ def test_estimate_grid_parameters_fair():
             found_mean = found.mean
             assert np.isclose(expected, found_mean, atol=0.02, rtol=0.2), \
                 f"at {age} {time} e {expected} f {found_mean}"
+
+
+def test_estimate_grid_parameters_matches_point_mle():
+    """Vectorized families and per-point families agree with prior.mle."""
+    rng = RandomState(9324792)
+    ages = np.array([0, 10, 20])
+    times = np.array([2000, 2010])
+    priors = SmoothGrid(ages, times)
+    priors.value[:, :] = Gaussian(lower=0, upper=0.5, mean=0.1, standard_deviation=0.1)
+    priors.value[10, :] = Uniform(lower=1e-4, upper=1.5, mean=0.1)
+    priors.value[20, 2010] = Laplace(mean=0.1, standard_deviation=0.1)
+    priors.value[0, 2010] = Constant(0.2)
+    expected = SmoothGrid(ages, times)
+    for age, time in priors.age_time():
+        expected.value[age, time] = priors.value[age, time]
+
+    draws = rng.normal(loc=0.3, scale=0.1, size=(len(ages), len(times), 100))
+    cascade.executor.priors_from_draws.estimate_grid_parameters(priors.value, draws, ages, times)
+    for age_idx, time_idx in product(range(len(ages)), range(len(times))):
+        age, time = ages[age_idx], times[time_idx]
+        point = expected.value[age, time].mle(draws[age_idx, time_idx, :])
+        found = priors.value[age, time]
+        assert type(found) == type(point)
+        assert np.isclose(found.mean, point.mean)
+        if hasattr(point, "standard_deviation"):
+            assert np.isclose(found.standard_deviation, point.standard_deviation)
+
+
+def test_gather_draws_matches_calls():
+    ages = np.array([0, 5, 50])
+    times = np.array([1990, 2015])
+    draws = list()
+    for draw_idx in range(4):
+        var = Var.from_array([0, 20, 100], [2000, 2010], (draw_idx + 1) * np.array([[1, 2], [3, 4], [5, 6]]))
+        draws.append(DismodGroups())
+        draws[-1].rate["iota"] = var
+    grid_draws = cascade.executor.priors_from_draws.DrawFunction(draws, "rate", "iota")
+    value, dage, dtime = cascade.executor.priors_from_draws.gather_draws_for_grid(grid_draws, ages, times)
+    assert value.shape == (len(ages), len(times), len(draws))
+    assert dage.shape == (len(ages) - 1, len(times), len(draws))
+    for draw_idx, (age_idx, age), (time_idx, time) in product(range(4), enumerate(ages), enumerate(times)):
+        assert np.isclose(value[age_idx, time_idx, draw_idx], grid_draws(draw_idx, age, time))
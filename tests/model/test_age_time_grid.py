@@ -6,7 +6,7 @@ import pytest
 from numpy import isclose
 import pandas as pd
 
-from cascade.model.age_time_grid import AgeTimeGrid
+from cascade.model.age_time_grid import AgeTimeGrid, GRID_SNAP_DISTANCE
 
 
 def test_create():
@@ -119,3 +119,66 @@ def test_printing():
     atg = AgeTimeGrid([0, 10, 50], [2000, 2010], ["clip"])
     assert "variables" in str(atg)
     assert "2010" in repr(atg)
+
+
+def test_grid_changes_reach_points():
+    atg = AgeTimeGrid([0, 1, 10], [2000, 2010], ["mean", "var_id"])
+    atg[:, :] = [0.5, 3]
+    atg.grid.loc[atg.grid.age == 10, "mean"] = 0.7
+    assert float(atg[10, 2000]["mean"]) == 0.7
+    assert float(atg[1, 2000]["mean"]) == 0.5
+
+    reordered = atg.grid.iloc[::-1].assign(other=range(6))
+    atg.grid = reordered
+    atg[0, 2010] = [0.1, 7]
+    assert float(atg[0, 2010].var_id) == 7
+    assert list(atg.grid.columns) == ["age", "time", "mean", "var_id", "other"]
+    assert atg.grid.query("age == 0 and time == 2010").other.iloc[0] == 4
+
+
+def test_grid_frame_stays_current_while_held():
+    atg = AgeTimeGrid([0, 1], [2000, 2010], ["mean"])
+    atg[:, :] = 0.5
+    held = atg.grid
+    assert float(atg[1, 2000]["mean"]) == 0.5
+    held.loc[held.age == 1, "mean"] = 0.7
+    assert float(atg[1, 2010]["mean"]) == 0.7
+    atg[0, 2000] = 0.1
+    assert held.query("age == 0 and time == 2000")["mean"].iloc[0] == 0.1
+    atg.set_plane("mean", [[1, 2], [3, 4]])
+    assert held["mean"].tolist() == [1, 2, 3, 4]
+    assert atg.grid is held
+
+    assigned = held.assign(mean=0.2)
+    atg.grid = assigned
+    assert atg.to_array().tolist() == [[0.2, 0.2], [0.2, 0.2]]
+    assigned.loc[:, "mean"] = 0.3
+    assert float(atg[0, 2010]["mean"]) == 0.3
+
+
+def test_set_within_snap_distance():
+    atg = AgeTimeGrid([0, 1, 10], [2000, 2010], ["mean"])
+    atg[:, :] = 1
+    atg[1 + 0.1 * GRID_SNAP_DISTANCE, 2010 - 0.1 * GRID_SNAP_DISTANCE] = 2
+    atg[0.5:10, 2000] = 3
+    assert float(atg[1, 2010]["mean"]) == 2
+    assert float(atg[1, 2000]["mean"]) == 3
+    assert float(atg[10, 2000]["mean"]) == 3
+    assert float(atg[0, 2000]["mean"]) == 1
+    with pytest.raises(KeyError):
+        atg[1 + 0.1 * GRID_SNAP_DISTANCE, 2010]
+
+
+def test_text_column_keeps_numbers():
+    atg = AgeTimeGrid([0, 1], [2000], ["density", "mean"])
+    atg[:, :] = ["gaussian", 0.2]
+    assert atg.grid.density.tolist() == ["gaussian", "gaussian"]
+    assert atg.grid["mean"].dtype == float
+
+
+def test_grid_with_many_rows_per_point():
+    atg = AgeTimeGrid([0, 1], [2000], ["mean", "idx"])
+    atg.grid = pd.DataFrame(dict(age=[0.0, 0.0, 1.0, 1.0], time=2000.0, mean=[1, 2, 3, 4], idx=[0, 1, 0, 1]))
+    assert atg[1, 2000]["mean"].tolist() == [3, 4]
+    atg[1, 2000] = [5, 2]
+    assert atg.grid["mean"].tolist() == [1, 2, 5, 5]
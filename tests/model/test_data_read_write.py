@@ -1,10 +1,9 @@
-from types import SimpleNamespace
-
 import numpy as np
 import pandas as pd
 
+from cascade.dismod.db.wrapper import DismodFile, get_engine
 from cascade.model.data_read_write import (
-    read_simulation_data
+    read_simulation_data, read_predict, harvest_predict
 )
 
 
@@ -20,7 +19,7 @@ def test_read_simulation_data():
     ))
     assert len(data) == 5
 
-    db = SimpleNamespace()
+    db = DismodFile()
     db.data = pd.DataFrame(dict(
         data_id=[0, 1, 2, 3, 4],
         data_name=["7", "9", "14", "22", "48"],
@@ -51,3 +50,34 @@ def test_read_simulation_data():
         assert np.isclose(modified_data.iloc[i]["mean"], 20 + i)
         assert np.isclose(modified_data.iloc[i]["std"], 2 + i / 10)
         assert np.isclose(modified_data.iloc[i]["nu"], i / 4)
+
+
+def test_harvest_predict_matches_read_predict(tmp_path):
+    db_file = tmp_path / "predict.db"
+    db = DismodFile(get_engine(db_file))
+    db.node = pd.DataFrame(dict(node_name=["global", "child"], parent=[np.nan, 0], c_location_id=[1, 102]))
+    db.covariate = pd.DataFrame(dict(
+        covariate_name=["traffic"], reference=[0.0], max_difference=[np.nan]))
+    db.avgint = pd.DataFrame(dict(
+        integrand_id=[0, 2, 2],
+        node_id=[0, 1, 1],
+        weight_id=[0, 0, 0],
+        age_lower=[0.0, 10.0, 20.0],
+        age_upper=[0.0, 10.0, 20.0],
+        time_lower=[2000.0, 2000.0, 2010.0],
+        time_upper=[2000.0, 2000.0, 2010.0],
+        x_0=[0.5, np.nan, 1.0],
+    ))
+    db.predict = pd.DataFrame(dict(
+        sample_index=[0, 0, 1, 1],
+        avgint_id=[0, 1, 0, 1],
+        avg_integrand=[0.1, 0.2, 0.3, 0.4],
+    ))
+    db.flush()
+
+    expected_predicted, expected_not = read_predict(DismodFile(get_engine(db_file)))
+    (predicted, not_predicted), = harvest_predict([db_file])
+    pd.testing.assert_frame_equal(predicted, expected_predicted, check_dtype=False)
+    pd.testing.assert_frame_equal(not_predicted, expected_not, check_dtype=False)
+    assert predicted.location.tolist() == [1, 102, 1, 102]
+    assert not_predicted.integrand.tolist() == ["mtexcess"]
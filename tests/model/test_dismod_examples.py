@@ -229,10 +229,10 @@ def test_posterior(locations, dismod):
     simulate_result = session.simulate(model, data, fit_var, number_sample)
     sample_var = session.sample(simulate_result)
     assert sample_var is not None
-    omega_sample = sample_var.rate["omega"]
-    omega_0 = omega_sample[0, 1995]["mean"].values
-    assert len(omega_0) == number_sample
-    omega_1 = omega_sample[0, 2015]["mean"].values
+    omega_sample = sample_var.field("rate", "omega")
+    assert omega_sample.shape == (number_sample, 1, 2)
+    omega_0 = omega_sample[:, 0, 0]
+    omega_1 = omega_sample[:, 0, 1]
 
     residual_0 = (omega_0 - omega_world_mean) / omega_world_mean
     residual_1 = (omega_1 - omega_world_mean) / omega_world_mean
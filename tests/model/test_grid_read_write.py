@@ -1,52 +1,18 @@
-from types import SimpleNamespace
-
 import numpy as np
 import pandas as pd
 from numpy import isclose, nan, isnan
 
+from cascade.dismod.db.wrapper import DismodFile, get_engine
 from cascade.model.age_time_grid import AgeTimeGrid
 from cascade.model.dismod_groups import DismodGroups
 from cascade.model.grid_read_write import (
-    _read_vars_one_field, _read_residuals_one_field, _samples_one_field, _construct_var_id_from_var_table,
-    read_simulation_model
+    _read_residuals_one_field, _construct_var_id_from_var_table,
+    read_simulation_model, _read_layout_sidecar, _write_layout_sidecar, read_vars, harvest_vars
 )
 from cascade.model.model import Model
 from cascade.model.priors import Gaussian, Uniform
 from cascade.model.smooth_grid import SmoothGrid
-
-
-def test_read_vars_one_field():
-    table = pd.DataFrame(dict(
-        scale_var_id=np.arange(6),
-        scale_var_value=np.linspace(0, 1, 6),
-    ))
-
-    id_draw = AgeTimeGrid([50], [1995, 2015], "var_id")
-    id_draw[50, 1995] = [4]
-    id_draw[50, 2015] = [5]
-
-    var_out = _read_vars_one_field(table, id_draw, "scale_var")
-    grid = var_out.grid
-    assert set(grid.columns) == {"age", "time", "mean"}
-    assert len(grid) == 2
-    assert isclose(float(grid.loc[grid.time == 1995, "mean"]), 0.8)
-    assert isclose(float(grid.loc[grid.time == 2015, "mean"]), 1.0)
-
-
-def test_read_vars_one_field_mulstd():
-    table = pd.DataFrame(dict(
-        scale_var_id=np.arange(6),
-        scale_var_value=np.linspace(0, 1, 6),
-    ))
-
-    id_draw = AgeTimeGrid([50], [1995, 2015], "var_id")
-    id_draw[50, 1995] = [4]
-    id_draw[50, 2015] = [5]
-    id_draw.mulstd["value"].loc[:, "var_id"] = 3
-
-    var_out = _read_vars_one_field(table, id_draw, "scale_var")
-
-    assert isclose(var_out.get_mulstd("value"), 0.6)
+from cascade.model.var_layout import VarLayout
 
 
 def test_read_residuals_one_field():
@@ -83,37 +49,6 @@ def test_read_residuals_one_field():
     assert isclose(float(var_out.mulstd["dage"].loc[:, "residual_value"]), 10.8)
 
 
-def test_read_samples_one_field_mulstd():
-    id_draw = AgeTimeGrid([50], [2004, 2005], "var_id")
-    id_draw[50, 2004] = [4]  # var 4 is 2004
-    id_draw[50, 2005] = [5]  # var 5 is 2005
-    id_draw.mulstd["dtime"].loc[:, "var_id"] = 3
-
-    var_cnt = 6
-    sample_cnt = 5
-    sample_index = np.repeat(np.arange(0, sample_cnt), var_cnt)
-    var_id = np.tile(np.arange(0, var_cnt), sample_cnt)
-    table = pd.DataFrame(dict(
-        sample_id=np.arange(0, var_cnt * sample_cnt),
-        sample_index=sample_index,
-        var_id=var_id,
-        var_value=(2000 + var_id + sample_index) * 0.001,
-    ))
-
-    var_out = _samples_one_field(table, id_draw)
-
-    for a, t in var_out.age_time():
-        samples = var_out[a, t]
-        assert len(samples) == sample_cnt
-        samples = samples.sort_values("mean")
-        for idx in range(sample_cnt):
-            assert isclose(samples.iloc[idx]["mean"], (t + idx) * 0.001)
-    mulstd_out = var_out.mulstd["dtime"]
-    assert len(mulstd_out) == sample_cnt
-    for idx in range(sample_cnt):
-        assert isclose(mulstd_out[mulstd_out.idx == idx]["mean"], (2003 + idx) * 0.001)
-
-
 def test_add_one_field_to_vars():
     sub_grid_df = pd.DataFrame(dict(
         var_id=[4, 5, 6],
@@ -161,7 +96,7 @@ def test_read_simulation_model():
 
     var_ids.rate["iota"].mulstd["dage"].at[0, "var_id"] = 6
 
-    db = SimpleNamespace()
+    db = DismodFile()
     db.prior_sim = pd.DataFrame(dict(
         prior_sim_id=range(3),
         simulate_index=3,
@@ -184,3 +119,56 @@ def test_read_simulation_model():
     assert iota.dtime[50, 2000].mean == -0.05
     assert iota.dage.mulstd_prior.mean == 2.4
     assert iota.dtime.mulstd_prior.mean == 7
+
+
+def test_layout_sidecar_round_trip(tmp_path):
+    var_ids = DismodGroups()
+    id_grid = AgeTimeGrid([0, 50], [2000], "var_id")
+    id_grid.set_plane("var_id", [[0], [1]])
+    id_grid.mulstd["value"].loc[:, "var_id"] = 3
+    var_ids.rate["iota"] = id_grid
+    child_grid = AgeTimeGrid([50], [2000], "var_id")
+    child_grid.set_plane("var_id", [[2]])
+    var_ids.random_effect[("iota", np.int64(4))] = child_grid
+    sidecar = tmp_path / "var_layout.npz"
+    assert _read_layout_sidecar(sidecar, "abc") is None
+
+    _write_layout_sidecar(sidecar, "abc", VarLayout(var_ids, 4))
+    layout = _read_layout_sidecar(sidecar, "abc")
+    assert layout.size == 4
+    assert list(layout.keys()) == [("rate", "iota"), ("random_effect", ("iota", 4))]
+    ages, times, positions, mulstd = layout.positions("rate", "iota")
+    assert np.array_equal(ages, [0, 50]) and np.array_equal(times, [2000])
+    assert positions.tolist() == [[0], [1]]
+    assert mulstd == dict(value=3)
+    assert layout.var_ids.random_effect[("iota", 4)].to_array("var_id").tolist() == [[2]]
+    assert _read_layout_sidecar(sidecar, "other") is None
+    assert [path.name for path in tmp_path.iterdir()] == ["var_layout.npz"]
+
+
+def test_layout_sidecar_ignores_other_files(tmp_path):
+    sidecar = tmp_path / "var_layout.npz"
+    sidecar.write_bytes(b"not a layout")
+    assert _read_layout_sidecar(sidecar, "abc") is None
+
+
+def test_harvest_vars_matches_read_vars(tmp_path):
+    var_ids = DismodGroups()
+    id_grid = AgeTimeGrid([0, 50], [2000, 2010], "var_id")
+    id_grid.set_plane("var_id", [[0, 1], [2, 3]])
+    var_ids.rate["iota"] = id_grid
+    layout = VarLayout(var_ids, 4)
+    db_files = list()
+    for draw_idx in range(3):
+        db_file = tmp_path / f"draw{draw_idx}.db"
+        db = DismodFile(get_engine(db_file))
+        db.start_var = pd.DataFrame(dict(start_var_value=np.linspace(0, 0.3, 4) + draw_idx))
+        db.flush()
+        db_files.append(db_file)
+
+    samples = harvest_vars(db_files, layout, "start", threads=2)
+    assert samples.values.shape == (3, 4)
+    for draw_idx, db_file in enumerate(db_files):
+        fit = read_vars(DismodFile(get_engine(db_file)), layout, "start")
+        assert np.allclose(samples[draw_idx].rate["iota"].to_array(), fit.rate["iota"].to_array())
+    assert isclose(samples[2].rate["iota"][50, 2010], 2.3)
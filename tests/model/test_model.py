@@ -139,6 +139,33 @@ def test_survival(dismod):
     assert max_err < 0.015
 
 
+def test_predict_many(dismod, tmp_path):
+    parent_location = 1
+    locations = pd.DataFrame(dict(name=["global"], parent_id=[nan], location_id=[parent_location]))
+    draws = list()
+    for scale in [1, 2, 3]:
+        omega = Var([0, 50, 100], [2000])
+        omega[:, :] = 0.01 * scale
+        draw = DismodGroups()
+        draw.rate["omega"] = omega
+        draws.append(draw)
+    avgints = pd.DataFrame(dict(
+        integrand="mtother",
+        location=parent_location,
+        age_lower=[10.0, 60.0],
+        age_upper=[10.0, 60.0],
+        time_lower=2000,
+        time_upper=2000,
+    ))
+
+    session = Session(locations, parent_location, tmp_path / "predict_many.db")
+    predicted, not_predicted = session.predict_many(draws, avgints, parent_location)
+    assert not_predicted.empty
+    assert len(predicted) == 6
+    for sample_index, scale in enumerate([1, 2, 3]):
+        assert np.allclose(predicted[predicted.sample_index == sample_index]["mean"], 0.01 * scale)
+
+
 def test_fit_mortality(dismod):
     """Create data for a single-parameter model and fit that data.
     """
@@ -1,3 +1,4 @@
+import os
 from math import nan
 from pathlib import Path
 from sqlite3 import Connection
@@ -13,7 +14,8 @@ from cascade.dismod.constants import IntegrandEnum
 from cascade.model import (
     Model, SmoothGrid, Covariate, Uniform, Gaussian
 )
-from cascade.model.object_wrapper import ObjectWrapper
+from cascade.model import object_wrapper as object_wrapper_module
+from cascade.model.object_wrapper import ObjectWrapper, template_db_file
 
 
 @pytest.fixture
@@ -318,3 +320,250 @@ def test_obj_wrapper_min_meas_cv_exception(basic_model, tmp_path):
 
     with pytest.raises(ValueError):
         wrapper.set_minimum_meas_cv("Sincidence", "tiny")
+
+
+def test_obj_wrapper_in_memory(basic_model, tmp_path):
+    locations = pd.DataFrame(dict(
+        name=["global", "americas", "asia", "africa"],
+        parent_id=[nan, 1, 1, 1],
+        location_id=[1, 2, 3, 4],
+    ))
+    db_file = tmp_path / "in_memory.db"
+    wrapper = ObjectWrapper(db_file, in_memory=True)
+    wrapper.locations = locations
+    wrapper.parent_location_id = 1
+    wrapper.model = basic_model
+    wrapper.set_minimum_meas_cv("withC", 0.2)
+    wrapper.flush()
+    assert not db_file.exists()
+    wrapper.close()
+    assert db_file.exists()
+
+    conn = Connection(str(db_file))
+    vals = dict(conn.execute("SELECT integrand_name, minimum_meas_cv FROM integrand").fetchall())
+    assert isclose(vals["withC"], 0.2)
+    conn.close()
+
+    reopened = ObjectWrapper(db_file, in_memory=True)
+    assert reopened.locations.location_id.tolist() == [1, 2, 3, 4]
+    assert reopened.get_option("parent_node_id") == "0"
+
+
+def test_template_matches_defaults(tmp_path):
+    from_template = ObjectWrapper(tmp_path / "template.db")
+    from_template.close()
+    built = ObjectWrapper(tmp_path / "built.db", template=False)
+    built.close()
+
+    template_conn = Connection(str(tmp_path / "template.db"))
+    built_conn = Connection(str(tmp_path / "built.db"))
+    for table in ["density", "integrand", "rate", "option", "nslist", "data", "avgint"]:
+        query = f"SELECT * FROM {table}"
+        assert template_conn.execute(query).fetchall() == built_conn.execute(query).fetchall(), table
+    log_query = "SELECT message_type FROM log"
+    assert template_conn.execute(log_query).fetchall() == [("command",)]
+
+
+def test_template_is_reused(tmp_path):
+    template = template_db_file()
+    modified = template.stat().st_mtime_ns
+    ObjectWrapper(tmp_path / "first.db").close()
+    ObjectWrapper(None)
+    assert template_db_file() == template
+    assert template.stat().st_mtime_ns == modified
+    assert not Connection(str(template)).execute("SELECT * FROM log").fetchall()
+
+
+def test_template_fingerprint_covers_default_tables(mocker):
+    fingerprint = object_wrapper_module._template_fingerprint()
+    defaults = object_wrapper_module._default_tables()
+    defaults["option"].loc[defaults["option"].option_name == "ode_step_size", "option_value"] = "1.0"
+    mocker.patch.object(object_wrapper_module, "_default_tables", return_value=defaults)
+    object_wrapper_module._template_fingerprint.cache_clear()
+    try:
+        assert object_wrapper_module._template_fingerprint() != fingerprint
+    finally:
+        object_wrapper_module._template_fingerprint.cache_clear()
+
+
+def test_template_directory_is_private():
+    directory = template_db_file().parent
+    status = directory.stat()
+    assert status.st_uid == os.getuid()
+    assert status.st_mode & 0o077 == 0
+
+
+def test_connection_kept_while_running(tmp_path):
+    db_file = tmp_path / "kept.db"
+    dismod_objects = ObjectWrapper(db_file)
+    dismod_objects.locations = pd.DataFrame(dict(
+        location_id=[1, 2], parent_id=[nan, 1], name=["global", "child"]))
+    engine = dismod_objects.dismod_file.engine
+    dismod_objects.dismod_file.log  # Read, so that the connection is used.
+
+    with dismod_objects.close_db_while_running():
+        # Stands in for Dismod-AT, which needs to write the file.
+        conn = Connection(str(db_file), timeout=0)
+        conn.execute("INSERT INTO log (message_type, message) VALUES ('command', 'fit')")
+        conn.commit()
+        conn.close()
+
+    assert dismod_objects.dismod_file.engine is engine
+    assert dismod_objects.log.message.tolist()[-1] == "fit"
+    assert dismod_objects.locations.location_id.tolist() == [1, 2]
+
+
+def _grid_priors(dismod_file):
+    """Prior parameters at each smooth grid point, in smooth_grid order."""
+    prior = dismod_file.prior.set_index("prior_id")[["density_id", "lower", "upper", "mean", "std", "eta"]]
+    found = list()
+    for kind in ["value", "dage", "dtime"]:
+        ids = dismod_file.smooth_grid[f"{kind}_prior_id"]
+        found.append(prior.reindex(ids.values).reset_index(drop=True).add_prefix(f"{kind}_"))
+    return pd.concat(found, axis=1)
+
+
+def test_intern_priors(basic_model):
+    locations = pd.DataFrame(dict(name=["global"], parent_id=[nan], location_id=[1]))
+    written = dict()
+    for intern in [False, True]:
+        wrapper = ObjectWrapper(None, intern_priors=intern)
+        wrapper.locations = locations
+        wrapper.parent_location_id = 1
+        wrapper.model = basic_model
+        written[intern] = wrapper.dismod_file
+
+    assert len(written[True].prior) < len(written[False].prior) // 10
+    assert written[True].prior.prior_id.tolist() == list(range(len(written[True].prior)))
+    assert written[True].prior.prior_name.is_unique
+    pd.testing.assert_frame_equal(_grid_priors(written[True]), _grid_priors(written[False]))
+    assert len(written[True].smooth_grid) == len(written[False].smooth_grid)
+
+
+def _children_model_wrapper(basic_model, filename=None, share_child_smooths=False):
+    locations = pd.DataFrame(dict(
+        name=["global", "a", "b", "c"], parent_id=[nan, 1, 1, 1], location_id=[1, 2, 3, 4]))
+    basic_model.child_location = [2, 3, 4]
+    for child in [2, 3, 4]:
+        for rate in ["iota", "chi"]:
+            random_effect = SmoothGrid([50], [2000])
+            std = 0.2 if child == 4 else 0.1
+            random_effect.value[:, :] = Gaussian(lower=-1, upper=1, mean=0.0, standard_deviation=std)
+            basic_model.random_effect[(rate, child)] = random_effect
+    wrapper = ObjectWrapper(filename, share_child_smooths=share_child_smooths)
+    wrapper.locations = locations
+    wrapper.parent_location_id = 1
+    wrapper.model = basic_model
+    return wrapper
+
+
+def test_children_share_equal_random_effects(basic_model):
+    wrapper = _children_model_wrapper(basic_model, share_child_smooths=True)
+
+    dismod_file = wrapper.dismod_file
+    pairs = dismod_file.nslist_pair.merge(dismod_file.nslist, on="nslist_id")
+    assert len(pairs) == 6
+    for rate in ["iota", "chi"]:
+        smooth_of = dict(pairs[pairs.nslist_name == rate][["node_id", "smooth_id"]].values)
+        node_of = dict(dismod_file.node[["c_location_id", "node_id"]].values)
+        assert smooth_of[node_of[2]] == smooth_of[node_of[3]]
+        assert smooth_of[node_of[2]] != smooth_of[node_of[4]]
+    # Four shared child smooths, and each rate's children use only their own.
+    assert pairs.smooth_id.nunique() == 4
+    assert len(dismod_file.smooth) == len(set(dismod_file.smooth_grid.smooth_id))
+    shared_names = dismod_file.smooth[dismod_file.smooth.smooth_id.isin(pairs.smooth_id)].smooth_name
+    assert set(shared_names) == {"iota_re_shared_0", "iota_re_shared_1", "chi_re_shared_0", "chi_re_shared_1"}
+
+
+def test_children_have_own_smooths_by_default(basic_model):
+    dismod_file = _children_model_wrapper(basic_model).dismod_file
+    assert dismod_file.nslist_pair.smooth_id.nunique() == 6
+
+
+def test_shared_child_smooths_make_same_vars(basic_model, dismod, tmp_path):
+    var_tables = dict()
+    for share in [False, True]:
+        wrapper = _children_model_wrapper(basic_model, tmp_path / f"share_{share}.db", share_child_smooths=share)
+        wrapper.run_dismod(["init"])
+        # Smooth ids differ, but every variable is at the same place.
+        var_tables[share] = wrapper.dismod_file.var.drop(columns=["smooth_id"])
+        wrapper.close()
+    pd.testing.assert_frame_equal(var_tables[True], var_tables[False])
+
+
+def test_written_tables_are_consistent(basic_model):
+    locations = pd.DataFrame(dict(name=["global"], parent_id=[nan], location_id=[1]))
+    wrapper = ObjectWrapper(None)
+    wrapper.locations = locations
+    wrapper.parent_location_id = 1
+    wrapper.model = basic_model
+
+    dismod_file = wrapper.dismod_file
+    for table in ["prior", "smooth", "smooth_grid"]:
+        ids = getattr(dismod_file, table)[f"{table}_id"]
+        assert ids.tolist() == list(range(len(ids)))
+    counts = dismod_file.smooth_grid.groupby("smooth_id").size()
+    assert (counts.values == (dismod_file.smooth.n_age * dismod_file.smooth.n_time).values).all()
+    grid = dismod_file.smooth_grid
+    for _, one_smooth in grid.groupby("smooth_id"):
+        assert one_smooth.age_id.is_monotonic_increasing
+    for kind in ["value", "dage", "dtime"]:
+        assert grid[f"{kind}_prior_id"].isin(dismod_file.prior.prior_id).all()
+
+
+def test_metrics_kept_until_their_tables_change(basic_model, tmp_path):
+    dismod_objects = ObjectWrapper(tmp_path / "metrics.db")
+    dismod_objects.locations = pd.DataFrame(dict(
+        location_id=[1, 2], parent_id=[nan, 1], name=["global", "child"]))
+    dismod_objects.parent_location_id = 1
+    dismod_objects.model = basic_model
+    dismod_objects.flush()
+    first = dismod_objects._command_metrics()
+    kept = dismod_objects._metrics
+    first["dismod_at command"] = "fit"  # Callers get a copy to add to.
+    assert dismod_objects._command_metrics() == kept[1]
+    assert dismod_objects._metrics is kept
+    assert "dismod_at command" not in kept[1]
+
+    dismod_objects.set_option(max_num_iter_fixed=10)
+    dismod_objects.flush()
+    assert dismod_objects._command_metrics()["max_num_iter_fixed"] == "10"
+    assert dismod_objects._metrics is not kept
+
+
+def test_read_only_tables_flush_without_hashing(basic_model, tmp_path, mocker):
+    db_file = tmp_path / "read_only.db"
+    writer = ObjectWrapper(db_file)
+    writer.locations = pd.DataFrame(dict(
+        location_id=[1, 2], parent_id=[nan, 1], name=["global", "child"]))
+    writer.parent_location_id = 1
+    writer.model = basic_model
+    writer.close()
+
+    dismod_objects = ObjectWrapper(db_file, read_only_tables=True)
+    assert len(dismod_objects.dismod_file.smooth_grid) > 0
+    hashes = mocker.spy(dismod_objects.dismod_file, "_row_hashes")
+    dismod_objects.set_option(max_num_iter_fixed=10)
+    dismod_objects.flush()
+    assert {call[0][0] for call in hashes.call_args_list} == {"option"}
+    with pytest.raises(ValueError):
+        dismod_objects.dismod_file.smooth_grid.loc[0, "const_value"] = 0.1
+
+
+def test_var_layout_kept_until_its_tables_change(basic_model, dismod, tmp_path, mocker):
+    dismod_objects = ObjectWrapper(tmp_path / "layout.db")
+    dismod_objects.locations = pd.DataFrame(dict(
+        location_id=[1, 2], parent_id=[nan, 1], name=["global", "child"]))
+    dismod_objects.parent_location_id = 1
+    dismod_objects.model = basic_model
+    dismod_objects.run_dismod(["init"])
+
+    reads = mocker.spy(object_wrapper_module, "read_var_layout")
+    layout = dismod_objects.var_layout
+    dismod_objects.start_var = dismod_objects.scale_var
+    assert dismod_objects.var_layout is layout
+    assert reads.call_count == 1
+
+    dismod_objects.run_dismod(["init"])
+    dismod_objects.var_layout
+    assert reads.call_count == 2
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.random import RandomState
+
+from cascade.model.prior_table import PriorTable
+from cascade.model.priors import (
+    Constant, Gaussian, Uniform, Laplace, StudentsT, LogGaussian, LogStudentsT, PriorError
+)
+from cascade.model.smooth_grid import SmoothGrid
+
+
+def test_round_trip_priors():
+    priors = [
+        Gaussian(0.1, 0.2, -1, 1, name="g"),
+        Uniform(-1, 1, 0.5),
+        Constant(0.3),
+        StudentsT(0, 1, 3.5, -10, 10),
+    ]
+    table = PriorTable.from_priors(priors)
+    assert len(table) == 4
+    table.validate()
+    assert isinstance(table[0], Gaussian)
+    assert table[0].standard_deviation == 0.2 and table[0].name == "g"
+    assert isinstance(table[2], Constant) and table[2].mean == 0.3
+    assert table[3].nu == 3.5
+    assert len(table[1:3]) == 2
+
+
+def test_from_smooth_grid():
+    grid = SmoothGrid([0, 10], [2000])
+    grid.value[:, :] = Gaussian(0.1, 0.2)
+    grid.dage[:, :] = Uniform(-1, 1, 0)
+    grid.dtime[:, :] = Constant(0)
+    priors = grid.priors
+    table = PriorTable.from_frame(priors[priors.density.notna()])
+    assert len(table) == 6
+    dismod = table.to_dismod(prior_id_start=7)
+    assert dismod.prior_id.tolist() == list(range(7, 13))
+    assert set(dismod.density_id) == {0, 1}
+    assert list(dismod.columns) == [
+        "prior_id", "prior_name", "lower", "upper", "mean", "std", "eta", "nu", "density_id"]
+
+
+def test_validate_same_rules_as_priors():
+    table = PriorTable(
+        density_id=[1, 1, 3, 0, 0],
+        mean=[0, 0, 0, 2, 0.5],
+        std=[-1, 0.1, 0.1, np.nan, np.nan],
+        lower=[-1, -1, -1, 0, 0.5],
+        upper=[1, 1, 1, 1, 0.5],
+        eta=np.full(5, np.nan),
+        nu=[np.nan, np.nan, 2, np.nan, np.nan],
+    )
+    message = table.invalid()
+    assert message[0] == "standard deviation must be positive"
+    assert message[1] == ""
+    assert message[2] == "nu must be greater than 2"
+    assert message[3] == "bounds are inconsistent"
+    assert message[4] == ""
+    with pytest.raises(PriorError):
+        table.validate()
+
+
+def test_rvs_within_bounds():
+    priors = [
+        Gaussian(0.1, 0.2, 0, 0.3),
+        Laplace(0, 1, -0.5, 2),
+        Uniform(-1, 1, 0.5),
+        StudentsT(0, 1, 3.5, -10, 10),
+        LogGaussian(0.1, 0.5, 0.1, 0, 20),
+        Constant(0.3),
+    ]
+    table = PriorTable.from_priors(priors)
+    draws = table.rvs(size=500, random_state=RandomState(342432))
+    assert draws.shape == (6, 500)
+    assert np.all(np.isfinite(draws))
+    for prior, prior_draws in zip(priors[:-1], draws):
+        assert np.all((prior.lower <= prior_draws) & (prior_draws <= prior.upper))
+    assert np.all(draws[-1] == 0.3)
+    assert abs(draws[3].mean()) < 0.2
+
+
+def test_rvs_log_students():
+    priors = [LogStudentsT(0.01, 0.005, 4, 1e-3, 0, 0.1), LogStudentsT(0.2, 0.1, 5, 0.01)]
+    table = PriorTable.from_priors(priors)
+    table.validate()
+    draws = table.rvs(size=500, random_state=RandomState(92874))
+    assert np.all(np.isfinite(draws))
+    assert np.all((0 <= draws[0]) & (draws[0] <= 0.1))
+    assert np.all(draws[1] > -0.01)
+    assert abs(np.median(draws[1]) - 0.2) < 0.05
+
+    no_eta = PriorTable.from_priors([LogStudentsT(0.01, 0.005, 4, 1e-3)])
+    no_eta.eta[0] = np.nan
+    assert no_eta.invalid()[0] == "mean plus eta must be positive"
+
+
+def test_unknown_density():
+    with pytest.raises(PriorError):
+        PriorTable.from_frame(pd.DataFrame(dict(density=["cauchy"], mean=[0], lower=[0], upper=[1])))
+
+
+def test_priors_have_slots():
+    prior = Gaussian(0.1, 0.2)
+    assert not hasattr(prior, "__dict__")
+    assert prior.assign(mean=0.2).mean == 0.2
+    with pytest.raises(AttributeError):
+        prior.assign(nu=3)
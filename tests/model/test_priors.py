@@ -152,3 +152,28 @@ def test_mle(cls, params, rng):
 
     if hasattr(dist, "standard_deviation"):
         assert isclose(new_dist.standard_deviation, 0.04, rtol=0.2)
+
+
+@pytest.mark.parametrize("dist", [
+    Uniform(-0.4, 0.6, 0.5),
+    Gaussian(0.1, 1, 0, 0.2),
+    Laplace(0, 1, -10, 10),
+    StudentsT(0, 1, 2.7, -10, 10),
+    LogGaussian(0, 1, 0.5, -10, 10),
+    LogLaplace(0, 1, 0.5, -10, 10),
+    LogStudentsT(0, 1, 2.5, 0.5, -10, 10),
+])
+def test_batch_mle_matches_mle(dist, rng):
+    draws = rng.normal(loc=0.1, scale=0.04, size=(5, 200))
+    draws[1] += 0.2  # Pushes the Gaussian past its upper bound.
+    point_cnt = draws.shape[0]
+    nu = np.full(point_cnt, getattr(dist, "nu", np.nan))
+    found = type(dist).batch_mle(draws, np.full(point_cnt, dist.lower), np.full(point_cnt, dist.upper), nu)
+    for point_idx in range(point_cnt):
+        expected = dist.mle(draws[point_idx]).parameters()
+        for name, values in found.items():
+            assert isclose(values[point_idx], expected[name], rtol=1e-3), f"{name} {point_idx}"
+
+
+def test_batch_mle_const():
+    assert Constant.batch_mle(np.ones((3, 10)), np.zeros(3), np.zeros(3)) == dict()
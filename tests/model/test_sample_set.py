@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy import isclose
+
+from cascade.model.age_time_grid import AgeTimeGrid
+from cascade.model.dismod_groups import DismodGroups
+from cascade.model.sample_set import SampleSet
+from cascade.model.var_layout import VarLayout
+
+VAR_CNT = 6
+SAMPLE_CNT = 5
+
+
+@pytest.fixture
+def samples():
+    var_ids = DismodGroups()
+    id_draw = AgeTimeGrid([50], [2004, 2005], "var_id")
+    id_draw[50, 2004] = [4]  # var 4 is 2004
+    id_draw[50, 2005] = [5]  # var 5 is 2005
+    id_draw.mulstd["dtime"].loc[:, "var_id"] = 3
+    var_ids.rate["iota"] = id_draw
+    other = AgeTimeGrid([0, 100], [2000], "var_id")
+    other.set_plane("var_id", [[0], [1]])
+    var_ids.rate["omega"] = other
+
+    sample_index = np.repeat(np.arange(0, SAMPLE_CNT), VAR_CNT)
+    var_id = np.tile(np.arange(0, VAR_CNT), SAMPLE_CNT)
+    table = pd.DataFrame(dict(
+        sample_id=np.arange(0, VAR_CNT * SAMPLE_CNT),
+        sample_index=sample_index,
+        var_id=var_id,
+        var_value=(2000 + var_id + sample_index) * 0.001,
+    ))
+    return SampleSet.from_table(table, VarLayout(var_ids, VAR_CNT))
+
+
+def test_sample_set_from_table(samples):
+    assert len(samples) == SAMPLE_CNT
+    iota = samples.field("rate", "iota")
+    assert iota.shape == (SAMPLE_CNT, 1, 2)
+    for idx in range(SAMPLE_CNT):
+        assert isclose(iota[idx, 0, 0], (2004 + idx) * 0.001)
+        assert isclose(iota[idx, 0, 1], (2005 + idx) * 0.001)
+        assert isclose(samples[idx].rate["iota"].get_mulstd("dtime"), (2003 + idx) * 0.001)
+
+
+def test_sample_set_summaries(samples):
+    mean = samples.mean()
+    assert isclose(mean.rate["iota"][50, 2004], 2.006)
+    assert isclose(mean.rate["iota"].get_mulstd("dtime"), 2.005)
+    assert isclose(samples.std().rate["omega"][100, 2000], np.std(np.arange(SAMPLE_CNT) * 0.001, ddof=1))
+    assert isclose(samples.quantile(0.5).rate["omega"][0, 2000], 2.002)
+
+
+def test_sample_set_slices_and_interpolates(samples):
+    subset = samples[1:3]
+    assert len(subset) == 2
+    assert subset.sample_index.tolist() == [1, 2]
+    on_grid = samples.on_grid("rate", "omega", [0, 50, 100], [1990, 2000])
+    assert on_grid.shape == (SAMPLE_CNT, 3, 2)
+    assert isclose(on_grid[0, 1, 0], 2.0005)
+    table = samples.to_table()
+    assert isclose(table["var_value"][VAR_CNT + 2], 2.003)
+
+
+def test_sample_set_in_other_layout(samples):
+    var_ids = DismodGroups()
+    omega = AgeTimeGrid([0, 100], [2000], "var_id")
+    omega.set_plane("var_id", [[3], [2]])
+    var_ids.rate["omega"] = omega
+    iota = AgeTimeGrid([50], [2004, 2005], "var_id")
+    iota.set_plane("var_id", [[0, 1]])
+    var_ids.rate["iota"] = iota
+
+    moved = samples.in_layout(VarLayout(var_ids, 4))
+    assert moved.values.shape == (SAMPLE_CNT, 4)
+    assert np.allclose(moved.field("rate", "iota"), samples.field("rate", "iota"))
+    assert np.allclose(moved.field("rate", "omega"), samples.field("rate", "omega"))
@@ -1,9 +1,10 @@
 from numpy import isclose
+import numpy as np
 
 import pytest
 
 from cascade.model import SmoothGrid
-from cascade.model.priors import Gaussian
+from cascade.model.priors import Gaussian, Constant
 
 
 def test_smooth_grid__development_target():
@@ -61,3 +62,20 @@ def test_smooth_grid_mulstd():
     grid.value.mulstd_prior = Gaussian(mean=0.1, standard_deviation=0.02)
     assert grid.value.mulstd_prior.standard_deviation == 0.02
     assert isinstance(grid.value.mulstd_prior, Gaussian)
+
+
+def test_set_parameters_as_arrays():
+    grid = SmoothGrid([0, 5, 10], [2000, 2010])
+    rates = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+    grid.value.set_parameters(density="gaussian", mean=rates, std=0.1 * rates)
+    assert isinstance(grid.value[5, 2010], Gaussian)
+    assert isclose(grid.value[5, 2010].standard_deviation, 0.04)
+    assert np.allclose(grid.value.to_array("mean"), rates)
+    assert np.allclose(grid.var_from_mean().to_array(), rates)
+
+    grid.value.set_parameters(density="uniform", mean=rates, lower=rates, upper=rates)
+    assert isinstance(grid.value[10, 2000], Constant)
+    assert grid.value[10, 2000].mean == 0.5
+
+    with pytest.raises(ValueError):
+        grid.value.set_parameters(mean=rates)
@@ -1,7 +1,9 @@
 from numpy import isclose, isnan
+import numpy as np
+import pandas as pd
 import pytest
 
-from cascade.model.var import Var
+from cascade.model.var import Var, interpolate_vars
 
 
 def test_var_returns_a_float():
@@ -110,3 +112,73 @@ def test_mulstd_read_failure():
 
     # Here the key is good, but there is nothing there.
     assert isnan(onet.get_mulstd('dage'))
+
+
+def test_var_from_array_reorders():
+    var = Var.from_array([50, 0], [2000, 1990, 2010], [[1, 2, 3], [4, 5, 6]])
+    assert var[50, 2000] == 1
+    assert var[0, 1990] == 5
+    assert var.to_array().tolist() == [[5, 4, 6], [2, 1, 3]]
+
+
+def test_var_from_array_without_copy():
+    values = np.array([[0.0, 1.0], [2.0, 3.0]])
+    var = Var.from_array([0, 10], [2000, 2010], values, copy=False)
+    assert isclose(var(5, 2000), 1.0)
+    values[1, 0] = 4.0
+    assert var[10, 2000] == 4.0
+    assert isclose(var(5, 2000), 2.0)
+    var[0, 2010] = 5.0
+    assert values[0, 1] == 5.0
+
+    copied = Var.from_array([0, 10], [2000, 2010], values)
+    values[0, 0] = 9.0
+    assert copied[0, 2000] == 0.0
+    # Out of order ages can't be a view.
+    reordered = Var.from_array([10, 0], [2000, 2010], values, copy=False)
+    assert reordered[0, 2000] == 4.0
+    values[1, 0] = 8.0
+    assert reordered[0, 2000] == 4.0
+
+
+def test_var_from_frame():
+    frame = pd.DataFrame(dict(age=[10, 0, 10, 0], time=[2000, 2000, 2010, 2010], mean=[0.1, 0.2, 0.3, 0.4]))
+    var = Var.from_frame(frame)
+    assert var[0, 2010] == 0.4
+    assert np.allclose(var.to_array(), [[0.2, 0.4], [0.1, 0.3]])
+
+    with pytest.raises(ValueError):
+        Var.from_frame(frame.iloc[:3])
+
+
+def test_call_sees_changed_values():
+    var = Var([0, 1], [2000, 2010])
+    var[:, :] = 1.0
+    assert var(0.5, 2005) == 1.0
+    var[1, :] = 3.0
+    assert isclose(var(0.5, 2005), 2.0)
+    var.grid.loc[:, "mean"] = 5.0
+    assert var(0.5, 2005) == 5.0
+
+
+def test_call_and_grid_evaluation_agree():
+    var = Var.from_array([0, 10, 50], [1990, 2000], [[0, 1], [2, 3], [4, 7]])
+    ages = np.array([-5, 0, 3, 10, 30, 50, 80])
+    times = np.array([1980, 1990, 1994, 2000, 2020])
+    on_grid = var.on_grid(ages, times)
+    assert on_grid.shape == (len(ages), len(times))
+    for aidx, age in enumerate(ages):
+        for tidx, time in enumerate(times):
+            assert isclose(on_grid[aidx, tidx], var(age, time))
+    assert np.allclose(var(ages, 1994), on_grid[:, 2])
+
+
+def test_interpolate_stack_of_vars():
+    first = Var.from_array([0, 10], [2000], [[1], [2]])
+    second = Var.from_array([0, 10], [2000], [[5], [3]])
+    other_grid = Var.from_array([0], [1990, 2010], [[0, 4]])
+    stacked = interpolate_vars([first, other_grid, second], [0, 5, 10], [1990, 2000])
+    assert stacked.shape == (3, 3, 2)
+    assert np.allclose(stacked[0], [[1, 1], [1.5, 1.5], [2, 2]])
+    assert np.allclose(stacked[1], [[0, 2], [0, 2], [0, 2]])
+    assert np.allclose(stacked[2], [[5, 5], [4, 4], [3, 3]])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from numpy import isclose
+
+from cascade.model.age_time_grid import AgeTimeGrid
+from cascade.model.dismod_groups import DismodGroups
+from cascade.model.var import Var
+from cascade.model.var_layout import VarLayout
+
+
+@pytest.fixture
+def layout():
+    var_ids = DismodGroups()
+    iota = AgeTimeGrid([0, 50], [1995, 2015], "var_id")
+    iota.set_plane("var_id", [[1, 2], [3, 4]])
+    iota.mulstd["value"].loc[:, "var_id"] = 0
+    var_ids.rate["iota"] = iota
+    # Out of order, so that this one is a copy.
+    omega = AgeTimeGrid([50], [1995, 2015], "var_id")
+    omega.set_plane("var_id", [[6, 5]])
+    var_ids.rate["omega"] = omega
+    return VarLayout(var_ids, 7)
+
+
+def test_unpack_places_values(layout):
+    var_groups = layout.unpack(np.linspace(0, 0.6, 7))
+    assert isclose(var_groups.rate["iota"][0, 2015], 0.2)
+    assert isclose(var_groups.rate["iota"][50, 1995], 0.3)
+    assert isclose(var_groups.rate["iota"].get_mulstd("value"), 0)
+    assert np.isnan(var_groups.rate["iota"].get_mulstd("dage"))
+    assert isclose(var_groups.rate["omega"][50, 1995], 0.6)
+    assert isclose(var_groups.rate["omega"][50, 2015], 0.5)
+
+
+def test_unpack_is_a_view_where_contiguous(layout):
+    vector = np.zeros(7)
+    var_groups = layout.unpack(vector)
+    vector[4] = 0.7
+    assert isclose(var_groups.rate["iota"][50, 2015], 0.7)
+    var_groups.rate["iota"][0, 1995] = 0.8
+    assert isclose(vector[1], 0.8)
+
+
+def test_pack_round_trip(layout):
+    vector = np.linspace(0, 0.6, 7)
+    assert np.allclose(layout.pack(layout.unpack(vector)), vector)
+    packed = layout.pack_many([layout.unpack(vector), layout.unpack(2 * vector)])
+    assert packed.shape == (2, 7)
+    assert np.allclose(packed[1], 2 * vector)
+
+
+def test_pack_rejects_other_grid(layout):
+    var_groups = layout.unpack(np.zeros(7))
+    var_groups.rate["omega"] = Var([40], [1995, 2015])
+    with pytest.raises(RuntimeError):
+        layout.pack(var_groups)